@@ -2,6 +2,9 @@
 from flask import Flask, jsonify, render_template, send_from_directory
 from flask_cors import CORS
 from routes.evaluate import evaluate_bp
+from routes.certificates import certificates_bp
+from routes.jobs import jobs_bp
+from utils.ingest import IngestRequest
 import os
 
 app = Flask(__name__, 
@@ -9,8 +12,13 @@ app = Flask(__name__,
             static_folder='../static')
 CORS(app)
 
+# Stream uploads into hashing spools instead of werkzeug's default temp files
+app.request_class = IngestRequest
+
 # Register blueprints
 app.register_blueprint(evaluate_bp)
+app.register_blueprint(certificates_bp)
+app.register_blueprint(jobs_bp)
 
 @app.route("/")
 def index():
@@ -0,0 +1,28 @@
+"""
+Gunicorn configuration for TrustGraphed.
+
+The app, and with it the evaluation pipeline, lexicon packs and scoring
+policy, is loaded once in the master before it forks. Everything loaded is
+then frozen out of the cyclic garbage collector, so collections in the
+workers never write to those pages and they stay shared. Threads, pools
+and database connections are all started lazily per process, so nothing
+started in the master leaks into a worker.
+"""
+
+import gc
+import os
+
+bind = os.environ.get("TG_BIND", f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+workers = int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1))
+worker_class = "gthread"
+threads = int(os.environ.get("TG_WEB_THREADS", 4))
+timeout = int(os.environ.get("TG_WEB_TIMEOUT", 120))
+preload_app = True
+
+
+def when_ready(server):
+    """Runs in the master once the preloaded app is imported, before workers fork."""
+    gc.collect()
+    gc.freeze()
+    server.log.info("Evaluation pipeline preloaded; %d objects frozen for "
+                    "copy-on-write sharing", gc.get_freeze_count())
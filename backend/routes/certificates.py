@@ -0,0 +1,110 @@
+"""
+TrustGraphed Certificate Routes
+"""
+
+import os
+import sys
+
+from flask import Blueprint, jsonify, request
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+backend_parent = os.path.dirname(backend_dir)
+if backend_parent not in sys.path:
+    sys.path.insert(0, backend_parent)
+
+from utils.certificate_store import CertificateStore, id_number
+from utils.scoring_policy import default_store
+from utils.signing import BatchSigner
+from utils.verification import CertificateVerifier
+
+certificates_bp = Blueprint('certificates', __name__)
+
+# Most certificates checked in one bulk verification request
+DEFAULT_MAX_BULK = 1000
+
+# Certificates from concurrent requests are signed together, one HMAC per batch
+certificate_signer = BatchSigner()
+
+# Every issued certificate, in an append-only log indexed by ID
+certificate_store = CertificateStore()
+
+# Active scoring policy, re-read when its file changes
+scoring_policies = default_store()
+
+# Verification results are cached, so embedded certificates can be re-checked on
+# every view
+certificate_verifier = CertificateVerifier(certificate_store, certificate_signer,
+                                           scoring_policies)
+
+@certificates_bp.route('/certificates/<certificate_id>', methods=['GET'])
+def get_certificate(certificate_id):
+    """Fetch an issued certificate by ID."""
+    if id_number(certificate_id) is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Certificate IDs look like TG_XXXXXXXX'
+        }), 400
+
+    try:
+        certificate = certificate_store.get(certificate_id)
+    except (OSError, ValueError) as store_error:
+        print(f"Certificate lookup failed: {str(store_error)}")
+        return jsonify({
+            'status': 'error',
+            'message': 'Certificate store unavailable'
+        }), 503
+
+    if certificate is None:
+        return jsonify({
+            'status': 'error',
+            'message': f'Certificate {certificate_id} not found'
+        }), 404
+
+    return jsonify({
+        'status': 'success',
+        'certificate': certificate
+    }), 200
+
+@certificates_bp.route('/certificates/verify', methods=['POST'])
+def verify_certificates():
+    """
+    Verify a certificate by ID or as issued, optionally with its content or
+    content hash; send "items" (or "certificate_ids") to verify many at once.
+    """
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return jsonify({
+            'status': 'error',
+            'message': 'Send a JSON object with a certificate, certificate_id or items'
+        }), 400
+
+    items = body.get('items', body.get('certificate_ids'))
+    try:
+        if items is None:
+            verification = certificate_verifier.verify(
+                body.get('certificate_id'), body.get('certificate'),
+                body.get('content'), body.get('content_hash')
+            )
+            return jsonify({'status': 'success', 'verification': verification}), 200
+
+        max_bulk = int(os.environ.get("TG_VERIFY_MAX_BULK", DEFAULT_MAX_BULK))
+        if not isinstance(items, list) or len(items) > max_bulk:
+            return jsonify({
+                'status': 'error',
+                'message': f'items must be a list of at most {max_bulk} certificates'
+            }), 400
+        results = certificate_verifier.verify_many(items)
+        return jsonify({'status': 'success', 'results': results}), 200
+
+    except ValueError as verify_error:
+        return jsonify({
+            'status': 'error',
+            'message': str(verify_error)
+        }), 400
+    except OSError as store_error:
+        print(f"Certificate verification failed: {str(store_error)}")
+        return jsonify({
+            'status': 'error',
+            'message': 'Certificate store unavailable'
+        }), 503
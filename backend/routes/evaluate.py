@@ -5,9 +5,9 @@ TrustGraphed Evaluation Routes
 from flask import Blueprint, request, jsonify
 import sys
 import os
+import sqlite3
 import tempfile
-import fitz  # PyMuPDF
-import docx
+import zipfile
 
 # Add the backend directory to the Python path
 backend_dir = os.path.dirname(os.path.abspath(__file__))
@@ -16,116 +16,227 @@ if backend_parent not in sys.path:
     sys.path.insert(0, backend_parent)
 
 # Import utils modules
-from utils.sdg import SourceDataGrappler
-from utils.aie import AssertionIntegrityEngine
-from utils.cce import ConfidenceComputationEngine
-from utils.zfp import ZeroFabricationProtocol
-from utils.score_engine import TrustScoreEngine
+from utils.pipeline import Pipeline
+from utils.batch import BatchEvaluator
 from utils.certificate import CertificateGenerator
+from utils.pdf_extractor import PDFExtractionEngine, parse_page_range
+from utils.docx_extractor import DOCXExtractionEngine
+from utils.extract_cache import ExtractionCache
+from utils.salvage import BinarySalvageEngine
+from utils.preflight import DocumentPreflight
+from utils.ingest import ingest_upload
+from utils.assertion_store import AssertionStore
+from utils.lexicon_pack import load_packs
+from routes.certificates import (certificate_signer, certificate_store,
+                                 certificate_verifier, scoring_policies)
+from utils.merkle import ContentHasher
 
 evaluate_bp = Blueprint('evaluate', __name__)
 
+# Binary formats worth caching; bump the version whenever their extraction
+# output changes
+CACHED_FILE_TYPES = ('.pdf', '.docx', '.doc')
+EXTRACTOR_VERSION = "5"
+
+# Pages per pool task when a character budget may stop extraction early
+LAZY_TASK_PAGES = 8
+
+# Batch certificates the store turns away as already issued are reissued this many
+# times
+MAX_CERTIFICATE_ATTEMPTS = 3
+
+extraction_cache = ExtractionCache()
+assertion_store = AssertionStore()
+
+# Domain lexicon packs are memory-mapped once and shared by every request
+lexicon_packs = load_packs()
+
+# Every module is built and warmed once at startup, then shared by all requests
+pipeline = Pipeline(lexicon_packs, scoring_policies, certificate_signer,
+                    certificate_store.contains).warm()
+
+# /evaluate/batch signs its certificates itself, a whole batch under one root
+batch_certificates = CertificateGenerator(None, certificate_store.contains)
+
+# Worker processes for /evaluate/batch, started on the first batch
+batch_evaluator = BatchEvaluator()
+
 def extract_text_from_file(file):
     """Extract text content from uploaded file with comprehensive error handling."""
+    return extract_document(file)['content']
+
+def extract_document(file, page_range=None, max_chars=None):
+    """
+    Extract an uploaded file, optionally limited to a PDF page range and a
+    character budget, and report the scope that was actually evaluated.
+    """
     filename = file.filename.lower() if file.filename else ""
     print(f"Processing file: {filename}")
 
     if not filename:
         raise ValueError("No filename provided")
 
+    # The upload was hashed as it streamed in, so the cache key costs nothing
+    upload = ingest_upload(file)
+
+    # Repeat uploads of the same bytes and scope skip parsing entirely
+    file_type = os.path.splitext(filename)[1]
+    cache_key = None
+    if file_type in CACHED_FILE_TYPES:
+        cache_key = extraction_cache.make_key(upload.sha256, file_type,
+                                              EXTRACTOR_VERSION)
+        if page_range or max_chars:
+            cache_key += f"-p{page_range}-c{max_chars}"
+        cached_document = extraction_cache.get(cache_key)
+        if cached_document is not None:
+            print(f"Extraction cache hit: {filename}")
+            return cached_document
+
+    document = _extract_file_content(upload, filename, page_range, max_chars)
+    if cache_key is not None:
+        extraction_cache.put(cache_key, document)
+    return document
+
+def collect_text(pieces, max_chars=None, hasher=None):
+    """
+    Join text pieces once, stopping as soon as the character budget is spent.
+
+    Returns (content, truncated). Every kept piece is fed to hasher as it
+    arrives, so the content hash is ready without a second pass. The piece
+    iterator is closed on return so lazy extractors stop decoding the rest
+    of the document.
+    """
+    parts = []
+    total = 0
+    truncated = False
+    try:
+        for piece in pieces:
+            if max_chars is not None and total + len(piece) > max_chars:
+                piece = piece[:max_chars - total]
+                truncated = True
+            parts.append(piece)
+            if hasher is not None and piece:
+                hasher.update(piece)
+            if truncated:
+                break
+            total += len(piece)
+    finally:
+        if hasattr(pieces, 'close'):
+            pieces.close()
+    return "".join(parts), truncated
+
+def build_scope(content, max_chars=None, truncated=False, pdf_report=None):
+    """Describe exactly which part of a document was evaluated."""
+    scope = {
+        "page_range": None,
+        "requested_page_range": None,
+        "pages_evaluated": None,
+        "total_pages": None,
+        "max_chars": max_chars,
+        "characters_evaluated": len(content),
+        "truncated": truncated
+    }
+    if pdf_report and pdf_report['page_stats']:
+        scope.update({
+            "page_range": [pdf_report['page_stats'][0]['page'],
+                           pdf_report['page_stats'][-1]['page']],
+            "requested_page_range": pdf_report['page_range'],
+            "pages_evaluated": pdf_report['pages'],
+            "total_pages": pdf_report['total_pages']
+        })
+    return scope
+
+def _document(pieces, max_chars=None):
+    """Collect pieces within the budget into a document, scope and chunked digest."""
+    hasher = ContentHasher("chunk")
+    content, truncated = collect_text(pieces, max_chars, hasher)
+    return {"content": content, "scope": build_scope(content, max_chars, truncated),
+            "digest": hasher.digest()}
+
+def _salvaged_lines(upload):
+    """Salvaged binary runs, one per line."""
+    for index, run in enumerate(BinarySalvageEngine().iter_runs(upload.view())):
+        yield "\n" + run if index else run
+
+def _extract_file_content(upload, filename, page_range=None, max_chars=None):
+    """Parse an ingested upload by file type; ValueError if no text can be recovered."""
     try:
         if filename.endswith(('.txt', '.md')):
             # Handle text files
-            content = file.read().decode('utf-8', errors='replace')
+            content = upload.read().decode('utf-8', errors='replace')
             if not content.strip():
                 raise ValueError("Text file appears to be empty")
-            return content
+            return _document([content], max_chars)
 
         elif filename.endswith('.pdf'):
-            # Handle PDF files using PyMuPDF (fitz)
-            content = ""
+            # Handle PDF files using the page-parallel extraction engine
             try:
-                # Read file content into bytes
-                file_bytes = file.read()
-                if not file_bytes:
+                if not upload.size:
                     raise ValueError("PDF file appears to be empty")
 
-                # Open PDF document from bytes
-                pdf_doc = fitz.open(stream=file_bytes, filetype="pdf")
-
-                if pdf_doc.page_count == 0:
-                    raise ValueError("PDF has no pages")
-
-                # Extract text from all pages
-                for page_num in range(pdf_doc.page_count):
-                    page = pdf_doc[page_num]
-                    page_text = page.get_text()
-                    if page_text.strip():  # Only add non-empty pages
-                        content += page_text + "\n"
-
-                pdf_doc.close()
+                # Spilled uploads are opened by path, in-memory ones through a view
+                pdf_source = upload.path or upload.view()
+
+                # Pages outside the range are never decoded, and once the budget
+                # is spent no further pages are requested from the pool
+                pdf_engine = PDFExtractionEngine()
+                task_pages = LAZY_TASK_PAGES if max_chars else None
+                pages = pdf_engine.iter_pages(pdf_source, page_range,
+                                              task_pages=task_pages)
+                # Each page with text becomes one Merkle leaf, hashed as it arrives
+                hasher = ContentHasher("page")
+                content, truncated = collect_text(
+                    (page.text + "\n" for page in pages if page.text.strip()),
+                    max_chars, hasher
+                )
+                pages.close()
+
+                report = pdf_engine.report()
+                print(f"PDF extracted: {report['pages']} of "
+                      f"{report['total_pages']} pages, {report['characters']} chars, "
+                      f"{report['page_seconds']:.3f}s page time")
 
                 if not content.strip():
                     raise ValueError("No readable text found in PDF")
 
-                return content
+                return {"content": content,
+                        "scope": build_scope(content, max_chars, truncated, report),
+                        "digest": hasher.digest()}
 
             except Exception as pdf_error:
                 raise ValueError(f"PDF processing failed: {str(pdf_error)}")
 
         elif filename.endswith('.docx'):
-            # Handle DOCX files with validation
+            # Handle DOCX files by streaming word/document.xml
             try:
                 # First, reset file pointer
-                file.seek(0)
-                
-                # Try to validate it's a proper DOCX (ZIP) file
-                import zipfile
+                upload.seek(0)
+
+                docx_engine = DOCXExtractionEngine()
                 try:
-                    # Check if it's a valid ZIP file (DOCX is ZIP-based)
-                    with zipfile.ZipFile(file, 'r') as test_zip:
-                        # Check for required DOCX components
-                        required_files = ['[Content_Types].xml', 'word/document.xml']
-                        zip_files = test_zip.namelist()
-                        if not any(req in zip_files for req in required_files):
-                            raise ValueError("File appears to be ZIP but not a valid DOCX structure")
-                    
-                    # Reset file pointer for docx processing
-                    file.seek(0)
-                    
+                    # Check it's a valid ZIP file (DOCX is ZIP-based)
+                    # with a document part
+                    archive = docx_engine.open_document(upload)
+
                 except zipfile.BadZipFile:
                     # Not a valid ZIP file - try as plain text or legacy DOC
-                    file.seek(0)
-                    content = file.read().decode('utf-8', errors='replace')
-                    # Clean up binary artifacts
-                    content = ''.join(char for char in content if char.isprintable() or char.isspace())
+                    # Salvage readable runs from the binary artifacts
+                    document = _document(_salvaged_lines(upload), max_chars)
                     
-                    if len(content.strip()) < 10:
+                    if len(document['content'].strip()) < 10:
                         raise ValueError("File appears corrupted - unable to extract meaningful text")
                     
-                    return content
+                    return document
 
-                # Process as proper DOCX
-                doc = docx.Document(file)
-                content = ""
+                # Paragraphs and table rows come back in document order
+                with archive:
+                    blocks = docx_engine.iter_blocks(archive)
+                    document = _document((block + "\n" for block in blocks), max_chars)
 
-                # Extract text from paragraphs
-                for paragraph in doc.paragraphs:
-                    if paragraph.text.strip():
-                        content += paragraph.text + "\n"
-
-                # Extract text from tables if any
-                for table in doc.tables:
-                    for row in table.rows:
-                        for cell in row.cells:
-                            if cell.text.strip():
-                                content += cell.text + " "
-                    content += "\n"
-
-                if not content.strip():
+                if not document['content'].strip():
                     raise ValueError("No readable text found in DOCX file")
 
-                return content
+                return document
 
             except ValueError:
                 # Re-raise our custom errors
@@ -133,12 +244,10 @@ def extract_text_from_file(file):
             except Exception as docx_error:
                 # Try fallback text extraction for corrupted files
                 try:
-                    file.seek(0)
-                    content = file.read().decode('utf-8', errors='replace')
-                    content = ''.join(char for char in content if char.isprintable() or char.isspace())
+                    document = _document(_salvaged_lines(upload), max_chars)
                     
-                    if len(content.strip()) >= 10:
-                        return content
+                    if len(document['content'].strip()) >= 10:
+                        return document
                     else:
                         raise ValueError(f"DOCX processing failed and no readable text found: {str(docx_error)}")
                 except:
@@ -147,14 +256,13 @@ def extract_text_from_file(file):
         elif filename.endswith('.doc'):
             # Legacy DOC files - basic text extraction attempt
             try:
-                content = file.read().decode('utf-8', errors='replace')
-                # Remove common binary artifacts
-                content = ''.join(char for char in content if char.isprintable() or char.isspace())
+                # Salvage readable runs, skipping common binary artifacts
+                document = _document(_salvaged_lines(upload), max_chars)
 
-                if not content.strip() or len(content.strip()) < 10:
+                if len(document['content'].strip()) < 10:
                     raise ValueError("Unable to extract readable text from DOC file")
 
-                return content
+                return document
 
             except Exception as doc_error:
                 raise ValueError(f"DOC processing failed: {str(doc_error)}")
@@ -170,6 +278,151 @@ def extract_text_from_file(file):
         # Catch any other unexpected errors
         raise ValueError(f"Unexpected error processing file '{filename}': {str(e)}")
 
+def check_assertion_store(analysis, certificate_id):
+    """Report conflicts with earlier certified assertions, then store these."""
+    try:
+        return assertion_store.record(certificate_id, analysis['assertions'],
+                                      analysis['assertion_masks'])
+    except sqlite3.Error as store_error:
+        # The corpus check is advisory; never fail an evaluation over it
+        print(f"Assertion store unavailable: {str(store_error)}")
+        return []
+
+def store_certificate(certificate):
+    """Append an issued certificate to the durable log; returns once it is on disk."""
+    try:
+        certificate_store.append(certificate)
+    except (OSError, ValueError) as store_error:
+        print(f"Certificate store unavailable: {str(store_error)}")
+
+def build_response(content, results, cert_result, cross_document_conflicts):
+    """The evaluation response for one document."""
+    sdg_result = results['sdg_result']
+    aie_result = results['aie_result']
+    cce_result = results['cce_result']
+    zfp_result = results['zfp_result']
+    score_result = results['score_result']
+    certificate_info = cert_result['certificate']['certificate_info']
+    return {
+        "status": "success",
+        "content_length": len(content),
+        "evaluation_scope": certificate_info['evaluation_scope'],
+        "trust_evaluation": {
+            "trust_score": score_result['trust_score'],
+            "trust_level": score_result['trust_level'],
+            "component_scores": score_result['component_scores'],
+            "insights": score_result['insights'],
+            "detailed_explanation": score_result.get('detailed_explanation', {})
+        },
+        "certificate_id": cert_result['certificate_id'],
+        "module_results": {
+            "source_data_grappler": {
+                "assertions_found": sdg_result['assertions_count'],
+                "citations_found": sdg_result['citations_count'],
+                "extraction_confidence": sdg_result['extraction_confidence']
+            },
+            "assertion_integrity": {
+                "integrity_score": aie_result['integrity_score'],
+                "issues_found": aie_result['issues_found'],
+                "cross_document_conflicts": len(cross_document_conflicts),
+                "cross_document_examples": cross_document_conflicts[:3]
+            },
+            "confidence_computation": {
+                "overall_confidence": cce_result['overall_confidence'],
+                "high_confidence_assertions": cce_result['high_confidence_count']
+            },
+            "zero_fabrication": {
+                "authenticity_score": zfp_result['authenticity_score'],
+                "fabrication_risk": zfp_result['fabrication_risk'],
+                "flags_detected": zfp_result['total_flags']
+            }
+        },
+        "certificate": cert_result['certificate'],
+        "readable_summary": cert_result['readable_summary']
+    }
+
+def evaluate_document(content, content_assertion, evaluation_scope=None,
+                      content_digest=None, progress=None):
+    """
+    Run extracted content through every module, certify it and check it
+    against the corpus; returns the evaluation response. progress, if
+    given, is called with each stage name as that stage starts.
+    """
+    report = progress or (lambda _stage: None)
+
+    # Steps 1-5: SDG, AIE, CCE, ZFP and the TrustScore Engine
+    analysis = pipeline.analyze(content, content_assertion, report)
+    results = analysis['module_results']
+
+    # Step 6: Generate certificate
+    report('certificate')
+    cert_result = pipeline.certificates.process(content, results['score_result'],
+                                                evaluation_scope, content_digest)
+
+    # Step 7: Keep the certificate so it can be fetched and verified later
+    store_certificate(cert_result['certificate'])
+
+    # Step 8: Compare against assertions from earlier certified documents, then
+    # index this one
+    report('corpus')
+    cross_document_conflicts = check_assertion_store(analysis,
+                                                     cert_result['certificate_id'])
+
+    return build_response(content, results, cert_result, cross_document_conflicts)
+
+def certify_batch(items):
+    """
+    Issue, sign and store certificates for analyzed batch items in one
+    commit. An ID the store turns away as already issued (another request
+    took it first) is reissued; an item still without a stored certificate
+    after MAX_CERTIFICATE_ATTEMPTS is marked as an error.
+    """
+    pending = items
+    for _ in range(MAX_CERTIFICATE_ATTEMPTS):
+        if not pending:
+            return
+        for item in pending:
+            analysis = item['analysis']
+            item['cert_result'] = batch_certificates.process(
+                item['content'], analysis['module_results']['score_result'],
+                item['scope'], item['digest'] or analysis['content_digest']
+            )
+        certificates = [item['cert_result']['certificate'] for item in pending]
+        signatures = certificate_signer.sign_many(certificates)
+        for certificate, signature in zip(certificates, signatures, strict=True):
+            certificate['validity']['signature'] = signature
+        try:
+            stored = certificate_store.append_many(certificates)
+        except (OSError, ValueError) as store_error:
+            print(f"Certificate store unavailable: {str(store_error)}")
+            return
+        pending = [item for item, result in zip(pending, stored, strict=True)
+                   if isinstance(result, ValueError)]
+    for item in pending:
+        certificate_id = item.pop('cert_result')['certificate_id']
+        print(f"Certificate store rejected {certificate_id} again; giving up")
+        item['error'] = 'Certificate could not be issued: its ID was already taken'
+
+def limit_text(content, max_chars):
+    """Cut submitted text to the character budget; returns (content, scope, digest)."""
+    hasher = ContentHasher("chunk")
+    content, truncated = collect_text([content], max_chars, hasher)
+    return content, build_scope(content, max_chars, truncated), hasher.digest()
+
+def parse_evaluation_limits(values):
+    """Read the optional page_range and max_chars limits from form or JSON values."""
+    page_range = parse_page_range(values.get('page_range'))
+    max_chars = values.get('max_chars')
+    if max_chars in (None, ""):
+        return page_range, None
+    try:
+        max_chars = int(max_chars)
+    except (TypeError, ValueError):
+        raise ValueError("max_chars must be a positive integer") from None
+    if max_chars < 1:
+        raise ValueError("max_chars must be a positive integer")
+    return page_range, max_chars
+
 evaluate_bp = Blueprint('evaluate', __name__)
 
 @evaluate_bp.route('/evaluate', methods=['POST'])
@@ -180,6 +433,8 @@ def evaluate_content():
     try:
         # Get content assertion if provided
         content_assertion = None
+        evaluation_scope = None
+        content_digest = None
 
         # Handle both file uploads and direct text input
         if 'file' in request.files:
@@ -193,8 +448,19 @@ def evaluate_content():
             # Get content assertion from form data
             content_assertion = request.form.get('content_assertion', 'unsure')
 
-            # Extract text content from file
-            content = extract_text_from_file(file)
+            try:
+                page_range, max_chars = parse_evaluation_limits(request.form)
+            except ValueError as limit_error:
+                return jsonify({
+                    'status': 'error',
+                    'message': str(limit_error)
+                }), 400
+
+            # Extract only the requested pages, stopping once the budget is spent
+            document = extract_document(file, page_range, max_chars)
+            content = document['content']
+            evaluation_scope = document['scope']
+            content_digest = document.get('digest')
             if not content:
                 return jsonify({
                     'status': 'error',
@@ -211,7 +477,20 @@ def evaluate_content():
 
             # Get content assertion from JSON
             content_assertion = content.get('content_assertion', 'unsure')
+            try:
+                _, max_chars = parse_evaluation_limits(
+                    {'max_chars': content.get('max_chars')}
+                )
+            except ValueError as limit_error:
+                return jsonify({
+                    'status': 'error',
+                    'message': str(limit_error)
+                }), 400
+
             content = content['content']
+            if isinstance(content, str) and max_chars:
+                content, evaluation_scope, content_digest = limit_text(content,
+                                                                       max_chars)
         else:
             return jsonify({
                 'status': 'error',
@@ -221,79 +500,8 @@ def evaluate_content():
         if not content or len(content.strip()) < 10:
             return jsonify({"error": "Content must be at least 10 characters long"}), 400
 
-        # Initialize all modules
-        sdg = SourceDataGrappler()
-        aie = AssertionIntegrityEngine()
-        cce = ConfidenceComputationEngine()
-        zfp = ZeroFabricationProtocol()
-        score_engine = TrustScoreEngine()
-        certificate_gen = CertificateGenerator()
-
-        # Process through pipeline
-        results = {}
-
-        # Step 1: Extract assertions and citations
-        sdg_result = sdg.process(content)
-        results['sdg_result'] = sdg_result
-
-        # Step 2: Check assertion integrity
-        assertions = sdg_result.get('assertions', [])
-        aie_result = aie.process(content, assertions)
-        results['aie_result'] = aie_result
-
-        # Step 3: Compute confidence scores
-        citations = sdg_result.get('citations', [])
-        cce_result = cce.process(content, assertions, citations)
-        results['cce_result'] = cce_result
-
-        # Step 4: Check for fabrication
-        zfp_result = zfp.process(content)
-        results['zfp_result'] = zfp_result
-
-        # Step 5: Generate final trust score with assertion type
-        score_result = score_engine.process(results, content_assertion)
-        results['score_result'] = score_result
-
-        # Step 6: Generate certificate
-        cert_result = certificate_gen.process(content, score_result)
-        results['certificate_result'] = cert_result
-
-        # Build response
-        response = {
-            "status": "success",
-            "content_length": len(content),
-            "trust_evaluation": {
-                "trust_score": score_result['trust_score'],
-                "trust_level": score_result['trust_level'],
-                "component_scores": score_result['component_scores'],
-                "insights": score_result['insights'],
-                "detailed_explanation": score_result.get('detailed_explanation', {})
-            },
-            "certificate_id": cert_result['certificate_id'],
-            "module_results": {
-                "source_data_grappler": {
-                    "assertions_found": sdg_result['assertions_count'],
-                    "citations_found": sdg_result['citations_count'],
-                    "extraction_confidence": sdg_result['extraction_confidence']
-                },
-                "assertion_integrity": {
-                    "integrity_score": aie_result['integrity_score'],
-                    "issues_found": aie_result['issues_found']
-                },
-                "confidence_computation": {
-                    "overall_confidence": cce_result['overall_confidence'],
-                    "high_confidence_assertions": cce_result['high_confidence_count']
-                },
-                "zero_fabrication": {
-                    "authenticity_score": zfp_result['authenticity_score'],
-                    "fabrication_risk": zfp_result['fabrication_risk'],
-                    "flags_detected": zfp_result['total_flags']
-                }
-            },
-            "certificate": cert_result['certificate'],
-            "readable_summary": cert_result['readable_summary']
-        }
-
+        response = evaluate_document(content, content_assertion, evaluation_scope,
+                                     content_digest)
         return jsonify(response), 200
 
     except Exception as e:
@@ -307,6 +515,122 @@ def evaluate_content():
             'details': 'Please check file format and try again'
         }), 500
 
+@evaluate_bp.route('/evaluate/batch', methods=['POST'])
+def evaluate_batch():
+    """
+    Evaluate many documents in one request: a JSON "items" array of
+    {content, content_assertion} objects, or several uploaded files. Each
+    document runs the full pipeline on the batch worker pool; results come
+    back in order, with per-document errors kept separate.
+    """
+    try:
+        items = []
+        if request.files:
+            files = request.files.getlist('files') + request.files.getlist('file')
+            if len(files) > batch_evaluator.max_items:
+                return jsonify({
+                    'status': 'error',
+                    'message': (f'A batch holds at most {batch_evaluator.max_items} '
+                                'documents')
+                }), 400
+            content_assertion = request.form.get('content_assertion', 'unsure')
+            for file in files:
+                try:
+                    document = extract_document(file)
+                except ValueError as extract_error:
+                    items.append({'error': str(extract_error)})
+                    continue
+                items.append({'content': document['content'],
+                              'content_assertion': content_assertion,
+                              'scope': document['scope'],
+                              'digest': document.get('digest')})
+
+        elif request.is_json:
+            body = request.get_json(silent=True)
+            entries = body.get('items') if isinstance(body, dict) else None
+            if not isinstance(entries, list) or not entries:
+                return jsonify({
+                    'status': 'error',
+                    'message': ('Send an "items" array of '
+                                '{content, content_assertion} objects')
+                }), 400
+            if len(entries) > batch_evaluator.max_items:
+                return jsonify({
+                    'status': 'error',
+                    'message': (f'A batch holds at most {batch_evaluator.max_items} '
+                                'documents')
+                }), 400
+            for entry in entries:
+                if (not isinstance(entry, dict)
+                        or not isinstance(entry.get('content'), str)):
+                    items.append({'error': 'Each item needs a content string'})
+                    continue
+                content_assertion = entry.get('content_assertion') or 'unsure'
+                items.append({'content': entry['content'],
+                              'content_assertion': content_assertion,
+                              'scope': None, 'digest': None})
+        else:
+            return jsonify({
+                'status': 'error',
+                'message': 'No content provided'
+            }), 400
+
+        for item in items:
+            if 'error' not in item and len(item['content'].strip()) < 10:
+                item['error'] = 'Content must be at least 10 characters long'
+
+        # Steps 1-5 run on the worker pool
+        pending = [item for item in items if 'error' not in item]
+        analyses = batch_evaluator.analyze(
+            [(item['content'], item['content_assertion'], item['digest'] is None)
+             for item in pending]
+        )
+        for item, analysis in zip(pending, analyses, strict=True):
+            if isinstance(analysis, Exception):
+                reason = str(analysis) or type(analysis).__name__
+                item['error'] = f'Processing error: {reason}'
+            else:
+                item['analysis'] = analysis
+
+        # Steps 6-8: certificates for the whole batch are signed under one root and
+        # stored in one commit
+        certify_batch([item for item in items if 'analysis' in item])
+        analyzed = [item for item in items if 'cert_result' in item]
+
+        results = []
+        for index, item in enumerate(items):
+            if 'error' in item:
+                results.append({'index': index, 'status': 'error',
+                                'message': item['error']})
+                continue
+            cert_result = item['cert_result']
+            cross_document_conflicts = check_assertion_store(
+                item['analysis'], cert_result['certificate_id']
+            )
+            response = build_response(item['content'],
+                                      item['analysis']['module_results'],
+                                      cert_result, cross_document_conflicts)
+            results.append({'index': index, **response})
+
+        succeeded = len(analyzed)
+        return jsonify({
+            'status': 'success',
+            'count': len(items),
+            'succeeded': succeeded,
+            'failed': len(items) - succeeded,
+            'results': results
+        }), 200
+
+    except Exception as e:
+        error_message = str(e) if str(e) else "Unknown processing error occurred"
+        print(f"Error during batch evaluation: {error_message}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'error': f'Processing error: {error_message}',
+            'status': 'error'
+        }), 500
+
 @evaluate_bp.route('/evaluate/health', methods=['GET'])
 def evaluate_health():
     """Health check for evaluation service."""
@@ -320,9 +644,35 @@ def evaluate_health():
             "Zero-Fabrication Protocol",
             "TrustScore Engine",
             "Certificate Generator"
-        ]
+        ],
+        "extraction_cache": extraction_cache.stats(),
+        "assertion_store": assertion_store.stats(),
+        "scoring_policy": scoring_policies.stats(),
+        "certificate_signer": certificate_signer.stats(),
+        "certificate_store": certificate_store.stats(),
+        "certificate_verifier": certificate_verifier.stats(),
+        "batch_evaluator": batch_evaluator.stats()
     })
 
+@evaluate_bp.route('/evaluate/preflight', methods=['POST'])
+def preflight_file():
+    """Size an upload from headers and cheap metadata without extracting it."""
+    try:
+        if 'file' not in request.files:
+            return jsonify({"error": "No file provided"}), 400
+
+        uploaded_file = request.files['file']
+        if not uploaded_file.filename:
+            return jsonify({"error": "No file selected"}), 400
+
+        probe = DocumentPreflight().probe(uploaded_file)
+        return jsonify({"status": "success", **probe}), 200
+
+    except Exception as e:
+        error_msg = str(e) if str(e) else "Unknown preflight failure"
+        print(f"Preflight endpoint exception: {error_msg}")
+        return jsonify({"error": f"Preflight failed: {error_msg}"}), 500
+
 @evaluate_bp.route('/evaluate/test-file', methods=['POST'])
 def test_file_processing():
     """Test endpoint for file processing without full evaluation."""
@@ -354,26 +704,28 @@ def test_file_processing():
         except ValueError as e:
             error_msg = str(e) if str(e) else "Unknown ValueError"
             print(f"ValueError in test endpoint: {error_msg}")
-            print(f"File details - Name: {uploaded_file.filename}, Size: {len(uploaded_file.read()) if uploaded_file else 'N/A'}")
-            uploaded_file.seek(0) if uploaded_file else None
+            file_size = DocumentPreflight().byte_length(uploaded_file)
+            print(f"File details - Name: {uploaded_file.filename}, Size: {file_size}")
             return jsonify({
                 "error": error_msg,
                 "filename": uploaded_file.filename,
                 "debug_info": {
                     "error_type": "ValueError",
-                    "file_size": len(uploaded_file.read()) if uploaded_file else 0
+                    "file_size": file_size
                 }
             }), 400
         except Exception as e:
             error_msg = str(e) if str(e) else "Unknown Exception"
             print(f"Exception in test endpoint: {error_msg}")
             print(f"Exception type: {type(e).__name__}")
+            file_size = (DocumentPreflight().byte_length(uploaded_file)
+                         if uploaded_file else 0)
             return jsonify({
                 "error": error_msg,
                 "filename": uploaded_file.filename if uploaded_file else "unknown",
                 "debug_info": {
                     "error_type": type(e).__name__,
-                    "file_size": len(uploaded_file.read()) if uploaded_file else 0
+                    "file_size": file_size
                 }
             }), 500
 
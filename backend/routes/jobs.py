@@ -0,0 +1,180 @@
+"""
+TrustGraphed Job Routes
+"""
+
+import os
+import sys
+
+from flask import Blueprint, jsonify, request
+from werkzeug.datastructures import FileStorage
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+backend_parent = os.path.dirname(backend_dir)
+if backend_parent not in sys.path:
+    sys.path.insert(0, backend_parent)
+
+from utils.job_queue import JobQueue
+from utils.pdf_extractor import parse_page_range
+
+from routes.evaluate import (
+    evaluate_document,
+    extract_document,
+    limit_text,
+    parse_evaluation_limits,
+)
+
+jobs_bp = Blueprint('jobs', __name__)
+
+SUPPORTED_FILE_TYPES = ('.txt', '.md', '.pdf', '.docx', '.doc')
+
+# Reported in order as a job runs; text submissions skip extraction
+JOB_STAGES = ["extract", "sdg", "aie", "cce", "zfp", "score", "certificate", "corpus"]
+
+def run_evaluation_job(payload, upload_path, progress):
+    """Evaluate a queued submission as /evaluate would; returns (response, status)."""
+    content_assertion = payload['content_assertion']
+    max_chars = payload.get('max_chars')
+
+    if upload_path:
+        progress('extract')
+        page_range = parse_page_range(payload.get('page_range'))
+        with open(upload_path, 'rb') as stream:
+            upload = FileStorage(stream=stream, filename=payload['filename'])
+            document = extract_document(upload, page_range, max_chars)
+        content = document['content']
+        evaluation_scope = document['scope']
+        content_digest = document.get('digest')
+        if not content:
+            return {'status': 'error',
+                    'message': 'Unable to extract text from file'}, 400
+    else:
+        progress('extract', 'skipped')
+        content, evaluation_scope, content_digest = payload['content'], None, None
+        if max_chars:
+            content, evaluation_scope, content_digest = limit_text(content, max_chars)
+
+    if len(content.strip()) < 10:
+        return {'error': 'Content must be at least 10 characters long'}, 400
+
+    response = evaluate_document(content, content_assertion, evaluation_scope,
+                                 content_digest, progress)
+    return response, 200
+
+# Jobs are kept in SQLite next to an upload spool and run on a bounded pool of
+# worker threads
+job_queue = JobQueue(run_evaluation_job, JOB_STAGES)
+
+@jobs_bp.before_app_request
+def start_job_workers():
+    """Start this process's job workers, so jobs queued before a restart resume."""
+    job_queue.start()
+
+def job_links(job_id):
+    return {'status_url': f'/jobs/{job_id}', 'result_url': f'/jobs/{job_id}/result'}
+
+@jobs_bp.route('/jobs', methods=['POST'])
+def submit_job():
+    """
+    Queue an evaluation and return its job ID at once. Takes the same file
+    upload or JSON body as /evaluate; poll the status URL for progress and
+    fetch the result URL once the job has finished.
+    """
+    try:
+        if 'file' in request.files:
+            file = request.files['file']
+            if file.filename == '':
+                return jsonify({
+                    'status': 'error',
+                    'message': 'No file selected'
+                }), 400
+            if not file.filename.lower().endswith(SUPPORTED_FILE_TYPES):
+                return jsonify({
+                    'status': 'error',
+                    'message': ("Unsupported file type. Supported formats: "
+                                f"{', '.join(SUPPORTED_FILE_TYPES)}")
+                }), 400
+            values = request.form
+            upload = file.stream
+            payload = {'filename': file.filename}
+
+        elif request.is_json:
+            values = request.get_json(silent=True)
+            if (not isinstance(values, dict)
+                    or not isinstance(values.get('content'), str)):
+                return jsonify({
+                    'status': 'error',
+                    'message': 'No content provided'
+                }), 400
+            if len(values['content'].strip()) < 10:
+                return jsonify({
+                    "error": "Content must be at least 10 characters long"
+                }), 400
+            upload = None
+            payload = {'content': values['content']}
+
+        else:
+            return jsonify({
+                'status': 'error',
+                'message': 'No content provided'
+            }), 400
+
+        try:
+            _, max_chars = parse_evaluation_limits(values)
+        except ValueError as limit_error:
+            return jsonify({
+                'status': 'error',
+                'message': str(limit_error)
+            }), 400
+        payload.update(content_assertion=values.get('content_assertion') or 'unsure',
+                       page_range=values.get('page_range') or None, max_chars=max_chars)
+
+        if upload is not None:
+            upload.seek(0)
+        job_id = job_queue.submit(payload, upload)
+        response = jsonify({'status': 'queued', 'job_id': job_id, **job_links(job_id)})
+        response.headers['Location'] = f'/jobs/{job_id}'
+        return response, 202
+
+    except Exception as e:
+        error_message = str(e) if str(e) else "Unknown error occurred"
+        print(f"Error queueing job: {error_message}")
+        return jsonify({
+            'error': f'Job could not be queued: {error_message}',
+            'status': 'error'
+        }), 500
+
+@jobs_bp.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Status of a job and the progress of each evaluation stage."""
+    status = job_queue.status(job_id)
+    if status is None:
+        return jsonify({
+            'status': 'error',
+            'message': f'Job {job_id} not found or its result has expired'
+        }), 404
+    return jsonify({'job': status, **job_links(job_id)}), 200
+
+@jobs_bp.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    """The finished job's evaluation response, or 202 with its status while pending."""
+    result = job_queue.result(job_id)
+    if result is None:
+        return jsonify({
+            'status': 'error',
+            'message': f'Job {job_id} not found or its result has expired'
+        }), 404
+    body, status_code = result
+    if body is None:
+        return jsonify({'status': 'pending', 'job': job_queue.status(job_id),
+                        **job_links(job_id)}), 202
+    return jsonify(body), status_code
+
+@jobs_bp.route('/jobs/health', methods=['GET'])
+def jobs_health():
+    """Health check for the job queue."""
+    return jsonify({
+        "status": "healthy",
+        "service": "TrustGraphed Job Queue",
+        "job_queue": job_queue.stats()
+    })
@@ -5,9 +5,17 @@ Automated testing for all core modules
 """
 
 import unittest
+import unittest.mock
 import sys
 import os
 import json
+import random
+import re
+import hashlib
+import itertools
+import tempfile
+import time
+import zlib
 from io import BytesIO
 
 # Add backend to path
@@ -15,12 +23,45 @@ backend_dir = os.path.dirname(os.path.abspath(__file__))
 if backend_dir not in sys.path:
     sys.path.insert(0, backend_dir)
 
+# The app's stores are opened at import, so point them at a scratch directory first
+state_dir = tempfile.TemporaryDirectory(prefix="trustgraphed-test-")
+os.environ.update(
+    TG_ASSERTION_STORE_PATH=os.path.join(state_dir.name, "assertions.db"),
+    TG_CERTIFICATE_STORE_DIR=os.path.join(state_dir.name, "certificates"),
+    TG_JOB_DIR=os.path.join(state_dir.name, "jobs"),
+    TG_SIGNING_KEY_PATH=os.path.join(state_dir.name, "signing.key"),
+    TG_EXTRACT_CACHE_DIR=os.path.join(state_dir.name, "extract_cache")
+)
+
 from app import app
 from utils.sdg import SourceDataGrappler
 from utils.aie import AssertionIntegrityEngine
-from utils.cce import ConfidenceComputationEngine
+from utils.cce import (ConfidenceComputationEngine, compute_trust_score,
+                       compute_trust_scores_batch)
 from utils.zfp import ZeroFabricationProtocol
+from utils.document_context import DocumentContext
+from utils.similarity import SimilarityIndex
+from utils.lexicon import LexiconMatcher
+from utils import lexicon_pack
+from utils.lexicon_pack import LexiconPack
+from utils.assertion_store import AssertionStore
+from utils.certificate_store import (INDEX_HEADER_BYTES, RECORD_HEADER,
+                                     CertificateStore, id_number)
 from utils.score_engine import TrustScoreEngine
+from utils.certificate import CertificateGenerator
+from utils.merkle import (ContentHasher, hash_text, merkle_root, prove_leaf,
+                          verify_inclusion)
+from utils.signing import BatchSigner, load_key, verify_signature
+from utils.verification import CertificateVerifier
+from utils.job_queue import JobQueue
+from utils.pipeline import Pipeline
+from utils.scoring_policy import DEFAULT_POLICY_PATH, PolicyStore, ScoringPolicy
+from utils import pdf_extractor
+from utils.pdf_extractor import PDFExtractionEngine, parse_page_range
+from utils.docx_extractor import DOCXExtractionEngine
+from utils.extract_cache import ExtractionCache
+from utils.salvage import BinarySalvageEngine
+from utils.ingest import HashingSpool, ingest_upload
 
 class TestTrustGraphedModules(unittest.TestCase):
     
@@ -80,6 +121,199 @@ class TestTrustGraphedModules(unittest.TestCase):
         self.assertGreaterEqual(result['overall_confidence'], 0)
         self.assertLessEqual(result['overall_confidence'], 1)
     
+    def test_cce_feature_matrix(self):
+        """Test CCE scores every assertion from the shared feature matrix."""
+        content = ("Growth is clearly documented and verified. "
+                   "Prices might rise, maybe, or might fall. "
+                   "Output stayed flat this year. Maybe it is clearly proven")
+        context = DocumentContext(content)
+        cce = ConfidenceComputationEngine()
+        assertions = context.assertions() + ["Perhaps this is elsewhere"]
+        result = cce.process(content, assertions, [], context)
+
+        # Distinct markers per category: 'might' twice still counts once
+        features = context.features["assertion_feature_matrix"]
+        matrix = features["matrix"]
+        uncertainty = features["categories"].index("uncertainty")
+        confidence = features["categories"].index("confidence")
+        self.assertEqual(matrix[:, uncertainty].tolist(), [0, 2, 0, 1, 1])
+        self.assertEqual(matrix[:, confidence].tolist(), [3, 0, 0, 2, 0])
+
+        self.assertEqual(result['assertion_confidence'],
+                         [1.0, 0.6 - 2 * 0.15, 0.6, 0.6 - 0.15 + 2 * 0.2, 0.6 - 0.15])
+        self.assertEqual(result['high_confidence_count'], 2)
+        self.assertEqual(result['low_confidence_count'], 1)
+
+    def test_trust_score_batch_parity(self):
+        """Test batch trust scoring matches compute_trust_score row for row."""
+        rows = list(itertools.product(
+            range(7), range(5), range(5), [False, True],
+            [0.0, 0.3, 0.6, 0.61, 0.7, 0.71, 0.95],
+            ["original", "Original", "ai", "copied", "mixed", "unsure", "other"]
+        ))
+        batch = compute_trust_scores_batch(*zip(*rows, strict=True))
+
+        for index, row in enumerate(rows):
+            (assertions, citations, contradictions,
+             author, ai_likelihood, declared) = row
+            expected = compute_trust_score({
+                "assertions": assertions,
+                "citations": citations,
+                "contradictions": contradictions,
+                "author_detected": author,
+                "ai_likelihood": ai_likelihood
+            }, declared)
+            self.assertEqual(batch["final_score"][index], expected["final_score"])
+            self.assertEqual(batch["band"][index], expected["band"])
+            self.assertEqual(batch["trust_level"][index], expected["trust_level"])
+            self.assertEqual(bool(batch["trapdoor_applied"][index]),
+                             expected["breakdown"].get("trapdoor_applied", False))
+
+    def test_scoring_policy_parity(self):
+        """Test the default scoring policy scores exactly like compute_trust_score."""
+        policy = ScoringPolicy.from_file(DEFAULT_POLICY_PATH)
+        for (assertions, citations, contradictions,
+             author, ai_likelihood, declared) in itertools.product(
+            range(7), range(5), range(5), [False, True],
+            [0.0, 0.6, 0.61, 0.71, 0.95],
+            ["original", "Original", "ai", "mixed", "unsure", "other"]
+        ):
+            signals = {
+                "assertions": assertions,
+                "citations": citations,
+                "contradictions": contradictions,
+                "author_detected": author,
+                "ai_likelihood": ai_likelihood
+            }
+            self.assertEqual(policy.score(signals, declared),
+                             compute_trust_score(signals, declared))
+
+    def test_scoring_policy_hot_reload(self):
+        """Test a changed policy file is swapped in and a broken one is ignored."""
+        with open(DEFAULT_POLICY_PATH, encoding="utf-8") as policy_file:
+            spec = json.load(policy_file)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "policy.json")
+            with open(path, "w", encoding="utf-8") as policy_file:
+                json.dump(spec, policy_file)
+            store = PolicyStore(path, reload_seconds=0)
+            engine = TrustScoreEngine(store)
+            module_results = {'sdg_result': {'citations_count': 2,
+                                             'author_detected': True}}
+            first = engine.process(module_results, "original")
+            self.assertEqual(first['scoring_policy']['version'], "2025.1")
+
+            spec["version"] = "2025.2"
+            spec["author_bonus"] = 0
+            staged = os.path.join(tmp, "staged.json")
+            with open(staged, "w", encoding="utf-8") as policy_file:
+                json.dump(spec, policy_file)
+            os.replace(staged, path)
+            second = engine.process(module_results, "original")
+            self.assertEqual(second['scoring_policy']['version'], "2025.2")
+            self.assertNotEqual(second['scoring_policy']['sha256'],
+                                first['scoring_policy']['sha256'])
+            self.assertLess(second['trust_score'], first['trust_score'])
+
+            with open(staged, "w", encoding="utf-8") as policy_file:
+                policy_file.write('{"version": "broken"')
+            os.replace(staged, path)
+            self.assertFalse(store.check())
+            self.assertEqual(store.current().version, "2025.2")
+            self.assertEqual(store.reloads, 1)
+
+            certificate = CertificateGenerator().create_certificate("Some content.",
+                                                                    second)
+            self.assertEqual(certificate["certificate_info"]["scoring_policy"],
+                             second['scoring_policy'])
+
+    def test_content_merkle(self):
+        """Test content hashes are real SHA-256 and every chunk proves into the root."""
+        content = self.high_trust_content * 20
+        digest = hash_text(content, chunk_chars=100)
+        self.assertEqual(digest['sha256'],
+                         hashlib.sha256(content.encode('utf-8')).hexdigest())
+
+        # The tree depends only on the text, not on how it arrived
+        hasher = ContentHasher("chunk", chunk_chars=100)
+        for start in range(0, len(content), 37):
+            hasher.update(content[start:start + 37])
+        self.assertEqual(hasher.digest(), digest)
+
+        leaves = digest['merkle']['leaves']
+        root = digest['merkle']['root']
+        self.assertEqual(sum(leaf['length'] for leaf in leaves), len(content))
+        self.assertEqual(merkle_root([leaf['hash'] for leaf in leaves]), root)
+        for index in range(len(leaves)):
+            proof = prove_leaf(digest, index)
+            self.assertTrue(verify_inclusion(proof['leaf']['hash'], proof['proof'],
+                                             proof['root']))
+        self.assertFalse(verify_inclusion(leaves[0]['hash'],
+                                          prove_leaf(digest, 1)['proof'], root))
+
+        # Certificates from separate generators agree on the hash
+        first = CertificateGenerator().create_certificate(content, {})
+        second = CertificateGenerator().create_certificate(content, {})
+        content_hash = first['certificate_info']['content_hash']
+        self.assertEqual(content_hash, f"SHA256_{digest['sha256']}")
+        self.assertEqual(content_hash, second['certificate_info']['content_hash'])
+
+    def test_certificate_batch_signing(self):
+        """Test certificates signed under one batch root each verify on their own."""
+        key = bytes(range(32))
+        signer = BatchSigner(key, batch_size=4)
+        generator = CertificateGenerator()
+        certificates = [generator.create_certificate(f"Document number {index}.", {})
+                        for index in range(5)]
+        signatures = signer.sign_many(certificates)
+        for certificate, signature in zip(certificates, signatures, strict=True):
+            certificate["validity"]["signature"] = signature
+            self.assertEqual(signature["batch_size"], 5)
+            self.assertTrue(signer.verify(certificate))
+        roots = {cert["validity"]["signature"]["batch_root"] for cert in certificates}
+        self.assertEqual(len(roots), 1)
+        self.assertFalse(verify_signature(certificates[0], bytes(32)))
+
+        certificates[1]["trust_evaluation"]["overall_trust_score"] = 1.0
+        self.assertFalse(signer.verify(certificates[1]))
+
+        # Queued signing from a generator closes batches at batch_size
+        certificate = CertificateGenerator(signer).create_certificate(
+            "Signed through the queue.", {}
+        )
+        self.assertTrue(signer.verify(certificate))
+        futures = [signer.submit(generator.create_certificate(f"Queued {index}.", {}))
+                   for index in range(10)]
+        self.assertTrue(all(future.result()["batch_size"] <= 4 for future in futures))
+
+    def test_signing_key_file(self):
+        """Test the key file is created private and refused once others can reach it."""
+        with tempfile.TemporaryDirectory() as key_dir:
+            path = os.path.join(key_dir, "keys", "signing.key")
+            key = load_key(path)
+            self.assertEqual(len(key), 32)
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+            self.assertEqual(os.stat(os.path.dirname(path)).st_mode & 0o777, 0o700)
+            self.assertEqual(load_key(path), key)
+
+            os.chmod(path, 0o644)
+            with self.assertRaises(ValueError):
+                load_key(path)
+            os.chmod(path, 0o600)
+            os.chmod(os.path.dirname(path), 0o777)
+            with self.assertRaises(ValueError):
+                load_key(path)
+
+            # Without a configured key it is kept with the certificate store
+            store_dir = os.path.join(key_dir, "certificates")
+            environment = {"TG_SIGNING_KEY": "", "TG_SIGNING_KEY_PATH": "",
+                           "TG_CERTIFICATE_STORE_DIR": store_dir}
+            with unittest.mock.patch.dict(os.environ, environment):
+                key = load_key()
+                self.assertEqual(load_key(), key)
+            self.assertTrue(os.path.exists(os.path.join(store_dir, "signing.key")))
+
     def test_zfp_module(self):
         """Test Zero-Fabrication Protocol."""
         zfp = ZeroFabricationProtocol()
@@ -90,6 +324,451 @@ class TestTrustGraphedModules(unittest.TestCase):
         self.assertGreaterEqual(result['authenticity_score'], 0)
         self.assertLessEqual(result['authenticity_score'], 1)
     
+    def test_similarity_index(self):
+        """Test LSH candidates find the same near-duplicates as all-pairs scoring."""
+        texts = [" ".join(hashlib.md5(f"{index}-{word}".encode()).hexdigest()[:6]
+                          for word in range(8))
+                 for index in range(80)]
+        texts += ["the quarterly revenue growth is driven by strong product demand",
+                  "the quarterly revenue growth is not driven by strong product demand"]
+
+        exact = SimilarityIndex(exact_limit=1000).similar_pairs(texts)
+        indexed = SimilarityIndex(exact_limit=0).similar_pairs(texts)
+        self.assertIn((80, 81), [(i, j) for i, j, _ in indexed])
+        self.assertTrue(set(indexed) <= set(exact))
+
+        aie = AssertionIntegrityEngine()
+        result = aie.process(" ".join(texts), texts[-2:])
+        self.assertEqual(len(result['contradictions']), 1)
+        self.assertEqual(len(result['redundancies']), 1)
+
+    def test_similarity_index_repetitive(self):
+        """Test repeated and boilerplate sentences keep pair search linear."""
+        sentence = ("The supplier shall deliver the goods "
+                    "within thirty days of the order.")
+        result = Pipeline().analyze(sentence + " " + " ".join([sentence] * 4999))
+        self.assertEqual(result['module_results']['aie_result']['issues_found'], 4999)
+
+        def document(count):
+            clauses = [f"Clause {index} states that the supplier shall deliver "
+                       f"the goods within thirty days of the order."
+                       for index in range(count)]
+            return [text.lower() for text in clauses + [sentence] * count]
+
+        index = SimilarityIndex()
+        timings = []
+        for count in (150, 600):
+            texts = document(count)
+            started = time.perf_counter()
+            pairs = index.similar_pairs(texts)
+            timings.append(time.perf_counter() - started)
+            # Every copy is paired with the first, and each clause with few neighbours
+            neighbours = 1 + index.bands * index.bucket_neighbours
+            self.assertLessEqual(len(pairs), neighbours * len(texts))
+        self.assertLess(timings[1], timings[0] * REGEX_FUZZ_MAX_GROWTH + 0.005,
+                        f"{timings[0]:.4f}s -> {timings[1]:.4f}s")
+
+    def test_aie_feature_masks(self):
+        """Test assertion bitmasks drive contradiction and unsupported-claim checks."""
+        aie = AssertionIntegrityEngine()
+        masks = aie.feature_masks(["the claim is never false",
+                                   "the claim is always true",
+                                   "of course it is clearly so"])
+
+        # never/always and false/true oppose; is appears on both sides
+        self.assertEqual(bin(aie.contradiction_bits(masks[0], masks[1])).count("1"), 2)
+        self.assertEqual(aie.contradiction_bits(masks[0], masks[0]), 0)
+
+        context = DocumentContext("Of course the claim is clearly correct.")
+        result = aie.process(context.text, context.assertions(), context)
+        patterns = [claim['pattern'] for claim in result['unsupported_claims']]
+        self.assertEqual(patterns, [r'\bclearly\b', r'\bof course\b'])
+        self.assertIn("Of course the claim is clearly correct",
+                      context.features['assertion_masks'])
+
+    def test_certificate_store(self):
+        """Test certificates are found by ID through the index, across resizes."""
+        with tempfile.TemporaryDirectory() as store_dir:
+            store = CertificateStore(store_dir, capacity=4)
+            generator = CertificateGenerator(is_issued=store.contains)
+            certificates = [
+                generator.create_certificate(f"Stored document {index}.", {})
+                for index in range(40)
+            ]
+            offsets = [store.submit(certificate) for certificate in certificates[:20]]
+            self.assertEqual(len({future.result() for future in offsets}), 20)
+            store.append_many(certificates[20:])
+
+            first_id = certificates[0]["certificate_info"]["id"]
+            self.assertEqual(store.get(first_id), certificates[0])
+            self.assertTrue(store.contains(first_id))
+            unknown_id = "TG_00000000" if first_id != "TG_00000000" else "TG_00000001"
+            self.assertIsNone(store.get(unknown_id))
+            self.assertIsNone(store.get("not-an-id"))
+            with self.assertRaises(ValueError):
+                store.append(certificates[0])
+            self.assertGreater(store.stats()["index_capacity"], 40)
+
+            # A record the index never saw is replayed, and a torn tail is cut off
+            late = generator.create_certificate("Written just before a crash.", {})
+            payload = json.dumps(late, separators=(",", ":")).encode("utf-8")
+            with open(store.log_path, "ab") as log_file:
+                header = RECORD_HEADER.pack(id_number(late["certificate_info"]["id"]),
+                                            len(payload), zlib.crc32(payload))
+                log_file.write(header + payload + b"\x01\x02")
+            reopened = CertificateStore(store_dir)
+            self.assertEqual(reopened.get(late["certificate_info"]["id"]), late)
+            self.assertEqual(reopened.get(certificates[39]["certificate_info"]["id"]),
+                             certificates[39])
+            self.assertEqual(reopened.stats()["certificates"], 41)
+
+            # Slots that reached the index without the header that counts them
+            # are counted on replay
+            with open(reopened.index_path, "rb") as index_file:
+                header = index_file.read(INDEX_HEADER_BYTES)
+            last = generator.create_certificate("Indexed, but the header was lost.", {})
+            reopened.append(last)
+            with open(reopened.index_path, "r+b") as index_file:
+                index_file.write(header)
+            recovered = CertificateStore(store_dir)
+            self.assertEqual(recovered.get(last["certificate_info"]["id"]), last)
+            self.assertEqual(recovered.stats()["certificates"], 42)
+            self.assertEqual(recovered.stats()["replayed"], 0)
+
+    def test_certificate_store_closes_retired_index(self):
+        """Test a resized index closes its old mapping once no reader holds it."""
+        with tempfile.TemporaryDirectory() as store_dir:
+            store = CertificateStore(store_dir, capacity=4)
+            certificates = [{"certificate_info": {"id": f"TG_{number:08X}"}}
+                            for number in range(1, 41)]
+            store.append(certificates[0])
+            first = store._index
+            # A reader that pinned the mapping before a resize can still probe it
+            with store._live_index() as pinned:
+                store.append_many(certificates[1:4])
+                self.assertIsNot(store._index, first)
+                self.assertIsNotNone(pinned.probe(1))
+                self.assertFalse(first.map.closed)
+            self.assertTrue(first.map.closed)
+            self.assertTrue(first.file.closed)
+
+            retired = [store._index]
+            for certificate in certificates[4:]:
+                store.append(certificate)
+                if store._index is not retired[-1]:
+                    retired.append(store._index)
+                self.assertEqual(store.get(certificate["certificate_info"]["id"]),
+                                 certificate)
+            self.assertGreater(len(retired), 2)
+            self.assertTrue(all(index.map.closed and index.file.closed
+                                for index in retired[:-1]))
+            self.assertFalse(store._index.map.closed)
+            self.assertEqual([store.get(certificate["certificate_info"]["id"])
+                              for certificate in certificates], certificates)
+
+            # A rebuild retires the mapping through the header flag other processes see
+            live = store._index
+            self.assertEqual(store.rebuild(), 40)
+            self.assertTrue(live.map.closed)
+            self.assertEqual(store.get("TG_00000028"), certificates[39])
+
+    def test_certificate_verifier_cache(self):
+        """Test verification is cached, unknown IDs included, and catches tampering."""
+        with tempfile.TemporaryDirectory() as store_dir:
+            store = CertificateStore(store_dir)
+            signer = BatchSigner(bytes(range(32)))
+            policies = PolicyStore(DEFAULT_POLICY_PATH)
+            verifier = CertificateVerifier(store, signer, policies, max_entries=3)
+            content = "Certified content for verification."
+            generator = CertificateGenerator(signer, store.contains)
+            certificate = generator.create_certificate(
+                content, {"scoring_policy": policies.current().stamp})
+            store.append(certificate)
+            certificate_id = certificate["certificate_info"]["id"]
+
+            result = verifier.verify(certificate_id, content=content)
+            self.assertTrue(result["valid"])
+            self.assertTrue(result["policy_current"])
+            self.assertFalse(result["cached"])
+            cached = verifier.verify(certificate=certificate, content=content)
+            self.assertTrue(cached["cached"])
+
+            edited = verifier.verify(certificate_id, content=content + " Edited.")
+            self.assertFalse(edited["content_match"])
+            digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+            # Content and its hash share one cache entry, keyed by the SHA-256
+            by_hash = verifier.verify(certificate_id, content_hash=f"SHA256_{digest}")
+            self.assertTrue(by_hash["valid"])
+            self.assertTrue(by_hash["cached"])
+
+            tampered = json.loads(json.dumps(certificate))
+            tampered["trust_evaluation"]["overall_trust_score"] = 1.0
+            self.assertFalse(verifier.verify(certificate=tampered)["valid"])
+
+            unknown = ("TG_00000000" if certificate_id != "TG_00000000"
+                       else "TG_00000001")
+            results = verifier.verify_many([unknown, unknown, {"content": content}])
+            self.assertFalse(results[0]["known"])
+            self.assertTrue(results[1]["cached"])
+            self.assertIn("error", results[2])
+            self.assertGreaterEqual(verifier.stats()["negative_hits"], 1)
+            self.assertLessEqual(verifier.stats()["entries"], 3)
+
+    def test_job_queue_survives_restart(self):
+        """Test a new queue picks up queued and interrupted jobs, and results expire."""
+        def handler(payload, upload_path, progress):
+            progress("read")
+            with open(upload_path, "rb") as upload:
+                return {"text": upload.read().decode("utf-8"), **payload}, 200
+
+        def wait_for(queue, job_id):
+            deadline = time.monotonic() + 10
+            while queue.result(job_id) == (None, None) and time.monotonic() < deadline:
+                time.sleep(0.02)
+            return queue.result(job_id)
+
+        with tempfile.TemporaryDirectory() as job_dir:
+            # A process that queued a job and another that died mid-job, neither
+            # draining the queue
+            stopped = JobQueue(handler, ["read"], job_dir, lease_seconds=0.05)
+            stopped.start = lambda: None
+            interrupted = stopped.submit({"n": 1}, BytesIO(b"interrupted"))
+            queued = stopped.submit({"n": 2}, BytesIO(b"queued"))
+            stopped._owner = "dead-worker"
+            stopped._claim(1)
+            self.assertEqual(stopped.status(interrupted)["status"], "running")
+
+            restarted = JobQueue(handler, ["read"], job_dir, poll_seconds=0.02,
+                                 result_ttl=0.5)
+            restarted.start()
+            self.assertEqual(wait_for(restarted, queued),
+                             ({"text": "queued", "n": 2}, 200))
+            self.assertEqual(wait_for(restarted, interrupted),
+                             ({"text": "interrupted", "n": 1}, 200))
+            self.assertEqual(restarted.status(queued)["attempts"], 1)
+            status = restarted.status(interrupted)
+            self.assertEqual((status["status"], status["attempts"]), ("succeeded", 2))
+            self.assertEqual(status["stages"][0]["status"], "done")
+            self.assertEqual(os.listdir(os.path.join(job_dir, "uploads")), [])
+
+            time.sleep(0.6)
+            self.assertIsNone(restarted.status(queued))
+            self.assertIsNone(restarted.result(interrupted))
+            self.assertEqual(restarted.purge(), 2)
+
+    def test_job_queue_lost_lease(self):
+        """Test a worker that lost its lease leaves the result and upload alone."""
+        def handler(_payload, _upload_path, _progress):
+            return {"late": True}, 200
+
+        with tempfile.TemporaryDirectory() as job_dir:
+            queue = JobQueue(handler, ["read"], job_dir)
+            queue.start = lambda: None
+            job_id = queue.submit({}, BytesIO(b"upload"))
+            queue._owner = "slow-worker"
+            [(_, payload, upload_path)] = queue._claim(1)
+            with queue._connection() as connection:
+                connection.execute("UPDATE jobs SET owner = 'new-worker' WHERE id = ?",
+                                   (job_id,))
+
+            queue._run(job_id, payload, upload_path)
+            self.assertEqual(queue.status(job_id)["status"], "running")
+            self.assertEqual(queue.result(job_id), (None, None))
+            self.assertTrue(os.path.exists(upload_path))
+            counters = queue.counters
+            self.assertEqual((counters["superseded"], counters["succeeded"]), (1, 0))
+
+    def test_assertion_store(self):
+        """Test the assertion store finds repeats and negations of earlier ones."""
+        with tempfile.TemporaryDirectory() as store_dir:
+            store = AssertionStore(os.path.join(store_dir, "assertions.db"))
+
+            def masks(assertions):
+                return store.engine.feature_masks([a.lower() for a in assertions])
+
+            certified = ["The regional revenue of the company is growing quickly "
+                         "this year",
+                         "Customer retention improved across every enterprise segment"]
+            store.record("TG_FIRST", certified, masks(certified))
+            store.flush()
+
+            incoming = ["The regional revenue of the company is not growing quickly "
+                        "this year",
+                        "Customer retention improved across every enterprise segment",
+                        "Shipping delays affected a small number of orders"]
+            conflicts = store.find_conflicts(incoming, masks(incoming))
+
+            self.assertEqual([(c['type'], c['certificate_id']) for c in conflicts],
+                             [("cross_document_contradiction", "TG_FIRST"),
+                              ("cross_document_duplicate", "TG_FIRST")])
+            self.assertEqual(store.stats()['assertions'], 2)
+
+            # Re-certifying the same text reports the same conflicts, stores nothing new
+            for certificate_id in ("TG_SECOND", "TG_THIRD", "TG_FOURTH"):
+                repeat = store.record(certificate_id, certified, masks(certified))
+                self.assertEqual([c['certificate_id'] for c in repeat],
+                                 ["TG_FIRST", "TG_FIRST"])
+            store.flush()
+            self.assertEqual(store.add("TG_FIFTH", certified, [0, 0]), 0)
+            self.assertEqual(store.stats()['assertions'], 2)
+
+    def test_assertion_store_latency(self):
+        """Test a full store's conflict check costs less than analyzing the document."""
+        # Common words fill the LSH buckets with weak candidates, as in real text
+        rng = random.Random(11)
+        common = ["the", "of", "and", "to", "in", "a", "is", "that", "for", "it",
+                  "as", "was", "with", "be", "by", "on"]
+        words = ["".join(rng.choice("etaoinshrdlcumwfgypbvk")
+                         for _ in range(rng.randint(3, 10))) for _ in range(6000)]
+        weights = list(itertools.accumulate(1 / rank for rank in range(1, 6001)))
+
+        def sentence():
+            picks = rng.choices(words, cum_weights=weights, k=rng.randint(12, 24))
+            return " ".join(rng.choice(common) if rng.random() < 0.4 else word
+                            for word in picks).capitalize() + "."
+
+        stored = [sentence() for _ in range(4000)]
+        document = " ".join(rng.choice(stored) if index % 10 == 0 else sentence()
+                            for index in range(400))
+        pipeline = Pipeline().warm()
+        with tempfile.TemporaryDirectory() as store_dir:
+            store = AssertionStore(os.path.join(store_dir, "assertions.db"))
+            store.add("TG_FILL", stored, [0] * len(stored))
+
+            started = time.perf_counter()
+            analysis = pipeline.analyze(document)
+            analyze_seconds = time.perf_counter() - started
+            assertions = analysis["assertions"]
+            prepared = store.prepare(assertions)
+            started = time.perf_counter()
+            conflicts = store.find_conflicts(assertions, analysis["assertion_masks"],
+                                             prepared)
+            conflict_seconds = time.perf_counter() - started
+
+        self.assertEqual(len(conflicts), 40)
+        self.assertLess(conflict_seconds, analyze_seconds)
+
+    def test_lexicon_matcher(self):
+        """Test one lexicon pass finds tagged phrases on word boundaries only."""
+        text = ("the mighty river might be rising, could. be worse; "
+                "as an ai i cannot say")
+        matches = LexiconMatcher().scan(text)
+        found = [(text[m.start:m.end], m.category) for m in matches]
+
+        self.assertIn(("might", "uncertainty"), found)
+        self.assertIn(("might be", "hedging"), found)
+        self.assertIn(("as an ai", "fabrication"), found)
+        self.assertNotIn("could be", [phrase for phrase, _ in found])
+        categories = [category for _, category in found]
+        self.assertEqual(categories.count("uncertainty"), 1)
+
+        signals = ConfidenceComputationEngine().process(
+            "A mighty claim that is definitely verified."
+        )
+        self.assertEqual(signals['uncertainty_markers_found'], 0)
+        self.assertEqual(signals['confidence_markers_found'], 2)
+
+    def test_lexicon_pack(self):
+        """Test a compiled pack scans like the in-memory matcher and extends engines."""
+        text = ("as an ai model i cannot confirm; results may be contraindicated "
+                "and of unclear etiology")
+        lexicons = {"fabrication": ["as an ai", "i cannot"],
+                    "uncertainty": ["unclear etiology", "may be"],
+                    "unsupported": ["off label"]}
+        with tempfile.TemporaryDirectory() as pack_dir:
+            source = os.path.join(pack_dir, "medical.json")
+            with open(source, 'w') as handle:
+                json.dump(lexicons, handle)
+            pack_path = os.path.join(pack_dir, "medical.tglx")
+            lexicon_pack.main([source, pack_path])
+
+            pack = LexiconPack(pack_path)
+            try:
+                self.assertEqual(pack.scan(text), LexiconMatcher(lexicons).scan(text))
+
+                zfp_result = ZeroFabricationProtocol([pack]).process(
+                    "Note: patient shows signs of unclear etiology today."
+                )
+                self.assertEqual(zfp_result['ai_artifacts'], [])
+                cce_result = ConfidenceComputationEngine([pack]).process(
+                    "Findings of unclear etiology were noted."
+                )
+                self.assertEqual(cce_result['uncertainty_markers_found'], 1)
+            finally:
+                pack.close()
+
+    def test_lexicon_pack_unsupported_masks(self):
+        """Test masks stay storable however many unsupported phrases a pack adds."""
+        phrases = [f"claim variant {index}" for index in range(80)]
+        with tempfile.TemporaryDirectory() as pack_dir:
+            source = os.path.join(pack_dir, "claims.json")
+            with open(source, 'w') as handle:
+                json.dump({"unsupported": phrases}, handle)
+            pack_path = os.path.join(pack_dir, "claims.tglx")
+            lexicon_pack.main([source, pack_path])
+
+            pack = LexiconPack(pack_path)
+            try:
+                engine = AssertionIntegrityEngine([pack])
+                assertions = ["Sales rose after claim variant 3 and claim variant 79 "
+                              "shipped",
+                              "Everyone knows the market rewards claim variant 64",
+                              "Margins were flat for the whole quarter"]
+                masks = engine.feature_masks([a.lower() for a in assertions])
+                self.assertTrue(all(mask < 1 << 63 for mask in masks))
+
+                result = engine.process(" ".join(assertions), assertions)
+                patterns = [claim['pattern'] for claim in result['unsupported_claims']]
+                self.assertEqual(patterns, [r'\bclaim variant 3\b',
+                                            r'\bclaim variant 79\b',
+                                            r'\beveryone knows\b'])
+                self.assertEqual(result['issues_found'], 4)
+
+                store = AssertionStore(os.path.join(pack_dir, "assertions.db"), engine)
+                store.record("TG_PACK", assertions, masks)
+                store.flush()
+                self.assertEqual(store.stats()['assertions'], 3)
+            finally:
+                pack.close()
+
+    def test_document_context(self):
+        """Test the shared document context matches per-module parsing."""
+        content = ("Studies Show That growth  is real!  Short. "
+                   "It is WIDELY known to rise?")
+        context = DocumentContext(content)
+
+        expected = [s.strip() for s in re.split(r'[.!?]+', content)
+                    if len(s.strip()) > 10]
+        self.assertEqual(context.assertions(), expected)
+        self.assertEqual(context.token_count, len(content.split()))
+        dotted = "\u0130stanbul"
+        self.assertEqual(len(DocumentContext(dotted).lower), len(dotted))
+
+        # Matches are found in the lowercase view but reported as written
+        zfp_result = ZeroFabricationProtocol().process(content, context)
+        matches = [item['match'] for item in zfp_result['suspicious_patterns']]
+        self.assertEqual(matches, ["Studies Show That", "It is WIDELY known"])
+        sdg_result = SourceDataGrappler().process(content, context)
+        self.assertEqual(sdg_result['assertions'], expected)
+
+    def test_zfp_year_pairs(self):
+        """Test year pairs are found per line, as the greedy regex reported them."""
+        content = ("Revenue 2019 and 2021 rose, approximately 12% a year.\n"
+                   "In 2020 only.\n"
+                   "| 1999 | 2001 | 2005 |\n$2020 raised 12345 in May 2018 by Jane Doe")
+        zfp = ZeroFabricationProtocol()
+        items = zfp.detect_suspicious_patterns(content)
+
+        year_pair = r'\b\d{4}\b.*\b\d{4}\b'
+        pairs = [item['match'] for item in items if item['pattern'] == year_pair]
+        self.assertEqual(pairs, [m.group() for m in re.finditer(year_pair, content)])
+        self.assertEqual(pairs, ["2019 and 2021", "1999 | 2001 | 2005",
+                                 "2020 raised 12345 in May 2018"])
+        self.assertEqual([item['match'] for item in items][-1], "approximately 12%")
+
+        # Eight years, one money amount and one proper name
+        self.assertEqual(zfp.scan(DocumentContext(content))['fact_count'], 10)
+
     def test_score_engine(self):
         """Test TrustScore Engine integration."""
         # Run through full pipeline
@@ -119,6 +798,23 @@ class TestTrustGraphedModules(unittest.TestCase):
         self.assertGreaterEqual(score_result['trust_score'], 0)
         self.assertLessEqual(score_result['trust_score'], 1)
     
+    def test_shared_pipeline(self):
+        """Test one warmed pipeline agrees across threads and cannot be changed."""
+        from concurrent.futures import ThreadPoolExecutor
+        pipeline = Pipeline().warm()
+        documents = [self.high_trust_content, self.low_trust_content] * 8
+        expected = [pipeline.analyze(document, "original") for document in documents]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(
+                lambda document: pipeline.analyze(document, "original"), documents
+            ))
+        for result, reference in zip(results, expected, strict=True):
+            self.assertEqual(result["assertion_masks"], reference["assertion_masks"])
+            self.assertEqual(result["module_results"]["score_result"]["trust_score"],
+                             reference["module_results"]["score_result"]["trust_score"])
+        with self.assertRaises(AttributeError):
+            pipeline.aie = AssertionIntegrityEngine()
+
     def test_evaluate_endpoint_text(self):
         """Test text evaluation endpoint."""
         response = self.app.post('/evaluate',
@@ -130,7 +826,132 @@ class TestTrustGraphedModules(unittest.TestCase):
         self.assertEqual(data['status'], 'success')
         self.assertIn('trust_evaluation', data)
         self.assertIn('certificate_id', data)
+
+    def test_certificate_lookup_endpoint(self):
+        """Test an issued certificate can be fetched by ID."""
+        response = self.app.post('/evaluate', json={'content': self.high_trust_content})
+        data = json.loads(response.data)
+
+        response = self.app.get(f"/certificates/{data['certificate_id']}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['certificate'], data['certificate'])
+
+        self.assertEqual(self.app.get('/certificates/TG_NOTANID').status_code, 400)
+
+        response = self.app.post('/certificates/verify', json={
+            'certificate_id': data['certificate_id'], 'content': self.high_trust_content
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(json.loads(response.data)['verification']['valid'])
+
+        response = self.app.post('/certificates/verify', json={
+            'items': [{'certificate': data['certificate']},
+                      {'certificate_id': data['certificate_id'],
+                       'content': 'Other text.'}]
+        })
+        results = json.loads(response.data)['results']
+        self.assertTrue(results[0]['valid'])
+        self.assertFalse(results[1]['valid'])
+        response = self.app.post('/certificates/verify', json=[])
+        self.assertEqual(response.status_code, 400)
+
+        # Malformed certificates are rejected, alone or per item
+        for certificate in ("TG_00000000", {"certificate_info": "x"}, ["TG_00000000"]):
+            response = self.app.post('/certificates/verify',
+                                     json={'certificate': certificate})
+            self.assertEqual(response.status_code, 400)
+        response = self.app.post('/certificates/verify', json={
+            'items': [{'certificate': 'TG_00000000'}, 7]
+        })
+        results = json.loads(response.data)['results']
+        self.assertEqual([result['valid'] for result in results], [False, False])
+        self.assertTrue(all('error' in result for result in results))
     
+    def test_evaluate_batch_endpoint(self):
+        """Test batch evaluation keeps input order and reports bad items separately."""
+        response = self.app.post('/evaluate/batch', json={'items': [
+            {'content': self.high_trust_content, 'content_assertion': 'original'},
+            {'content': 'Too short'},
+            {'text': self.low_trust_content},
+            {'content': self.low_trust_content, 'content_assertion': 'ai'}
+        ]})
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual((data['count'], data['succeeded'], data['failed']), (4, 2, 2))
+        self.assertEqual([result['index'] for result in data['results']], [0, 1, 2, 3])
+        self.assertEqual([result['status'] for result in data['results']],
+                         ['success', 'error', 'error', 'success'])
+        self.assertEqual(data['results'][0]['content_length'],
+                         len(self.high_trust_content))
+
+        # Each certificate is signed, stored and verifiable on its own
+        verification = self.app.post('/certificates/verify', json={
+            'certificate_id': data['results'][3]['certificate_id'],
+            'content': self.low_trust_content
+        })
+        self.assertTrue(json.loads(verification.data)['verification']['valid'])
+
+        response = self.app.post('/evaluate/batch', json={'items': []})
+        self.assertEqual(response.status_code, 400)
+
+    def test_evaluate_batch_reissues_taken_ids(self):
+        """Test a batch certificate with a taken ID is reissued, then reported."""
+        from routes import evaluate
+        store = evaluate.certificate_store
+        append_many = store.append_many
+        rejected = []
+
+        def reject_first(certificates, always=False):
+            if always or not rejected:
+                rejected.append(certificates[0]['certificate_info']['id'])
+                return [ValueError("already stored")] + append_many(certificates[1:])
+            return append_many(certificates)
+
+        items = {'items': [{'content': self.high_trust_content},
+                           {'content': self.low_trust_content}]}
+        with unittest.mock.patch.object(store, 'append_many', reject_first):
+            data = json.loads(self.app.post('/evaluate/batch', json=items).data)
+        self.assertEqual(data['succeeded'], 2)
+        reissued = data['results'][0]['certificate_id']
+        self.assertNotEqual(reissued, rejected[0])
+        self.assertEqual(store.get(reissued)['certificate_info']['id'], reissued)
+
+        def reject_always(certificates):
+            return reject_first(certificates, always=True)
+
+        with unittest.mock.patch.object(store, 'append_many', reject_always):
+            data = json.loads(self.app.post('/evaluate/batch', json=items).data)
+        self.assertEqual((data['succeeded'], data['failed']), (1, 1))
+        self.assertEqual(data['results'][0]['status'], 'error')
+        self.assertIsNotNone(store.get(data['results'][1]['certificate_id']))
+
+    def test_job_endpoints(self):
+        """Test a queued evaluation reports its stages and returns the response."""
+        response = self.app.post('/jobs', json={'content': self.high_trust_content,
+                                                'content_assertion': 'original'})
+        self.assertEqual(response.status_code, 202)
+        job_id = json.loads(response.data)['job_id']
+
+        deadline = time.monotonic() + 30
+        while (self.app.get(f'/jobs/{job_id}/result').status_code == 202
+               and time.monotonic() < deadline):
+            time.sleep(0.05)
+        response = self.app.get(f'/jobs/{job_id}/result')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data['status'], 'success')
+        self.assertEqual(data['content_length'], len(self.high_trust_content))
+
+        job = json.loads(self.app.get(f'/jobs/{job_id}').data)['job']
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual([stage['status'] for stage in job['stages']],
+                         ['skipped'] + ['done'] * 7)
+
+        self.assertEqual(self.app.get('/jobs/unknown').status_code, 404)
+        response = self.app.post('/jobs', json={'content': 'Too short'})
+        self.assertEqual(response.status_code, 400)
+
     def test_evaluate_endpoint_file(self):
         """Test file evaluation endpoint."""
         # Create a test text file
@@ -144,5 +965,409 @@ class TestTrustGraphedModules(unittest.TestCase):
         data = json.loads(response.data)
         self.assertEqual(data['status'], 'success')
 
+
+def build_pdf(page_texts):
+    """Build an in-memory PDF with one text line per page."""
+    import fitz
+    pdf_doc = fitz.open()
+    for text in page_texts:
+        page = pdf_doc.new_page()
+        if text:
+            page.insert_text((72, 72), text)
+    file_bytes = pdf_doc.tobytes()
+    pdf_doc.close()
+    return file_bytes
+
+
+def build_docx(paragraphs, rows):
+    """Build an in-memory DOCX: paragraphs, then a table with a merged first column."""
+    import docx
+    document = docx.Document()
+    for text in paragraphs:
+        document.add_paragraph(text)
+    table = document.add_table(rows=len(rows), cols=len(rows[0]))
+    for row_index, row in enumerate(rows):
+        for col_index, text in enumerate(row):
+            if text:
+                table.cell(row_index, col_index).text = text
+    table.cell(0, 0).merge(table.cell(len(rows) - 1, 0))
+    buffer = BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+class TestExtractionEngines(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.app = app.test_client()
+        self.app.testing = True
+        self.page_texts = [f"Page {i} reports growth of {i}% in 2023."
+                           for i in range(6)]
+
+    def test_pdf_pages_inline(self):
+        """Test inline PDF extraction yields pages in order with stats."""
+        engine = PDFExtractionEngine(max_workers=1)
+        pages = list(engine.iter_pages(build_pdf(self.page_texts)))
+
+        self.assertEqual([page.page_number for page in pages], list(range(6)))
+        self.assertIn("Page 3 reports", pages[3].text)
+        report = engine.report()
+        self.assertEqual(report['pages'], 6)
+        self.assertEqual(report['characters'], sum(page.char_count for page in pages))
+
+    def test_pdf_pages_parallel(self):
+        """Test pooled PDF extraction matches inline extraction."""
+        file_bytes = build_pdf(self.page_texts)
+        inline_engine = PDFExtractionEngine(max_workers=1)
+        inline = [page.text for page in inline_engine.iter_pages(file_bytes)]
+        engine = PDFExtractionEngine(max_workers=2, parallel_threshold=1)
+        executor = pdf_extractor._get_executor(engine.max_workers)
+        with unittest.mock.patch.object(executor, 'submit',
+                                        wraps=executor.submit) as submit:
+            pooled = [page.text for page in engine.iter_pages(file_bytes)]
+
+        self.assertEqual(pooled, inline)
+        # Tasks are sent one temporary file's path, never the document itself
+        sources = {call.args[1] for call in submit.call_args_list}
+        self.assertEqual(len(sources), 1)
+        path = sources.pop()
+        self.assertIsInstance(path, str)
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(engine.split_ranges(6, 4), [(0, 2), (2, 4), (4, 5), (5, 6)])
+
+    def test_pdf_upload(self):
+        """Test PDF upload through the file test endpoint."""
+        test_file = BytesIO(build_pdf(self.page_texts + [""]))
+        response = self.app.post('/evaluate/test-file',
+                                 data={'file': (test_file, 'report.pdf')})
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertIn("Page 0 reports", data['content_preview'])
+
+    def test_pdf_page_range(self):
+        """Test only pages inside the requested range are decoded."""
+        self.assertEqual(parse_page_range("2-4"), (1, 4))
+        self.assertEqual(parse_page_range("5-"), (4, None))
+        with self.assertRaises(ValueError):
+            parse_page_range("4-2")
+
+        file_bytes = build_pdf(self.page_texts)
+        engine = PDFExtractionEngine(max_workers=1)
+        pages = list(engine.iter_pages(file_bytes, parse_page_range("2-4")))
+        self.assertEqual([page.page_number for page in pages], [1, 2, 3])
+
+        # Pooled extraction stops submitting work once the consumer stops
+        engine = PDFExtractionEngine(max_workers=2, parallel_threshold=1)
+        pages = engine.iter_pages(file_bytes, parse_page_range("3-"), task_pages=1)
+        first = next(pages)
+        pages.close()
+        self.assertEqual(first.page_number, 2)
+        self.assertLess(engine.report()['pages'], 4)
+
+    def test_evaluate_with_limits(self):
+        """Test page range and character budget are applied and certified."""
+        test_file = BytesIO(build_pdf(self.page_texts))
+        response = self.app.post('/evaluate', data={
+            'file': (test_file, 'limited.pdf'),
+            'page_range': '2-5',
+            'max_chars': '60'
+        })
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        scope = data['evaluation_scope']
+        self.assertEqual(scope['requested_page_range'], [2, 5])
+        self.assertEqual(scope['page_range'][0], 2)
+        self.assertEqual(scope['total_pages'], 6)
+        self.assertTrue(scope['truncated'])
+        self.assertEqual(scope['characters_evaluated'], 60)
+        certificate_info = data['certificate']['certificate_info']
+        self.assertEqual(certificate_info['evaluation_scope'], scope)
+        merkle = certificate_info['content_merkle']
+        self.assertEqual(merkle['leaf_unit'], "page")
+        self.assertEqual(sum(leaf['length'] for leaf in merkle['leaves']), 60)
+        self.assertEqual(merkle_root([leaf['hash'] for leaf in merkle['leaves']]),
+                         merkle['root'])
+
+        response = self.app.post('/evaluate', data={
+            'file': (BytesIO(build_pdf(self.page_texts)), 'limited.pdf'),
+            'page_range': 'first-ten'
+        })
+        self.assertEqual(response.status_code, 400)
+
+    def test_docx_blocks(self):
+        """Test DOCX streaming keeps document order and skips merged-cell repeats."""
+        file_bytes = build_docx(
+            ["Quarterly summary of the contract.", "", "Signed by both parties."],
+            [["Merged clause", "Term one"], [None, "Term two"], [None, "Term three"]]
+        )
+        content = DOCXExtractionEngine().extract_text(BytesIO(file_bytes))
+
+        self.assertEqual(content.split("\n")[:2],
+                         ["Quarterly summary of the contract.",
+                          "Signed by both parties."])
+        self.assertEqual(content.count("Merged clause"), 1)
+        self.assertIn("Merged clause Term one\nTerm two\nTerm three\n", content)
+
+    def test_docx_long_table_memory(self):
+        """Test DOCX streaming memory does not grow with the number of table rows."""
+        import tracemalloc
+        import zipfile
+
+        def peak_bytes(rows):
+            cell = "<w:tc><w:p><w:r><w:t>{}</w:t></w:r></w:p></w:tc>"
+            cells = "".join("<w:tr>" + cell.format(f"Clause {index}")
+                            + cell.format(f"Term {index}") + "</w:tr>"
+                            for index in range(rows))
+            buffer = BytesIO()
+            with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr('word/document.xml',
+                                 '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                                 f'<w:body><w:tbl>{cells}</w:tbl></w:body></w:document>')
+            engine = DOCXExtractionEngine()
+            tracemalloc.start()
+            try:
+                with engine.open_document(buffer) as archive:
+                    blocks = sum(1 for _ in engine.iter_blocks(archive))
+                return blocks, tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        small_rows, small_peak = peak_bytes(500)
+        large_rows, large_peak = peak_bytes(5000)
+        self.assertEqual((small_rows, large_rows), (500, 5000))
+        self.assertLess(large_peak, small_peak * 2)
+
+    def test_docx_missing_document_part(self):
+        """Test a ZIP without word/document.xml is rejected."""
+        import zipfile
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('[Content_Types].xml', '<Types/>')
+
+        with self.assertRaises(ValueError):
+            DOCXExtractionEngine().open_document(buffer)
+
+    def test_extraction_cache_tiers(self):
+        """Test memory and disk tiers of the extraction cache."""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ExtractionCache(cache_dir=cache_dir, memory_bytes=1024,
+                                    disk_bytes=1024 * 1024)
+            digest = hashlib.sha256(b"%PDF-1.7 sample").hexdigest()
+            key = cache.make_key(digest, ".pdf", "2")
+            self.assertIsNone(cache.get(key))
+
+            document = {"content": "Extracted report text",
+                        "scope": {"truncated": False}}
+            cache.put(key, document)
+            self.assertEqual(cache.get(key), document)
+
+            # A fresh cache on the same directory is served from disk
+            restarted = ExtractionCache(cache_dir=cache_dir, memory_bytes=1024,
+                                        disk_bytes=1024 * 1024)
+            self.assertEqual(restarted.get(key), document)
+
+            stats = cache.stats()
+            self.assertEqual((stats['misses'], stats['memory_hits']), (1, 1))
+            self.assertEqual(restarted.stats()['disk_hits'], 1)
+
+            # Rewriting an entry replaces its bytes in the disk usage
+            for _ in range(3):
+                cache.put(key, document)
+            self.assertEqual(cache.stats()['disk_bytes'], cache._scan_disk_usage())
+
+    def test_extraction_cache_memory_budget(self):
+        """Test the memory tier evicts least recently used entries."""
+        cache = ExtractionCache(memory_bytes=300, disk_bytes=0)
+        for index in range(4):
+            cache.put(f"key{index}", {"content": "x" * 100})
+
+        self.assertIsNone(cache.get("key0"))
+        self.assertIsNotNone(cache.get("key3"))
+        self.assertLessEqual(cache.stats()['memory_bytes'], 300)
+
+    def test_repeat_upload_hits_cache(self):
+        """Test a repeated upload is served from the extraction cache."""
+        file_bytes = build_docx(["Repeated upload paragraph for caching."],
+                                [["Cell", "Value"]])
+        before = self.app.get('/evaluate/health').get_json()['extraction_cache']
+        for _ in range(2):
+            upload = {'file': (BytesIO(file_bytes), 'repeat.docx')}
+            response = self.app.post('/evaluate/test-file', data=upload)
+            self.assertEqual(response.status_code, 200)
+        after = self.app.get('/evaluate/health').get_json()['extraction_cache']
+
+        self.assertEqual(after['memory_hits'] - before['memory_hits'], 1)
+
+    def test_salvage_runs_across_chunks(self):
+        """Test salvage finds narrow and UTF-16 runs regardless of chunk size."""
+        file_bytes = (b"\x00\x01\xffHello world\xff\xfeab\x00\x01" +
+                      "Wide text here".encode('utf-16-le') +
+                      b"\x02\x03caf\xc3\xa9 time\x00")
+        expected = ["Hello world", "Wide text here", "caf\u00e9 time"]
+
+        for chunk_size in (3, 7, 16, 64 * 1024):
+            engine = BinarySalvageEngine(chunk_size=chunk_size)
+            self.assertEqual(list(engine.iter_runs(file_bytes)), expected)
+            self.assertEqual(list(engine.iter_runs(BytesIO(file_bytes))), expected)
+
+    def test_doc_upload_salvaged(self):
+        """Test legacy DOC uploads are salvaged from binary data."""
+        body = "Legacy word document body text.".encode('utf-16-le')
+        file_bytes = b"\xd0\xcf\x11\xe0" + b"\x00" * 512 + body + b"\x00" * 64
+        response = self.app.post('/evaluate/test-file',
+                                 data={'file': (BytesIO(file_bytes), 'legacy.doc')})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['content_preview'],
+                         "Legacy word document body text.")
+
+    def test_preflight_pdf(self):
+        """Test preflight reports PDF page count without extracting text."""
+        upload = {'file': (BytesIO(build_pdf(self.page_texts)), 'report.pdf')}
+        response = self.app.post('/evaluate/preflight', data=upload)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['metadata']['page_count'], 6)
+        self.assertGreater(data['metadata']['xref_length'], 0)
+        self.assertEqual(data['cost_class'], 'light')
+        self.assertTrue(data['accepted'])
+
+    def test_preflight_docx(self):
+        """Test preflight reads document.xml size from the zip directory."""
+        file_bytes = build_docx(["Preflight paragraph."], [["Cell", "Value"]])
+        response = self.app.post('/evaluate/preflight',
+                                 data={'file': (BytesIO(file_bytes), 'contract.docx')})
+
+        data = response.get_json()
+        self.assertEqual(data['byte_length'], len(file_bytes))
+        self.assertGreater(data['metadata']['document_xml_bytes'], 0)
+        self.assertIn('estimated_seconds', data)
+
+    def test_hashing_spool_spills(self):
+        """Test the ingestion spool hashes as it is written and spills to disk."""
+        file_bytes = build_pdf(self.page_texts)
+        for spill_bytes, spilled in ((len(file_bytes) * 2, False), (64, True)):
+            with HashingSpool(spill_bytes=spill_bytes) as spool:
+                for start in range(0, len(file_bytes), 100):
+                    spool.write(file_bytes[start:start + 100])
+                spool.seek(0)
+
+                self.assertEqual(spool.sha256, hashlib.sha256(file_bytes).hexdigest())
+                self.assertEqual(spool.path is not None, spilled)
+                self.assertEqual(bytes(spool.view()), file_bytes)
+                engine = PDFExtractionEngine(max_workers=1)
+                pages = engine.iter_pages(spool.path or spool.view())
+                self.assertEqual(len(list(pages)), 6)
+
+    def test_ingest_plain_stream(self):
+        """Test streams not parsed by IngestRequest are copied into a spool."""
+        spool = ingest_upload(BytesIO(b"plain upload bytes"))
+
+        self.assertIsInstance(spool, HashingSpool)
+        self.assertEqual(spool.read(), b"plain upload bytes")
+        self.assertEqual(spool.size, 18)
+
+# Size (characters) of the smaller fuzz input; every scanner is also run at
+# four times this
+REGEX_FUZZ_SIZE = int(os.environ.get("TG_REGEX_FUZZ_SIZE", "20000"))
+# Time allowed to grow when the input grows 4x: linear is ~4, quadratic ~16
+REGEX_FUZZ_MAX_GROWTH = 8.0
+
+def repeat_to(unit, size):
+    """Repeat unit to roughly size characters (or bytes)."""
+    return unit * max(1, size // len(unit))
+
+# Worst-case inputs per scanner: long runs that an unanchored or nested pattern
+# would rescan from every start position
+HOSTILE_INPUTS = {
+    "sdg_citations": [
+        lambda n: "(" + "1" * n,                    # Unclosed parenthesis, then digits
+        lambda n: repeat_to("(", n),                # Nothing but unclosed parentheses
+        lambda n: repeat_to("(1234", n),            # A year in every open parenthetical
+        lambda n: repeat_to("(a ", n) + ")",        # One close for every open
+        lambda n: "http://" + "a" * n,              # One endless URL
+        lambda n: repeat_to("https://", n),
+    ],
+    "document_context": [
+        lambda n: "a" + " " * n + "!",              # Sentence trimming over whitespace
+        lambda n: repeat_to("a ", n),               # One endless sentence
+        lambda n: repeat_to("a.", n),               # Nothing but short sentences
+        lambda n: repeat_to("could could be ", n),  # Failed multi-word lexicon phrases
+        lambda n: repeat_to("might ", n),
+    ],
+    "aie_features": [
+        lambda n: repeat_to("not is ", n),
+        lambda n: "x" * n,
+        lambda n: repeat_to("of course ", n),
+    ],
+    "cce": [
+        lambda n: repeat_to("it is possible. it is ", n),
+        lambda n: repeat_to("maybe definitely. ", n),
+    ],
+    "zfp": [
+        lambda n: "1" * n,                          # One long digit run
+        lambda n: "1" * n + "%",
+        lambda n: "$" + "1" * n,
+        lambda n: repeat_to("2019 ", n),            # Every token a year, on one line
+        lambda n: "2019" + " x" * (n // 2),         # One year before a long line
+        lambda n: repeat_to("2019" + " x" * 50 + "\n", n),
+        lambda n: "A" + "a" * n,                    # A proper name that never ends
+        lambda n: repeat_to("Aa ", n),
+        lambda n: "approximately " + "1" * n,       # A vague statistic missing its '%'
+        lambda n: repeat_to("approximately 1", n),
+        lambda n: repeat_to("studies show tha", n),
+    ],
+    "salvage": [
+        lambda n: b"a" * n,                         # One readable run
+        lambda n: repeat_to(b"a\x00", n),           # One UTF-16LE run
+        lambda n: repeat_to(b"abc\x00\x01", n),     # Runs just too short to keep
+    ],
+}
+
+class TestRegexPerformance(unittest.TestCase):
+    """Adversarial inputs for every regex-driven scanner in utils, timed for growth."""
+
+    def setUp(self):
+        aie = AssertionIntegrityEngine()
+        salvage = BinarySalvageEngine()
+        self.scanners = {
+            "sdg_citations": SourceDataGrappler().extract_citations,
+            "document_context": lambda text: DocumentContext(text).lexicon_matches,
+            "aie_features": lambda text: aie.feature_masks([text]),
+            "cce": ConfidenceComputationEngine().process,
+            "zfp": ZeroFabricationProtocol().process,
+            "salvage": lambda data: list(salvage.find_runs(data)),
+        }
+
+    def best_time(self, scanner, value):
+        timings = []
+        for _ in range(3):
+            started = time.perf_counter()
+            scanner(value)
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    def test_hostile_inputs_scale_linearly(self):
+        """Test match time grows at most linearly past the configured fuzz size."""
+        self.assertEqual(set(HOSTILE_INPUTS), set(self.scanners))
+        for name, generators in HOSTILE_INPUTS.items():
+            scanner = self.scanners[name]
+            for index, generate in enumerate(generators):
+                with self.subTest(scanner=name, input=index):
+                    small = self.best_time(scanner, generate(REGEX_FUZZ_SIZE))
+                    large = self.best_time(scanner, generate(4 * REGEX_FUZZ_SIZE))
+                    # A few milliseconds of slack keeps timer noise on tiny inputs
+                    # from failing the test
+                    self.assertLess(large, small * REGEX_FUZZ_MAX_GROWTH + 0.005,
+                                    f"{name} input {index}: "
+                                    f"{small:.4f}s -> {large:.4f}s")
+
+def tearDownModule():
+    state_dir.cleanup()
+
 if __name__ == '__main__':
     unittest.main()
@@ -4,85 +4,199 @@ Assertion Integrity Engine (AIE)
 Detects contradictions, redundancies, or unsupported claims.
 """
 
-from typing import List, Dict, Any
-import difflib
+from typing import List, Dict, Any, Optional, Tuple
 import re
 
+from .document_context import DocumentContext
+from .lexicon import LEXICONS, LexiconMatch
+from .similarity import SimilarityIndex
+
+WORD = re.compile(r'\w+')
+SimilarPairs = List[Tuple[int, int, float]]
+
+# Feature bits per assertion: for contradiction pattern k, bit 2k marks its
+# negative word and bit 2k+1 its positive word; built-in unsupported-claim
+# phrases take the bits from UNSUPPORTED_SHIFT upwards, and every lexicon
+# pack phrase shares the one bit after them, so masks fit a 64-bit integer
+# however large the packs are. Which pack phrases matched is kept alongside.
+NEGATIVE_BITS = 0x55
+UNSUPPORTED_SHIFT = 8
+PACK_UNSUPPORTED_BIT = 1 << (UNSUPPORTED_SHIFT + len(LEXICONS["unsupported"]))
+
 class AssertionIntegrityEngine:
-    def __init__(self):
+    def __init__(self, lexicon_packs: Optional[List[Any]] = None):
         self.name = "Assertion Integrity Engine"
         self.version = "1.0.0"
+        # Domain lexicon packs add unsupported-claim phrases on top of the built-in list
+        self.lexicon_packs = lexicon_packs
         self.contradiction_patterns = [
             (r'\bnot\b', r'\bis\b'),
             (r'\bfalse\b', r'\btrue\b'),
             (r'\bimpossible\b', r'\bpossible\b'),
             (r'\bnever\b', r'\balways\b'),
         ]
+        self.unsupported_patterns = [rf'\b{phrase}\b'
+                                     for phrase in LEXICONS["unsupported"]]
+        # Polarity patterns are single words, so a word lookup replaces the regexes
+        self.polarity_bits: Dict[str, int] = {}
+        for index, patterns in enumerate(self.contradiction_patterns):
+            for polarity, pattern in enumerate(patterns):
+                word = pattern.replace(r'\b', '')
+                bit = 1 << (2 * index + polarity)
+                self.polarity_bits[word] = self.polarity_bits.get(word, 0) | bit
+        self.unsupported_bits = {
+            phrase: 1 << (UNSUPPORTED_SHIFT + index)
+            for index, phrase in enumerate(LEXICONS["unsupported"])
+        }
+        self.contradiction_threshold = 0.6
+        self.redundancy_threshold = 0.85
+        self.similarity_index = SimilarityIndex(threshold=self.contradiction_threshold)
+    
+    def feature_masks(self, lowered: List[str],
+                      assertion_matches: Optional[List[List[LexiconMatch]]] = None
+                      ) -> List[int]:
+        """
+        Scan each lowercased assertion once into an integer feature bitmask.
+        Unsupported-claim phrases come from lexicon matches, scanned here when
+        the shared document scan is not supplied.
+        """
+        if assertion_matches is None:
+            assertion_matches = self.scan_assertions(lowered)
+        masks = []
+        for text, matches in zip(lowered, assertion_matches, strict=True):
+            mask = 0
+            for word in set(WORD.findall(text)):
+                mask |= self.polarity_bits.get(word, 0)
+            for match in matches:
+                if match.category == "unsupported":
+                    mask |= self.unsupported_bit(match.phrase)
+            masks.append(mask)
+        return masks
+    
+    def scan_assertions(self, lowered: List[str]) -> List[List[LexiconMatch]]:
+        """Lexicon matches per lowercased assertion, for callers without a document."""
+        return [DocumentContext(text, self.lexicon_packs).lexicon_matches
+                for text in lowered]
+
+    def unsupported_bit(self, phrase: str) -> int:
+        """Feature bit for an unsupported-claim phrase; all pack phrases share one."""
+        return self.unsupported_bits.get(phrase, PACK_UNSUPPORTED_BIT)
+
+    def pack_claims(self, assertion_matches: List[List[LexiconMatch]]
+                    ) -> List[List[str]]:
+        """Distinct pack unsupported-claim phrases per assertion, in match order."""
+        claims = []
+        for matches in assertion_matches:
+            phrases = [match.phrase for match in matches
+                       if match.category == "unsupported"
+                       and match.phrase not in self.unsupported_bits]
+            claims.append(list(dict.fromkeys(phrases)))
+        return claims
     
-    def detect_contradictions(self, assertions: List[str]) -> List[Dict[str, Any]]:
+    def contradiction_bits(self, mask1: int, mask2: int) -> int:
+        """Bit 2k is set when pattern k has opposing words across the two assertions."""
+        negative1, negative2 = mask1 & NEGATIVE_BITS, mask2 & NEGATIVE_BITS
+        positive1 = (mask1 >> 1) & NEGATIVE_BITS
+        positive2 = (mask2 >> 1) & NEGATIVE_BITS
+        return (negative1 & positive2) | (positive1 & negative2)
+    
+    def find_similar_pairs(self, lowered: List[str]) -> SimilarPairs:
+        """Score candidate pairs once; both detectors share the result."""
+        return self.similarity_index.similar_pairs(lowered)
+    
+    def detect_contradictions(self, assertions: List[str],
+                              lowered: Optional[List[str]] = None,
+                              similar_pairs: Optional[SimilarPairs] = None,
+                              masks: Optional[List[int]] = None
+                              ) -> List[Dict[str, Any]]:
         """Detect potential contradictions between assertions."""
         contradictions = []
+        lowered = lowered or [assertion.lower() for assertion in assertions]
+        if similar_pairs is None:
+            similar_pairs = self.find_similar_pairs(lowered)
+        if masks is None:
+            masks = self.feature_masks(lowered)
         
-        for i, assertion1 in enumerate(assertions):
-            for j, assertion2 in enumerate(assertions[i+1:], i+1):
-                similarity = difflib.SequenceMatcher(None, assertion1.lower(), assertion2.lower()).ratio()
-                
-                # Check for high similarity with opposing words
-                if similarity > 0.6:
-                    for neg_pattern, pos_pattern in self.contradiction_patterns:
-                        if (re.search(neg_pattern, assertion1.lower()) and re.search(pos_pattern, assertion2.lower())) or \
-                           (re.search(pos_pattern, assertion1.lower()) and re.search(neg_pattern, assertion2.lower())):
-                            contradictions.append({
-                                "type": "contradiction",
-                                "assertion1": assertion1[:100] + "..." if len(assertion1) > 100 else assertion1,
-                                "assertion2": assertion2[:100] + "..." if len(assertion2) > 100 else assertion2,
-                                "similarity": round(similarity, 3),
-                                "severity": "high"
-                            })
+        for i, j, similarity in similar_pairs:
+            # Check for high similarity with opposing words
+            if similarity <= self.contradiction_threshold:
+                continue
+            opposing = self.contradiction_bits(masks[i], masks[j])
+            if not opposing:
+                continue
+            assertion1, assertion2 = assertions[i], assertions[j]
+            # One issue per opposing pattern, as before
+            for _ in range(bin(opposing).count("1")):
+                contradictions.append({
+                    "type": "contradiction",
+                    "assertion1": (assertion1[:100] + "..." if len(assertion1) > 100
+                                   else assertion1),
+                    "assertion2": (assertion2[:100] + "..." if len(assertion2) > 100
+                                   else assertion2),
+                    "similarity": round(similarity, 3),
+                    "severity": "high"
+                })
         
         return contradictions
     
-    def detect_redundancies(self, assertions: List[str]) -> List[Dict[str, Any]]:
+    def detect_redundancies(self, assertions: List[str],
+                            lowered: Optional[List[str]] = None,
+                            similar_pairs: Optional[SimilarPairs] = None
+                            ) -> List[Dict[str, Any]]:
         """Detect redundant or highly similar assertions."""
         redundancies = []
+        if similar_pairs is None:
+            lowered = lowered or [assertion.lower() for assertion in assertions]
+            similar_pairs = self.find_similar_pairs(lowered)
         
-        for i, assertion1 in enumerate(assertions):
-            for j, assertion2 in enumerate(assertions[i+1:], i+1):
-                similarity = difflib.SequenceMatcher(None, assertion1.lower(), assertion2.lower()).ratio()
-                
-                if similarity > 0.85:  # High similarity threshold
-                    redundancies.append({
-                        "type": "redundancy",
-                        "assertion1": assertion1[:100] + "..." if len(assertion1) > 100 else assertion1,
-                        "assertion2": assertion2[:100] + "..." if len(assertion2) > 100 else assertion2,
-                        "similarity": round(similarity, 3),
-                        "severity": "medium"
-                    })
+        for i, j, similarity in similar_pairs:
+            if similarity > self.redundancy_threshold:  # High similarity threshold
+                assertion1, assertion2 = assertions[i], assertions[j]
+                redundancies.append({
+                    "type": "redundancy",
+                    "assertion1": (assertion1[:100] + "..." if len(assertion1) > 100
+                                   else assertion1),
+                    "assertion2": (assertion2[:100] + "..." if len(assertion2) > 100
+                                   else assertion2),
+                    "similarity": round(similarity, 3),
+                    "severity": "medium"
+                })
         
         return redundancies
     
-    def detect_unsupported_claims(self, content: str, assertions: List[str]) -> List[Dict[str, Any]]:
+    def detect_unsupported_claims(self, content: str, assertions: List[str],  # noqa: ARG002
+                                  lowered: Optional[List[str]] = None,
+                                  masks: Optional[List[int]] = None,
+                                  pack_claims: Optional[List[List[str]]] = None
+                                  ) -> List[Dict[str, Any]]:
         """Detect assertions that might be unsupported claims."""
         unsupported = []
         
-        unsupported_patterns = [
-            r'\bit is well known\b',
-            r'\beveryone knows\b',
-            r'\bobviously\b',
-            r'\bclearly\b',
-            r'\bof course\b',
-        ]
-        
-        for assertion in assertions:
-            for pattern in unsupported_patterns:
-                if re.search(pattern, assertion.lower()):
-                    unsupported.append({
-                        "type": "unsupported_claim",
-                        "assertion": assertion[:100] + "..." if len(assertion) > 100 else assertion,
-                        "pattern": pattern,
-                        "severity": "medium",
-                        "description": "Assertion uses language that may indicate unsupported claims"
-                    })
+        if masks is None or pack_claims is None:
+            lowered = lowered or [assertion.lower() for assertion in assertions]
+            assertion_matches = self.scan_assertions(lowered)
+            masks = self.feature_masks(lowered, assertion_matches)
+            pack_claims = self.pack_claims(assertion_matches)
+        for assertion, mask, phrases in zip(assertions, masks, pack_claims,
+                                            strict=True):
+            claim_bits = mask >> UNSUPPORTED_SHIFT
+            if not claim_bits:
+                continue
+            patterns = [pattern
+                        for index, pattern in enumerate(self.unsupported_patterns)
+                        if claim_bits >> index & 1]
+            if mask & PACK_UNSUPPORTED_BIT:
+                patterns += [rf'\b{phrase}\b' for phrase in phrases]
+            for pattern in patterns:
+                unsupported.append({
+                    "type": "unsupported_claim",
+                    "assertion": (assertion[:100] + "..." if len(assertion) > 100
+                                  else assertion),
+                    "pattern": pattern,
+                    "severity": "medium",
+                    "description": ("Assertion uses language that may indicate "
+                                    "unsupported claims")
+                })
         
         return unsupported
     
@@ -105,7 +219,8 @@ class AssertionIntegrityEngine:
         integrity_score = max(0.0, 1.0 - penalty_per_assertion)
         return integrity_score
     
-    def process(self, content: str, assertions: List[str]) -> Dict[str, Any]:
+    def process(self, content: str, assertions: List[str],
+                context: Optional[DocumentContext] = None) -> Dict[str, Any]:
         """Main processing function."""
         if not assertions:
             return {
@@ -118,9 +233,24 @@ class AssertionIntegrityEngine:
                 "status": "processed"
             }
         
-        contradictions = self.detect_contradictions(assertions)
-        redundancies = self.detect_redundancies(assertions)
-        unsupported_claims = self.detect_unsupported_claims(content, assertions)
+        # Each assertion is lowercased once, read from the shared lowercase view
+        context = context or DocumentContext(content, self.lexicon_packs)
+        lowered = context.lowered(assertions)
+
+        # Similarity is computed once, only for LSH candidate pairs
+        similar_pairs = self.find_similar_pairs(lowered)
+
+        # Features are scanned once per assertion and published for later modules
+        assertion_matches = context.assertion_matches(assertions)
+        masks = self.feature_masks(lowered, assertion_matches)
+        context.features["assertion_masks"] = dict(zip(assertions, masks, strict=True))
+
+        contradictions = self.detect_contradictions(assertions, lowered,
+                                                    similar_pairs, masks)
+        redundancies = self.detect_redundancies(assertions, lowered, similar_pairs)
+        unsupported_claims = self.detect_unsupported_claims(
+            content, assertions, lowered, masks, self.pack_claims(assertion_matches)
+        )
         
         all_issues = contradictions + redundancies + unsupported_claims
         integrity_score = self.calculate_integrity_score(all_issues, len(assertions))
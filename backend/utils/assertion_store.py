@@ -0,0 +1,289 @@
+"""
+Assertion Store
+Persistent cross-document index of certified assertions.
+"""
+
+import difflib
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from .aie import AssertionIntegrityEngine
+from .similarity import SimilarityIndex
+
+DEFAULT_STORE_PATH = os.path.join(tempfile.gettempdir(), "trustgraphed",
+                                  "assertions.db")
+
+# Stored assertions scored per query assertion, best band agreement first
+MAX_CANDIDATES = 20
+# Stored assertions sharing fewer LSH bands with a query are never scored; pairs
+# above the 0.6 ratio threshold share far more
+MIN_SHARED_BANDS = 2
+# Most recent stored assertions read from each band bucket per lookup
+MAX_BUCKET_ROWS = 64
+# SQLite's default limit on bound parameters is comfortably above this
+QUERY_CHUNK = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assertions (
+    id INTEGER PRIMARY KEY,
+    certificate_id TEXT NOT NULL,
+    normalized TEXT NOT NULL,
+    text_hash BLOB NOT NULL UNIQUE,
+    mask INTEGER NOT NULL,
+    signature BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bands (
+    band_key INTEGER NOT NULL,
+    assertion_id INTEGER NOT NULL,
+    PRIMARY KEY (band_key, assertion_id)
+) WITHOUT ROWID;
+"""
+
+
+def pack_signature(signature: Tuple[int, ...]) -> bytes:
+    """MinHash values as little-endian 16-bit words, as stored and band-hashed."""
+    return b"".join(value.to_bytes(2, "little") for value in signature)
+
+
+class PreparedAssertions(NamedTuple):
+    """Normalized text, band keys and packed signature per assertion."""
+    normalized: List[str]
+    band_keys: List[List[int]]
+    signatures: List[bytes]
+
+
+class AssertionStore:
+    """
+    SQLite-backed assertion index shared by every evaluation.
+
+    Assertions are stored normalized, with their AIE feature mask, MinHash
+    signature and the certificate that introduced them; an assertion already
+    stored is not stored again, so re-certifying a document leaves the index
+    unchanged. Signatures are taken over the polarity-neutral form (polarity
+    words removed), so an assertion and its negation land in the same LSH
+    buckets. Lookups only touch the band index, never the whole corpus, and
+    read at most MAX_BUCKET_ROWS entries of each bucket. Inserts run on a
+    single background writer so requests only pay for the lookup.
+    """
+
+    def __init__(self, path: Optional[str] = None,
+                 engine: Optional[AssertionIntegrityEngine] = None):
+        self.name = "Assertion Store"
+        self.version = "1.0.0"
+        self.path = path or os.environ.get("TG_ASSERTION_STORE_PATH",
+                                           DEFAULT_STORE_PATH)
+        self.engine = engine or AssertionIntegrityEngine()
+        self.index = SimilarityIndex(threshold=self.engine.contradiction_threshold)
+        self.polarity_words = set(self.engine.polarity_bits)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1,
+                                          thread_name_prefix="assertion-store")
+        self._pending: Optional[Future] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; the schema is created on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def normalize(self, assertion: str) -> str:
+        """Lowercase and collapse whitespace."""
+        return " ".join(assertion.lower().split())
+
+    def neutral_form(self, normalized: str) -> str:
+        """Normalized text without polarity words, so negations share signatures."""
+        return " ".join(word for word in normalized.split()
+                        if word.strip(".,;:!?\"'()") not in self.polarity_words)
+
+    def band_keys(self, signature: Tuple[int, ...]) -> List[int]:
+        """One signed 64-bit key per LSH band, as stored in the band index."""
+        rows = self.index.rows
+        keys = []
+        for band in range(self.index.bands):
+            band_values = signature[band * rows:(band + 1) * rows]
+            values = bytes([band]) + pack_signature(band_values)
+            digest = hashlib.blake2b(values, digest_size=8).digest()
+            keys.append(int.from_bytes(digest, "little", signed=True))
+        return keys
+
+    def prepare(self, assertions: List[str]) -> PreparedAssertions:
+        """Normalize and sign assertions once for both lookup and insert."""
+        normalized = [self.normalize(assertion) for assertion in assertions]
+        neutral = [self.neutral_form(text) for text in normalized]
+        signatures = self.index.signatures(neutral)
+        return PreparedAssertions(
+            normalized,
+            [self.band_keys(signature) for signature in signatures],
+            [pack_signature(signature) for signature in signatures]
+        )
+
+    def add(self, certificate_id: str, assertions: List[str], masks: List[int],
+            prepared: Optional[PreparedAssertions] = None) -> int:
+        """
+        Index a certified document's assertions in one transaction. Returns
+        how many were new; assertions already stored are skipped.
+        """
+        if not assertions:
+            return 0
+        normalized, keys, packed = prepared or self.prepare(assertions)
+        added = 0
+        connection = self._connection()
+        with self._write_lock, connection:
+            for text, mask, signature, band_keys in zip(normalized, masks, packed, keys,
+                                                        strict=True):
+                text_hash = hashlib.sha256(text.encode("utf-8")).digest()
+                cursor = connection.execute(
+                    "INSERT OR IGNORE INTO assertions "
+                    "(certificate_id, normalized, text_hash, mask, signature) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (certificate_id, text, text_hash, mask, signature)
+                )
+                if not cursor.rowcount:
+                    continue
+                connection.executemany(
+                    "INSERT OR IGNORE INTO bands (band_key, assertion_id) "
+                    "VALUES (?, ?)",
+                    [(key, cursor.lastrowid) for key in band_keys]
+                )
+                added += 1
+        return added
+
+    def _lookup_bands(self, keys: List[List[int]]) -> List[Counter]:
+        """Count shared bands between each query assertion and stored assertions."""
+        queries_by_key: Dict[int, List[int]] = defaultdict(list)
+        for query, band_keys in enumerate(keys):
+            for key in band_keys:
+                queries_by_key[key].append(query)
+
+        shared = [Counter() for _ in keys]
+        connection = self._connection()
+        # One index seek per bucket; a popular bucket costs no more than a rare one
+        for key, queries in queries_by_key.items():
+            rows = connection.execute(
+                "SELECT assertion_id FROM bands WHERE band_key = ? "
+                "ORDER BY assertion_id DESC LIMIT ?",
+                (key, MAX_BUCKET_ROWS)
+            )
+            for (assertion_id,) in rows:
+                for query in queries:
+                    shared[query][assertion_id] += 1
+        return shared
+
+    def _fetch(self, assertion_ids: List[int]) -> Dict[int, Tuple[str, str, int]]:
+        """Load (certificate_id, normalized, mask) for the given stored assertions."""
+        records = {}
+        connection = self._connection()
+        for start in range(0, len(assertion_ids), QUERY_CHUNK):
+            chunk = assertion_ids[start:start + QUERY_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = connection.execute(
+                "SELECT id, certificate_id, normalized, mask FROM assertions "
+                f"WHERE id IN ({placeholders})",
+                chunk
+            )
+            for assertion_id, certificate_id, text, mask in rows:
+                records[assertion_id] = (certificate_id, text, mask)
+        return records
+
+    def find_conflicts(self, assertions: List[str], masks: List[int],
+                       prepared: Optional[PreparedAssertions] = None
+                       ) -> List[Dict[str, Any]]:
+        """
+        Find stored assertions that a new document repeats or contradicts.
+
+        Candidates come from the band index and must share MIN_SHARED_BANDS
+        bands; each is confirmed with the same SequenceMatcher threshold and
+        polarity test AIE uses within a document.
+        """
+        if not assertions:
+            return []
+        normalized, keys, _ = prepared or self.prepare(assertions)
+        shared = self._lookup_bands(keys)
+
+        candidates = [[assertion_id
+                       for assertion_id, count in counts.most_common(MAX_CANDIDATES)
+                       if count >= MIN_SHARED_BANDS]
+                      for counts in shared]
+        records = self._fetch(sorted({assertion_id for ids in candidates
+                                      for assertion_id in ids}))
+
+        conflicts = []
+        threshold = self.engine.contradiction_threshold
+        matcher = difflib.SequenceMatcher(None)
+        for query, assertion_ids in enumerate(candidates):
+            # SequenceMatcher caches its analysis of the second sequence
+            matcher.set_seq2(normalized[query])
+            for assertion_id in assertion_ids:
+                certificate_id, stored_text, stored_mask = records[assertion_id]
+                matcher.set_seq1(stored_text)
+                # Cheap upper bounds rule most candidates out before the full ratio
+                if (matcher.real_quick_ratio() <= threshold
+                        or matcher.quick_ratio() <= threshold):
+                    continue
+                similarity = matcher.ratio()
+                if similarity <= threshold:
+                    continue
+                if self.engine.contradiction_bits(masks[query], stored_mask):
+                    conflict_type = "cross_document_contradiction"
+                elif similarity > self.engine.redundancy_threshold:
+                    conflict_type = "cross_document_duplicate"
+                else:
+                    continue
+                assertion = assertions[query]
+                conflicts.append({
+                    "type": conflict_type,
+                    "assertion": (assertion[:100] + "..." if len(assertion) > 100
+                                  else assertion),
+                    "stored_assertion": (stored_text[:100] + "..."
+                                         if len(stored_text) > 100 else stored_text),
+                    "certificate_id": certificate_id,
+                    "similarity": round(similarity, 3)
+                })
+        return conflicts
+
+    def record(self, certificate_id: str, assertions: List[str],
+               masks: List[int]) -> List[Dict[str, Any]]:
+        """Return conflicts with stored assertions, then queue the document's."""
+        if not assertions:
+            return []
+        prepared = self.prepare(assertions)
+        conflicts = self.find_conflicts(assertions, masks, prepared)
+        self._pending = self._writer.submit(self._add_logged, certificate_id,
+                                            assertions, masks, prepared)
+        return conflicts
+
+    def _add_logged(self, certificate_id: str, assertions: List[str], masks: List[int],
+                    prepared: PreparedAssertions) -> None:
+        """Background insert; failures are logged, as the request has returned."""
+        try:
+            self.add(certificate_id, assertions, masks, prepared)
+        except (sqlite3.Error, OverflowError, ValueError) as e:
+            print(f"Assertion store write failed for {certificate_id}: {str(e)}")
+
+    def flush(self) -> None:
+        """Wait until every queued insert has been written."""
+        # The writer is a single thread, so the latest insert finishes last
+        pending = self._pending
+        if pending is not None:
+            pending.result()
+
+    def stats(self) -> Dict[str, Any]:
+        """Report the number of stored assertions."""
+        # Rows are never deleted, so the largest id is the count without a table scan
+        connection = self._connection()
+        stored = connection.execute("SELECT MAX(id) FROM assertions").fetchone()[0]
+        return {"path": self.path, "assertions": stored or 0}
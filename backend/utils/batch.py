@@ -0,0 +1,107 @@
+"""
+Batch Evaluation
+Fans documents out over a persistent process pool running the analysis pipeline.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from .lexicon_pack import load_packs
+from .merkle import hash_text
+from .pipeline import Pipeline
+from .scoring_policy import default_store
+
+DEFAULT_MAX_ITEMS = 100
+
+# The analysis pipeline, built and warmed once per worker process
+_worker_pipeline: Optional[Pipeline] = None
+
+
+def _init_worker() -> None:
+    global _worker_pipeline
+    _worker_pipeline = Pipeline(load_packs(), default_store()).warm()
+
+
+def _analyze_item(content: str, content_assertion: str,
+                  needs_digest: bool) -> Dict[str, Any]:
+    """Analyze one document in a worker, hashing it too if extraction did not."""
+    analysis = _worker_pipeline.analyze(content, content_assertion)
+    analysis["content_digest"] = hash_text(content) if needs_digest else None
+    return analysis
+
+
+class BatchEvaluator:
+    """
+    Runs many documents through the analysis pipeline in parallel.
+
+    The regex and difflib stages are CPU-bound and hold the GIL, so
+    documents go to a pool of worker processes, created on first use and
+    kept for the life of the process. Workers are spawned rather than
+    forked, like the PDF extraction pool, and each builds and warms its own
+    Pipeline once when it starts. Results come back in input order,
+    with a failed document's exception in its place.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 max_items: Optional[int] = None):
+        self.name = "Batch Evaluator"
+        self.version = "1.0.0"
+        self.max_workers = (max_workers or int(os.environ.get("TG_BATCH_WORKERS", 0))
+                            or os.cpu_count() or 1)
+        self.max_items = max_items or int(os.environ.get("TG_BATCH_MAX_ITEMS",
+                                                         DEFAULT_MAX_ITEMS))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.counters = {"batches": 0, "documents": 0, "failures": 0,
+                         "pool_restarts": 0}
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker
+                )
+            return self._executor
+
+    def _discard_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Drop a pool whose worker died so the next batch starts a fresh one."""
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+                self.counters["pool_restarts"] += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def analyze(self, items: List[Tuple[str, str, bool]]) -> List[Any]:
+        """
+        Analyze (content, content_assertion, needs_digest) items; each result
+        is an analysis dict or the exception that document raised.
+        """
+        if len(items) > self.max_items:
+            raise ValueError(f"A batch holds at most {self.max_items} documents")
+        pool = self._pool()
+        futures = [pool.submit(_analyze_item, *item) for item in items]
+
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except BrokenProcessPool as e:
+                self._discard_pool(pool)
+                results.append(e)
+            except Exception as e:
+                results.append(e)
+        self.counters["batches"] += 1
+        self.counters["documents"] += len(items)
+        self.counters["failures"] += sum(isinstance(result, Exception)
+                                         for result in results)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {"workers": self.max_workers, "max_items": self.max_items,
+                **self.counters}
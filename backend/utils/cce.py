@@ -3,29 +3,51 @@ TrustGraphed Confidence Computation Engine (CCE)
 Consolidated scoring logic with rule-based penalties and assertion type weighting
 """
 
-import re
 import string
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+from .document_context import DocumentContext, Span
+from .lexicon import LEXICONS, LexiconMatch
+
+# ========== ASSERTION TYPE TRANSPARENCY MULTIPLIERS ==========
+TRANSPARENCY_MULTIPLIERS = {
+    "original": 1.0,     # Standard evaluation 
+    "ai": 1.10,          # 10% BONUS for transparent AI declaration
+    "copied": 1.10,      # 10% BONUS for transparent copied content declaration
+    "mixed": 1.15,       # 15% BONUS for transparent mixed sources declaration  
+    "unsure": 0.70       # 30% PENALTY for undeclared content - encourages transparency
+}
+DEFAULT_TRANSPARENCY_MULTIPLIER = 0.80
+
+# Trust bands, lowest first; a score at or above a threshold moves up one band
+BAND_THRESHOLDS = (25, 50, 75)
+TRUST_BANDS = ("Unverified", "Low Trust", "Verified", "High Trust")
+TRUST_LEVELS = ("VERY LOW", "LOW", "MEDIUM", "HIGH")
 
 class ConfidenceComputationEngine:
-    def __init__(self):
+    def __init__(self, lexicon_packs: Optional[List[Any]] = None):
+        # Domain lexicon packs add markers on top of the built-in lists
+        self.lexicon_packs = lexicon_packs
         # Uncertainty markers that suggest low confidence
-        self.uncertainty_markers = [
-            'might', 'maybe', 'possibly', 'could be', 'seems like', 'appears to',
-            'suggests', 'indicates', 'likely', 'probably', 'perhaps', 'allegedly',
-            'reportedly', 'supposedly', 'presumably', 'potentially', 'may be',
-            'seems to', 'appears that', 'it is possible', 'it is likely',
-            'some say', 'some believe', 'it is claimed', 'rumored', 'speculated'
-        ]
+        self.uncertainty_markers = LEXICONS["uncertainty"]
 
         # High confidence markers
-        self.confidence_markers = [
-            'definitely', 'certainly', 'clearly', 'obviously', 'undoubtedly',
-            'unquestionably', 'absolutely', 'precisely', 'exactly', 'specifically',
-            'confirmed', 'verified', 'proven', 'established', 'documented'
-        ]
-
-    def process(self, content: str, assertions: List[str] = None, citations: List[str] = None) -> Dict[str, Any]:
+        self.confidence_markers = LEXICONS["confidence"]
+
+        # Columns of the assertion feature matrix: built-in categories, then any
+        # a pack adds
+        self.feature_categories = list(LEXICONS)
+        for pack in lexicon_packs or ():
+            self.feature_categories += [c for c in pack.categories
+                                        if c not in self.feature_categories]
+        self.category_columns = {category: column for column, category
+                                 in enumerate(self.feature_categories)}
+
+    def process(self, content: str, assertions: List[str] = None,
+                citations: List[str] = None,
+                context: Optional[DocumentContext] = None) -> Dict[str, Any]:
         """
         Main processing method for confidence computation.
         """
@@ -33,12 +55,20 @@ class ConfidenceComputationEngine:
             assertions = []
         if citations is None:
             citations = []
+        context = context or DocumentContext(content, self.lexicon_packs)
+
+        # Markers come from the document's single lexicon scan
+        confidence_signals = self._extract_confidence_signals(context.lexicon_matches)
 
-        # Extract confidence signals
-        confidence_signals = self._extract_confidence_signals(content)
+        # One row of distinct-marker counts per assertion, shared with later stages
+        features = self.feature_matrix(assertions, context)
+        context.features["assertion_feature_matrix"] = {
+            "categories": self.feature_categories,
+            "matrix": features
+        }
 
         # Analyze assertion confidence
-        assertion_confidence = self._analyze_assertion_confidence(assertions)
+        assertion_confidence = self._analyze_assertion_confidence(features)
 
         # Calculate overall confidence score
         overall_confidence = self._calculate_overall_confidence(
@@ -48,37 +78,33 @@ class ConfidenceComputationEngine:
         return {
             'overall_confidence': overall_confidence,
             'confidence_signals': confidence_signals,
-            'assertion_confidence': assertion_confidence,
-            'high_confidence_count': len([a for a in assertion_confidence if a > 0.7]),
-            'low_confidence_count': len([a for a in assertion_confidence if a < 0.4]),
+            'assertion_confidence': assertion_confidence.tolist(),
+            'high_confidence_count': int(np.count_nonzero(assertion_confidence > 0.7)),
+            'low_confidence_count': int(np.count_nonzero(assertion_confidence < 0.4)),
             'uncertainty_markers_found': confidence_signals.get('uncertainty_count', 0),
             'confidence_markers_found': confidence_signals.get('confidence_count', 0)
         }
 
-    def _extract_confidence_signals(self, content: str) -> Dict[str, Any]:
-        """Extract confidence-related signals from content."""
-        content_lower = content.lower()
+    def _count_markers(self, matches: List[LexiconMatch], category: str) -> int:
+        """Number of distinct markers of a category present."""
+        return len({match.phrase for match in matches if match.category == category})
+
+    def _extract_confidence_signals(self, matches: List[LexiconMatch]
+                                    ) -> Dict[str, Any]:
+        """Extract confidence-related signals from the document's lexicon matches."""
 
         # Count uncertainty markers
-        uncertainty_count = sum(1 for marker in self.uncertainty_markers 
-                               if marker in content_lower)
+        uncertainty_count = self._count_markers(matches, "uncertainty")
 
         # Count confidence markers
-        confidence_count = sum(1 for marker in self.confidence_markers 
-                              if marker in content_lower)
+        confidence_count = self._count_markers(matches, "confidence")
 
         # Calculate confidence ratio
         total_markers = uncertainty_count + confidence_count
         confidence_ratio = confidence_count / total_markers if total_markers > 0 else 0.5
 
         # Analyze hedging language
-        hedging_patterns = [
-            r'\bmight\s+be\b', r'\bcould\s+be\b', r'\bmay\s+be\b',
-            r'\bseems?\s+to\b', r'\bappears?\s+to\b', r'\btends?\s+to\b'
-        ]
-
-        hedging_count = sum(len(re.findall(pattern, content_lower)) 
-                           for pattern in hedging_patterns)
+        hedging_count = sum(1 for match in matches if match.category == "hedging")
 
         return {
             'uncertainty_count': uncertainty_count,
@@ -88,44 +114,81 @@ class ConfidenceComputationEngine:
             'total_markers': total_markers
         }
 
-    def _analyze_assertion_confidence(self, assertions: List[str]) -> List[float]:
-        """Analyze confidence level of individual assertions."""
-        confidence_scores = []
-
-        for assertion in assertions:
-            assertion_lower = assertion.lower()
-
-            # Check for uncertainty markers
-            uncertainty_score = sum(1 for marker in self.uncertainty_markers 
-                                  if marker in assertion_lower)
-
-            # Check for confidence markers
-            confidence_score = sum(1 for marker in self.confidence_markers 
-                                 if marker in assertion_lower)
-
-            # Base confidence (neutral)
-            base_confidence = 0.6
-
-            # Adjust based on markers
-            if uncertainty_score > 0:
-                base_confidence -= (uncertainty_score * 0.15)
-            if confidence_score > 0:
-                base_confidence += (confidence_score * 0.2)
-
-            # Clamp between 0 and 1
-            final_confidence = max(0.0, min(1.0, base_confidence))
-            confidence_scores.append(final_confidence)
+    def feature_matrix(self, assertions: List[str],
+                       context: DocumentContext) -> np.ndarray:
+        """
+        Count distinct markers per category for each assertion.
 
-        return confidence_scores
+        Assertions taken from the document are filled in from its single
+        lexicon scan: match offsets are bucketed into assertion spans with one
+        searchsorted, and repeated (span, category, phrase) triples are
+        dropped before counting. Anything not found in the document is
+        scanned on its own.
+        """
+        matrix = np.zeros((len(assertions), len(self.feature_categories)),
+                          dtype=np.int32)
+        spans = [context.span_of(assertion) for assertion in assertions]
+
+        for row, (assertion, span) in enumerate(zip(assertions, spans, strict=True)):
+            if span is None:
+                matches = context.assertion_matches([assertion])[0]
+                for category, _ in {(m.category, m.phrase) for m in matches}:
+                    if category in self.category_columns:
+                        matrix[row, self.category_columns[category]] += 1
+
+        found = [row for row, span in enumerate(spans) if span is not None]
+        if found:
+            distinct = sorted({spans[row] for row in found})
+            span_rows = {span: row for row, span in enumerate(distinct)}
+            counts = self._span_counts(distinct, context)
+            matrix[found] = counts[[span_rows[spans[row]] for row in found]]
+        return matrix
+
+    def _span_counts(self, spans: List[Span], context: DocumentContext) -> np.ndarray:
+        """Distinct-marker counts for sorted, non-overlapping spans of the document."""
+        width = len(self.feature_categories)
+        counts = np.zeros(len(spans) * width, dtype=np.int32)
+        matches = [match for match in context.lexicon_matches
+                   if match.category in self.category_columns]
+        if spans and matches:
+            starts, ends, categories, phrases = zip(*matches, strict=True)
+            # Each distinct (category, phrase) marker gets an id; its column is
+            # looked up by id
+            marker_ids: Dict[tuple, int] = {}
+            markers = np.array([marker_ids.setdefault(marker, len(marker_ids))
+                                for marker in zip(categories, phrases, strict=True)])
+            marker_columns = np.array([self.category_columns[category]
+                                       for category, _ in marker_ids])
+
+            span_starts = np.array([start for start, _ in spans])
+            span_ends = np.array([end for _, end in spans])
+            rows = np.searchsorted(span_starts, np.array(starts), side='right') - 1
+            inside = (rows >= 0) & (np.array(ends) <= span_ends[np.maximum(rows, 0)])
+
+            # Count each marker once per span
+            keys = np.unique(rows[inside] * len(marker_ids) + markers[inside])
+            marker_count = len(marker_ids)
+            cells = keys // marker_count * width + marker_columns[keys % marker_count]
+            counts = np.bincount(cells, minlength=len(counts)).astype(np.int32)
+        return counts.reshape(len(spans), width)
+
+    def _analyze_assertion_confidence(self, features: np.ndarray) -> np.ndarray:
+        """Analyze confidence level of individual assertions from their feature rows."""
+        uncertainty = features[:, self.category_columns["uncertainty"]]
+        confidence = features[:, self.category_columns["confidence"]]
+
+        # Neutral 0.6, down for uncertainty markers, up for confidence markers,
+        # clamped to [0, 1]
+        return np.clip(0.6 - uncertainty * 0.15 + confidence * 0.2, 0.0, 1.0)
 
     def _calculate_overall_confidence(self, signals: Dict[str, Any], 
-                                    assertion_confidence: List[float], 
+                                    assertion_confidence: np.ndarray, 
                                     citation_count: int) -> float:
         """Calculate overall confidence score."""
-        if not assertion_confidence:
+        if not len(assertion_confidence):
             base_confidence = 0.5
         else:
-            base_confidence = sum(assertion_confidence) / len(assertion_confidence)
+            base_confidence = float(assertion_confidence.mean())
 
         # Adjust for uncertainty markers
         uncertainty_penalty = min(signals['uncertainty_count'] * 0.05, 0.3)
@@ -234,15 +297,8 @@ def compute_trust_score(signals: dict, assertion_type: str = "unsure") -> dict:
         breakdown["trapdoor_applied"] = True
 
     # ========== ASSERTION TYPE TRANSPARENCY MULTIPLIERS ==========
-    transparency_multipliers = {
-        "original": 1.0,     # Standard evaluation 
-        "ai": 1.10,          # 10% BONUS for transparent AI declaration
-        "copied": 1.10,      # 10% BONUS for transparent copied content declaration
-        "mixed": 1.15,       # 15% BONUS for transparent mixed sources declaration  
-        "unsure": 0.70       # 30% PENALTY for undeclared content - encourages transparency
-    }
-
-    transparency_multiplier = transparency_multipliers.get(assertion_type.lower(), 0.80)
+    transparency_multiplier = TRANSPARENCY_MULTIPLIERS.get(assertion_type.lower(),
+                                                           DEFAULT_TRANSPARENCY_MULTIPLIER)
     breakdown["transparency_multiplier"] = transparency_multiplier
 
     # Apply transparency multiplier
@@ -253,18 +309,9 @@ def compute_trust_score(signals: dict, assertion_type: str = "unsure") -> dict:
     breakdown["final_score"] = final_score
 
     # ========== TRUST BAND CLASSIFICATION ==========
-    if final_score >= 75:
-        band = "High Trust"
-        trust_level = "HIGH"
-    elif final_score >= 50:
-        band = "Verified" 
-        trust_level = "MEDIUM"
-    elif final_score >= 25:
-        band = "Low Trust"
-        trust_level = "LOW"
-    else:
-        band = "Unverified"
-        trust_level = "VERY LOW"
+    band_index = sum(final_score >= threshold for threshold in BAND_THRESHOLDS)
+    band = TRUST_BANDS[band_index]
+    trust_level = TRUST_LEVELS[band_index]
 
     # ========== GENERATE INSIGHTS ==========
     insights = []
@@ -288,7 +335,7 @@ def compute_trust_score(signals: dict, assertion_type: str = "unsure") -> dict:
         insights.append("🚨 TRANSPARENCY MISMATCH: High AI characteristics detected but claimed as original")
 
     # Trapdoor insights
-    if breakdown["trapdoor_applied"]:
+    if breakdown.get("trapdoor_applied"):
         insights.append("⛔ TRAPDOOR ACTIVATED: Critical trust factors missing - score capped")
 
     # Overall score insight
@@ -307,6 +354,111 @@ def compute_trust_score(signals: dict, assertion_type: str = "unsure") -> dict:
         "scoring_method": "Rule-based with transparency weighting and fabrication trapdoors"
     }
 
+def _category_codes(values: np.ndarray, limit: int = 32):
+    """Distinct values and per-row codes of a low-cardinality column."""
+    # One equality pass per distinct value beats sorting millions of strings
+    codes = np.zeros(values.shape, dtype=np.int64)
+    assigned = np.zeros(values.shape, dtype=bool)
+    distinct = []
+    while not assigned.all():
+        if len(distinct) == limit:
+            distinct, codes = np.unique(values, return_inverse=True)
+            return [str(value) for value in distinct], codes.reshape(-1)
+        value = values[np.argmin(assigned)]
+        hit = values == value
+        codes[hit] = len(distinct)
+        assigned |= hit
+        distinct.append(str(value))
+    return distinct, codes
+
+def compute_trust_scores_batch(assertions, citations, contradictions, author_detected,
+                               ai_likelihood, assertion_type,
+                               policy=None) -> Dict[str, np.ndarray]:
+    """
+    Vectorized trust scoring for rescoring stored signals in bulk.
+
+    Parameters are equal-length columns of the signals compute_trust_score
+    reads: assertion, citation and contradiction counts, author flags, AI
+    likelihoods and declared assertion types. The rules, caps, trapdoors
+    and bands of a ScoringPolicy (the default policy, which matches
+    compute_trust_score, unless one is given) are applied to every row at once.
+
+    Returns:
+        dict: {final_score, band, trust_level, trapdoor_applied} arrays
+    """
+    from .scoring_policy import default_policy
+    policy = policy or default_policy()
+    dtype = np.int64 if policy.integral else np.float64
+
+    assertions = np.asarray(assertions, dtype=np.int64)
+    citations = np.asarray(citations, dtype=np.int64)
+    contradictions = np.asarray(contradictions, dtype=np.int64)
+    author_detected = np.asarray(author_detected, dtype=bool)
+    ai_likelihood = np.asarray(ai_likelihood, dtype=np.float64)
+
+    # Declared types repeat heavily, so rules are looked up per distinct value
+    declared, type_index = _category_codes(np.asarray(assertion_type, dtype=str))
+    rules = [policy.declarations.get(value.lower(), policy.unknown_declaration)
+             for value in declared]
+    claims_original = np.array([rule.claims_original for rule in rules],
+                               dtype=bool)[type_index]
+    uncited_caps = np.array([policy.uncited_cap if rule.uncited_cap is None
+                             else rule.uncited_cap for rule in rules],
+                            dtype=dtype)[type_index]
+    multipliers = [rule.multiplier for rule in rules]
+
+    citation_points = np.array(policy.citation_points, dtype=dtype)
+    base_score = np.full(assertions.shape, policy.base_score, dtype=dtype)
+    assertion_points = np.minimum(assertions * policy.assertion_points,
+                                  policy.assertion_max_points)
+    base_score += np.where(assertions > 0, assertion_points, 0).astype(dtype)
+    citation_index = np.clip(citations, 0, len(citation_points) - 1)
+    base_score += np.where(citations > 0, citation_points[citation_index], 0)
+    base_score += np.where(author_detected, policy.author_bonus, 0).astype(dtype)
+    contradiction_penalty = np.minimum(contradictions * policy.contradiction_penalty,
+                                       policy.contradiction_max_penalty)
+    base_score -= np.where(contradictions > 0, contradiction_penalty, 0).astype(dtype)
+
+    mismatch = claims_original & (ai_likelihood > policy.mismatch_threshold)
+    mismatch_penalty = (ai_likelihood * policy.mismatch_scale).astype(np.int64)
+    base_score -= np.where(mismatch, mismatch_penalty, 0).astype(dtype)
+
+    # Trapdoors cap rather than subtract
+    uncited = (citations == 0) & ~author_detected
+    base_score = np.where(uncited, np.minimum(base_score, uncited_caps), base_score)
+    overclaimed = claims_original & (ai_likelihood > policy.overclaim_threshold)
+    base_score = np.where(overclaimed, np.minimum(base_score, policy.overclaim_cap),
+                          base_score)
+
+    # np.round is not correctly rounded (53 * 1.15 gives 61.0, round() gives
+    # 60.9), so each distinct (base score, declared type) pair is scored once
+    # with round() and looked up
+    if policy.integral:
+        lowest = int(base_score.min(initial=0))
+        keys = (base_score - lowest) * len(multipliers) + type_index
+        types = len(multipliers)
+        products = [(lowest + key // types) * multipliers[key % types]
+                    for key in range(int(keys.max(initial=-1)) + 1)]
+    else:
+        products, keys = np.unique(base_score * np.array(multipliers)[type_index],
+                                   return_inverse=True)
+        products = products.tolist()
+    scores = np.array([max(0, min(100, round(product, 1))) for product in products],
+                      dtype=np.float64)
+    final_score = scores[keys.reshape(-1)]
+
+    # Bands from lowest to highest; scores below every minimum fall in the lowest
+    bands = policy.bands[::-1]
+    minimums = [band.min_score for band in bands]
+    band_index = np.maximum(np.searchsorted(minimums, final_score, side='right') - 1, 0)
+
+    return {
+        "final_score": final_score,
+        "band": np.array([band.band for band in bands])[band_index],
+        "trust_level": np.array([band.trust_level for band in bands])[band_index],
+        "trapdoor_applied": uncited | overclaimed
+    }
+
 # Legacy function name for backward compatibility
 def compute_confidence_score(signals: dict, assertion_type: str = "unsure") -> dict:
     """Backward compatibility wrapper for compute_trust_score."""
@@ -5,19 +5,56 @@ Creates trust certificates and readable summaries.
 
 import uuid
 from datetime import datetime
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Optional
+
+from .merkle import hash_text
 
 class CertificateGenerator:
-    def __init__(self):
+    def __init__(self, signer: Optional[Any] = None,
+                 is_issued: Optional[Callable[[str], bool]] = None):
         self.name = "Certificate Generator"
         self.version = "1.0.0"
+        # A BatchSigner shared across requests; without one certificates are
+        # left unsigned
+        self.signer = signer
+        # IDs are only 32 bits, so new ones are checked against the certificate store
+        self.is_issued = is_issued
 
     def generate_certificate_id(self) -> str:
         """Generate a unique certificate ID."""
-        return f"TG_{uuid.uuid4().hex[:8].upper()}"
+        while True:
+            certificate_id = f"TG_{uuid.uuid4().hex[:8].upper()}"
+            if self.is_issued is None or not self.is_issued(certificate_id):
+                return certificate_id
+
+    def full_scope(self, content: str) -> Dict[str, Any]:
+        """Scope of an evaluation that covered the whole document."""
+        return {
+            "page_range": None,
+            "requested_page_range": None,
+            "pages_evaluated": None,
+            "total_pages": None,
+            "max_chars": None,
+            "characters_evaluated": len(content),
+            "truncated": False
+        }
+
+    def create_certificate(self, content: str, trust_result: Dict[str, Any],
+                           evaluation_scope: Optional[Dict[str, Any]] = None,
+                           content_digest: Optional[Dict[str, Any]] = None
+                           ) -> Dict[str, Any]:
+        """
+        Create a trust certificate recording exactly which part of the document
+        was evaluated.
+
+        content_digest is the hash and Merkle tree built while the content was
+        extracted; without one the content is hashed here in fixed-size chunks.
+        """
+        if content_digest is None:
+            content_digest = hash_text(content)
+        elif content_digest["characters"] != len(content):
+            raise ValueError("Content digest does not cover the evaluated content")
 
-    def create_certificate(self, content: str, trust_result: Dict[str, Any]) -> Dict[str, Any]:
-        """Create a trust certificate."""
         certificate_id = self.generate_certificate_id()
         timestamp = datetime.utcnow().isoformat() + "Z"
 
@@ -32,8 +69,11 @@ class CertificateGenerator:
                 "version": "1.0",
                 "issued_at": timestamp,
                 "issuer": "TrustGraphed v1.0.0",
-                "content_hash": f"SHA256_{hash(content) % 1000000:06d}",  # Mock hash
-                "content_length": len(content)
+                "content_hash": f"SHA256_{content_digest['sha256']}",
+                "content_merkle": content_digest["merkle"],
+                "content_length": len(content),
+                "evaluation_scope": evaluation_scope or self.full_scope(content),
+                "scoring_policy": trust_result.get('scoring_policy')
             },
             "trust_evaluation": {
                 "overall_trust_score": trust_score,
@@ -54,10 +94,13 @@ class CertificateGenerator:
             "validity": {
                 "valid_from": timestamp,
                 "expires_at": None,  # Certificates don't expire in this demo
-                "signature": f"TG_SIG_{certificate_id}"  # Mock signature
+                "signature": None
             }
         }
 
+        if self.signer is not None:
+            certificate["validity"]["signature"] = self.signer.sign(certificate)
+
         return certificate
 
     def format_readable_summary(self, certificate: Dict[str, Any]) -> str:
@@ -79,9 +122,12 @@ This certificate validates that the analyzed content has been processed through
 
         return summary
 
-    def process(self, content: str, trust_result: Dict[str, Any]) -> Dict[str, Any]:
+    def process(self, content: str, trust_result: Dict[str, Any],
+                evaluation_scope: Optional[Dict[str, Any]] = None,
+                content_digest: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Main processing function."""
-        certificate = self.create_certificate(content, trust_result)
+        certificate = self.create_certificate(content, trust_result, evaluation_scope,
+                                              content_digest)
         readable_summary = self.format_readable_summary(certificate)
 
         return {
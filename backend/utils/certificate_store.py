@@ -0,0 +1,553 @@
+"""
+Certificate Store
+Append-only certificate log with a memory-mapped hash index by certificate ID.
+
+The log (certificates.log) holds every issued certificate as a record of
+(id, length, crc32) followed by its JSON. The index (certificates.idx) is
+an open-addressing hash table of fixed-width slots mapping the 32-bit
+number in a TG_XXXXXXXX ID to its record's offset, so a lookup is one probe
+sequence over mapped memory and one read from the log, however many
+certificates are stored. Rebuild the index from the log with:
+
+    python -m utils.certificate_store --rebuild
+"""
+
+import argparse
+import fcntl
+import json
+import mmap
+import os
+import queue
+import re
+import struct
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_STORE_DIR = os.path.join(tempfile.gettempdir(), "trustgraphed",
+                                 "certificates")
+DEFAULT_CAPACITY = 1 << 16
+# The index doubles before more than half of its slots are taken
+MAX_LOAD = 0.5
+
+CERTIFICATE_ID = re.compile(r"TG_([0-9A-F]{8})")
+
+LOG_MAGIC = b"TGCLOG1\n"
+# id number, payload length, crc32 of payload
+RECORD_HEADER = struct.Struct("<III")
+INDEX_MAGIC = b"TGCIDX1\0"
+# magic, capacity, count, log bytes indexed, retired
+INDEX_HEADER = struct.Struct("<8sQQQQ")
+INDEX_HEADER_BYTES = 64
+# id number, payload length, log offset (0 = empty)
+SLOT = struct.Struct("<IIQ")
+SLOT_DTYPE = np.dtype([("id", "<u4"), ("length", "<u4"), ("offset", "<u8")])
+
+# Fibonacci hashing spreads IDs over the table even if they stop being random
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+MASK64 = (1 << 64) - 1
+
+
+def id_number(certificate_id: str) -> Optional[int]:
+    """The 32-bit number in a certificate ID, or None if not a TG_XXXXXXXX ID."""
+    match = CERTIFICATE_ID.fullmatch(certificate_id or "")
+    return int(match.group(1), 16) if match else None
+
+
+def _home_slot(number: int, bits: int) -> int:
+    return ((number * HASH_MULTIPLIER) & MASK64) >> (64 - bits)
+
+
+def _home_slots(numbers: np.ndarray, bits: int) -> np.ndarray:
+    hashed = numbers.astype(np.uint64) * np.uint64(HASH_MULTIPLIER)
+    return hashed >> np.uint64(64 - bits)
+
+
+def _place(slots: np.ndarray, numbers: np.ndarray, lengths: np.ndarray,
+           offsets: np.ndarray) -> None:
+    """
+    Insert entries with linear probing, all at once: each round, every entry
+    still waiting claims its current slot if it is free and no earlier entry
+    claims it too; the rest move one slot along.
+    """
+    bits = len(slots).bit_length() - 1
+    mask = np.uint64(len(slots) - 1)
+    position = _home_slots(numbers, bits)
+    waiting = np.arange(len(numbers))
+    while waiting.size:
+        candidates = position[waiting]
+        free = slots["offset"][candidates] == 0
+        claimed, first = np.unique(candidates[free], return_index=True)
+        winners = waiting[free][first]
+        slots["id"][claimed] = numbers[winners]
+        slots["length"][claimed] = lengths[winners]
+        slots["offset"][claimed] = offsets[winners]
+        placed = np.zeros(len(numbers), dtype=bool)
+        placed[winners] = True
+        waiting = waiting[~placed[waiting]]
+        position[waiting] = (position[waiting] + np.uint64(1)) & mask
+
+
+class _Index:
+    """
+    One mapping of the index file.
+
+    Users pin the mapping while they read it. Once it is retired (replaced
+    by a newer mapping) it can no longer be pinned, and it is closed when
+    the last user lets go.
+    """
+
+    def __init__(self, path: str):
+        # Held for the mapping's lifetime rather than a with block
+        self.file = open(path, "r+b")  # noqa: SIM115
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        magic, self.capacity, _, _, _ = INDEX_HEADER.unpack_from(self.map, 0)
+        if magic != INDEX_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a certificate index")
+        self.bits = self.capacity.bit_length() - 1
+        self.slots = np.frombuffer(self.map, dtype=SLOT_DTYPE, count=self.capacity,
+                                   offset=INDEX_HEADER_BYTES)
+        self._users = 0
+        self._retired = False
+        self._users_lock = threading.Lock()
+
+    def pin(self) -> bool:
+        """Keep the mapping open until unpin(); False once it has been retired."""
+        with self._users_lock:
+            if self._retired:
+                return False
+            self._users += 1
+            return True
+
+    def unpin(self) -> None:
+        with self._users_lock:
+            self._users -= 1
+            if self._retired and not self._users:
+                self.close()
+
+    def retire(self) -> None:
+        """Close the mapping now, or when its last user unpins it."""
+        with self._users_lock:
+            self._retired = True
+            if not self._users:
+                self.close()
+
+    def close(self) -> None:
+        # The slot array holds the mapping's buffer, so it is released first
+        self.slots = None
+        self.map.close()
+        self.file.close()
+
+    @staticmethod
+    def create(path: str, capacity: int) -> None:
+        with open(path, "wb") as index_file:
+            header = INDEX_HEADER.pack(INDEX_MAGIC, capacity, 0, len(LOG_MAGIC), 0)
+            index_file.write(header.ljust(INDEX_HEADER_BYTES, b"\0"))
+            index_file.truncate(INDEX_HEADER_BYTES + capacity * SLOT_DTYPE.itemsize)
+
+    def header(self) -> Tuple[int, int, int]:
+        """(count, log bytes indexed, retired)."""
+        _, _, count, indexed, retired = INDEX_HEADER.unpack_from(self.map, 0)
+        return count, indexed, retired
+
+    def set_header(self, count: int, indexed: int, retired: int = 0) -> None:
+        INDEX_HEADER.pack_into(self.map, 0, INDEX_MAGIC, self.capacity, count,
+                               indexed, retired)
+
+    def sync_header(self) -> None:
+        """Write the header page back to the file."""
+        self.map.flush(0, min(mmap.PAGESIZE, len(self.map)))
+
+    def probe(self, number: int) -> Optional[Tuple[int, int]]:
+        """(offset, length) of the record for number, or None."""
+        mask = self.capacity - 1
+        slot = _home_slot(number, self.bits)
+        while True:
+            found, length, offset = SLOT.unpack_from(
+                self.map, INDEX_HEADER_BYTES + slot * SLOT.size
+            )
+            if offset == 0:
+                return None
+            if found == number:
+                return offset, length
+            slot = (slot + 1) & mask
+
+
+class CertificateStore:
+    """
+    Durable, append-only store of issued certificates.
+
+    append() queues a certificate and returns once it is on disk. A
+    background thread per process commits whatever has queued as one
+    group: a single write and fsync of the log, then the index slots, all
+    under an exclusive file lock so several worker processes can share one
+    store. The index is derived data; records past the point it covers
+    (left by a crash) are replayed on the next commit, and a torn record at
+    the end of the log is cut off.
+    """
+
+    def __init__(self, directory: Optional[str] = None, capacity: Optional[int] = None):
+        self.name = "Certificate Store"
+        self.version = "1.0.0"
+        self.directory = directory or os.environ.get("TG_CERTIFICATE_STORE_DIR",
+                                                     DEFAULT_STORE_DIR)
+        self.log_path = os.path.join(self.directory, "certificates.log")
+        self.index_path = os.path.join(self.directory, "certificates.idx")
+        self.lock_path = os.path.join(self.directory, "certificates.lock")
+        requested = capacity or DEFAULT_CAPACITY
+        self.initial_capacity = 1 << max(requested - 1, 1).bit_length()
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._queue: Optional[queue.Queue] = None
+        self._pending_ids: set = set()
+        self._log_fd = -1
+        self._lock_fd = -1
+        self._index: Optional[_Index] = None
+        self._index_lock = threading.Lock()
+        self.counters = {"appends": 0, "commits": 0, "lookups": 0, "hits": 0,
+                         "replayed": 0, "resizes": 0}
+
+    def _open(self) -> None:
+        """Open the log, lock file and index once per process; forks reopen them."""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            self._lock_fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            self._log_fd = os.open(self.log_path, os.O_RDWR | os.O_CREAT, 0o644)
+            with self._exclusive():
+                if os.fstat(self._log_fd).st_size == 0:
+                    os.pwrite(self._log_fd, LOG_MAGIC, 0)
+                    os.fsync(self._log_fd)
+                elif os.pread(self._log_fd, len(LOG_MAGIC), 0) != LOG_MAGIC:
+                    raise ValueError(f"{self.log_path} is not a certificate log")
+                if not os.path.exists(self.index_path):
+                    _Index.create(self.index_path, self.initial_capacity)
+                self._index = _Index(self.index_path)
+                self._replay(self._index)
+            self._queue = queue.Queue()
+            self._pending_ids = set()
+            threading.Thread(target=self._run, args=(self._queue,),
+                             name="certificate-store", daemon=True).start()
+            self._pid = pid
+
+    @contextmanager
+    def _exclusive(self):
+        """Hold the store's file lock, shared by every process using the directory."""
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _pin_index(self) -> _Index:
+        """
+        The live index mapping, following a resize made by any process. It
+        stays open until unpinned, even if it is retired meanwhile.
+        """
+        while True:
+            index = self._index
+            # A mapping retired since it was read is skipped for its successor
+            if not index.pin():
+                continue
+            if not index.header()[2]:
+                return index
+            index.unpin()
+            with self._index_lock:
+                if self._index is index:
+                    self._index = _Index(self.index_path)
+                    index.retire()
+
+    @contextmanager
+    def _live_index(self):
+        """The live index mapping, pinned for the block."""
+        index = self._pin_index()
+        try:
+            yield index
+        finally:
+            index.unpin()
+
+    def get(self, certificate_id: str) -> Optional[Dict[str, Any]]:
+        """The stored certificate, from one index probe and one log read, or None."""
+        number = id_number(certificate_id)
+        self.counters["lookups"] += 1
+        if number is None:
+            return None
+        self._open()
+        # Pinned directly: a with block costs more than the probe on this path
+        index = self._pin_index()
+        try:
+            found = index.probe(number)
+        finally:
+            index.unpin()
+        if found is None:
+            return None
+        offset, length = found
+        record = os.pread(self._log_fd, RECORD_HEADER.size + length, offset)
+        stored_number, stored_length, crc = RECORD_HEADER.unpack_from(record)
+        payload = record[RECORD_HEADER.size:]
+        if (stored_number != number or stored_length != length
+                or zlib.crc32(payload) != crc):
+            raise ValueError(
+                f"Certificate log record at {offset} does not match the index"
+            )
+        self.counters["hits"] += 1
+        return json.loads(payload)
+
+    def contains(self, certificate_id: str) -> bool:
+        """True if the ID is stored or waiting to be committed."""
+        number = id_number(certificate_id)
+        if number is None:
+            return False
+        self._open()
+        if certificate_id in self._pending_ids:
+            return True
+        index = self._pin_index()
+        try:
+            return index.probe(number) is not None
+        finally:
+            index.unpin()
+
+    def submit(self, certificate: Dict[str, Any]) -> Future:
+        """Queue a certificate for the next commit; its future gives the log offset."""
+        certificate_id = certificate["certificate_info"]["id"]
+        if id_number(certificate_id) is None:
+            raise ValueError(
+                f"Cannot store certificate with malformed ID '{certificate_id}'"
+            )
+        self._open()
+        future: Future = Future()
+        self._pending_ids.add(certificate_id)
+        self._queue.put((certificate, future))
+        return future
+
+    def append(self, certificate: Dict[str, Any]) -> int:
+        """Store a certificate, returning its log offset once it is durable."""
+        return self.submit(certificate).result()
+
+    def _run(self, pending: queue.Queue) -> None:
+        while True:
+            batch = [pending.get()]
+            while True:
+                try:
+                    batch.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                results = self.append_many([certificate for certificate, _ in batch])
+            except Exception as e:
+                results = [e] * len(batch)
+            for (certificate, future), result in zip(batch, results, strict=True):
+                self._pending_ids.discard(certificate["certificate_info"]["id"])
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def append_many(self, certificates: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Commit certificates as one group. Returns each one's log offset, or a
+        ValueError for an ID that is already stored.
+        """
+        self._open()
+        records = []
+        for certificate in certificates:
+            payload = json.dumps(certificate, separators=(",", ":"),
+                                 ensure_ascii=False).encode("utf-8")
+            number = id_number(certificate["certificate_info"]["id"])
+            records.append((number, payload))
+
+        with self._exclusive():
+            with self._live_index() as index:
+                self._replay(index)
+            with self._live_index() as index:
+                results: List[Any] = []
+                accepted = []
+                data = []
+                seen = set()
+                start = offset = os.fstat(self._log_fd).st_size
+                for certificate, (number, payload) in zip(certificates, records,
+                                                          strict=True):
+                    if number in seen or index.probe(number) is not None:
+                        certificate_id = certificate['certificate_info']['id']
+                        results.append(ValueError(
+                            f"Certificate {certificate_id} is already stored"
+                        ))
+                        continue
+                    seen.add(number)
+                    accepted.append((number, len(payload), offset))
+                    header = RECORD_HEADER.pack(number, len(payload),
+                                                zlib.crc32(payload))
+                    data.append(header + payload)
+                    results.append(offset)
+                    offset += RECORD_HEADER.size + len(payload)
+
+                if accepted:
+                    os.pwrite(self._log_fd, b"".join(data), start)
+                    os.fsync(self._log_fd)
+                    self._insert(index, accepted, offset)
+                self.counters["appends"] += len(accepted)
+                self.counters["commits"] += 1
+        return results
+
+    def _insert(self, index: _Index, entries: List[Tuple[int, int, int]],
+                indexed: int) -> None:
+        """Add entries to the index, doubling it first if they would overfill it."""
+        count = index.header()[0]
+        if count + len(entries) > index.capacity * MAX_LOAD:
+            index = self._resize(index, count + len(entries))
+        columns = zip(*entries, strict=True)
+        numbers, lengths, offsets = (
+            np.array(column, dtype=dtype) for column, dtype
+            in zip(columns, (np.uint32, np.uint32, np.uint64), strict=True)
+        )
+        _place(index.slots, numbers, lengths, offsets)
+        # Slots reach the file before the header claims them, so after a crash
+        # the header never covers records whose slots were lost
+        index.map.flush()
+        index.set_header(count + len(entries), indexed)
+        index.sync_header()
+
+    def _resize(self, index: _Index, needed: int) -> _Index:
+        """Rehash into a larger index file, swap it in, and mark the old one retired."""
+        capacity = index.capacity
+        while needed > capacity * MAX_LOAD:
+            capacity *= 2
+        staged = self.index_path + ".resize"
+        _Index.create(staged, capacity)
+        larger = _Index(staged)
+        used = index.slots[index.slots["offset"] != 0]
+        _place(larger.slots, used["id"].copy(), used["length"].copy(),
+               used["offset"].copy())
+        count, indexed, _ = index.header()
+        larger.set_header(count, indexed)
+        larger.map.flush()
+        os.replace(staged, self.index_path)
+        with self._index_lock:
+            self._index = larger
+        # Other processes remap when they see the flag; readers here already
+        # moved on, and the old mapping closes once the last of them is done
+        index.set_header(count, indexed, retired=1)
+        index.retire()
+        self.counters["resizes"] += 1
+        return larger
+
+    def _replay(self, index: _Index) -> None:
+        """Index log records written since the index was updated; cut a torn tail."""
+        count, indexed, _ = index.header()
+        end = os.fstat(self._log_fd).st_size
+        entries = []
+        seen = set()
+        # Slots already written for records the header does not cover yet
+        uncounted = 0
+        offset = indexed
+        while offset + RECORD_HEADER.size <= end:
+            header = os.pread(self._log_fd, RECORD_HEADER.size, offset)
+            number, length, crc = RECORD_HEADER.unpack(header)
+            payload = os.pread(self._log_fd, length, offset + RECORD_HEADER.size)
+            if len(payload) != length or zlib.crc32(payload) != crc:
+                break
+            found = index.probe(number)
+            if found is None and number not in seen:
+                seen.add(number)
+                entries.append((number, length, offset))
+            elif found is not None and found[0] == offset:
+                uncounted += 1
+            offset += RECORD_HEADER.size + length
+        if offset != end:
+            print(f"Certificate log: cutting {end - offset} torn bytes "
+                  f"at offset {offset}")
+            os.ftruncate(self._log_fd, offset)
+            os.fsync(self._log_fd)
+        if uncounted:
+            index.set_header(count + uncounted, indexed)
+        if entries:
+            self._insert(index, entries, offset)
+            self.counters["replayed"] += len(entries)
+        elif offset != indexed or uncounted:
+            index.set_header(count + uncounted, offset)
+            index.sync_header()
+
+    def rebuild(self) -> int:
+        """Recreate the index from a full scan of the log; returns the certificates."""
+        self._open()
+        with self._exclusive():
+            with self._live_index() as old:
+                staged = self.index_path + ".rebuild"
+                _Index.create(staged, self.initial_capacity)
+                os.replace(staged, self.index_path)
+                old.set_header(*old.header()[:2], retired=1)
+            with self._live_index() as index:
+                self._replay(index)
+            with self._live_index() as index:
+                return index.header()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {"path": self.directory, **self.counters}
+        if self._pid == os.getpid():
+            with self._live_index() as index:
+                count, indexed, _ = index.header()
+                capacity = index.capacity
+            stats.update({"certificates": count, "index_capacity": capacity,
+                          "log_bytes": indexed})
+        return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Maintain or benchmark a TrustGraphed certificate store"
+    )
+    parser.add_argument("directory", nargs="?", default=None,
+                        help="Store directory (TG_CERTIFICATE_STORE_DIR)")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Recreate the index from the log")
+    parser.add_argument("--benchmark", type=int, default=0, metavar="N",
+                        help="Store N synthetic certificates in a temporary store "
+                             "and time lookups")
+    args = parser.parse_args(argv)
+
+    if args.rebuild:
+        store = CertificateStore(args.directory)
+        print(f"Indexed {store.rebuild()} certificates in {store.index_path}")
+        return 0
+
+    if args.benchmark:
+        with tempfile.TemporaryDirectory() as directory:
+            store = CertificateStore(directory)
+            numbers = np.random.default_rng(7).choice(1 << 32, size=args.benchmark,
+                                                      replace=False)
+            ids = [f"TG_{int(number):08X}" for number in numbers]
+            started = time.perf_counter()
+            for start in range(0, len(ids), 10000):
+                store.append_many([{"certificate_info": {"id": certificate_id}}
+                                   for certificate_id in ids[start:start + 10000]])
+            print(f"Stored {len(ids)} certificates in "
+                  f"{time.perf_counter() - started:.1f}s")
+
+            picks = np.random.default_rng(8).integers(0, len(ids), size=100000)
+            probes = [ids[int(i)] for i in picks]
+            started = time.perf_counter()
+            for certificate_id in probes:
+                store.get(certificate_id)
+            per_lookup = (time.perf_counter() - started) / len(probes)
+            print(f"Lookup: {1e6 * per_lookup:.2f}us per certificate "
+                  f"({store.stats()['index_capacity']} slots)")
+        return 0
+
+    print(json.dumps(CertificateStore(args.directory).stats(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
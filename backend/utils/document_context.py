@@ -0,0 +1,137 @@
+"""
+Document Context
+Single-pass view of a document shared by every pipeline module.
+"""
+
+import re
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .lexicon import LexiconMatch, default_matcher
+
+# Sentences are the text between runs of . ! ? with surrounding whitespace trimmed
+SENTENCE_SPAN = re.compile(r'[^.!?\s](?:[^.!?]*[^.!?\s])?')
+TOKEN_SPAN = re.compile(r'\S+')
+
+# Sentences longer than this are treated as assertions
+MIN_ASSERTION_LENGTH = 10
+
+Span = Tuple[int, int]
+
+
+class DocumentContext:
+    """
+    Text, lowercase view, sentence spans and token spans for one document.
+
+    Built once per request. Spans are (start, end) offsets into both text and
+    lower, which always have the same length, so a match found in the
+    lowercase view can be reported in its original case.
+    """
+
+    def __init__(self, content: str, lexicon_packs: Optional[Sequence[Any]] = None):
+        self.text = content
+        self.lexicon_packs = lexicon_packs or ()
+        self.lower = self._lowercase(content)
+        self.sentence_spans: List[Span] = [
+            match.span() for match in SENTENCE_SPAN.finditer(content)
+        ]
+        self.assertion_spans: List[Span] = [
+            (start, end) for start, end in self.sentence_spans
+            if end - start > MIN_ASSERTION_LENGTH
+        ]
+        self.token_spans: List[Span] = [
+            match.span() for match in TOKEN_SPAN.finditer(content)
+        ]
+        # Derived per-document data that modules publish for later stages
+        self.features: Dict[str, Any] = {}
+        self._lower_by_text: Optional[Dict[str, str]] = None
+        self._span_by_text: Optional[Dict[str, Span]] = None
+        self._lexicon_matches: Optional[List[LexiconMatch]] = None
+        self._match_starts: List[int] = []
+
+    def _lowercase(self, content: str) -> str:
+        """Lowercase content without changing its length."""
+        lower = content.lower()
+        if len(lower) == len(content):
+            return lower
+        # A few characters (e.g. U+0130) lowercase to two code points; keep those as-is
+        return "".join(ch.lower() if len(ch.lower()) == 1 else ch for ch in content)
+
+    @property
+    def token_count(self) -> int:
+        return len(self.token_spans)
+
+    def slice(self, span: Span) -> str:
+        return self.text[span[0]:span[1]]
+
+    def slice_lower(self, span: Span) -> str:
+        return self.lower[span[0]:span[1]]
+
+    def assertions(self) -> List[str]:
+        """Sentences long enough to count as assertions, in document order."""
+        return [self.text[start:end] for start, end in self.assertion_spans]
+
+    @property
+    def lexicon_matches(self) -> List[LexiconMatch]:
+        """Every lexicon phrase in the document, from one shared automaton pass."""
+        if self._lexicon_matches is None:
+            self._lexicon_matches = self._scan(self.lower)
+            self._match_starts = [match.start for match in self._lexicon_matches]
+        return self._lexicon_matches
+
+    def _scan(self, lower: str) -> List[LexiconMatch]:
+        """Matches from the built-in lexicons plus any domain lexicon packs."""
+        matches = default_matcher().scan(lower)
+        if self.lexicon_packs:
+            for pack in self.lexicon_packs:
+                matches.extend(pack.scan(lower))
+            matches.sort()
+        return matches
+
+    def matches_within(self, span: Span) -> List[LexiconMatch]:
+        """Lexicon matches lying entirely inside span."""
+        matches = self.lexicon_matches
+        start, end = span
+        within = []
+        for index in range(bisect_left(self._match_starts, start), len(matches)):
+            match = matches[index]
+            if match.start >= end:
+                break
+            if match.end <= end:
+                within.append(match)
+        return within
+
+    def span_of(self, assertion: str) -> Optional[Span]:
+        """Span of the first assertion in this document with exactly this text."""
+        if self._span_by_text is None:
+            self._span_by_text = {}
+            for start, end in self.assertion_spans:
+                self._span_by_text.setdefault(self.text[start:end], (start, end))
+        return self._span_by_text.get(assertion)
+
+    def assertion_matches(self, assertions: List[str]) -> List[List[LexiconMatch]]:
+        """
+        Lexicon matches per assertion, read from the document-wide scan;
+        anything not found in the document is scanned on its own.
+        """
+        per_assertion = []
+        for assertion in assertions:
+            span = self.span_of(assertion)
+            if span is None:
+                per_assertion.append(self._scan(assertion.lower()))
+            else:
+                per_assertion.append(self.matches_within(span))
+        return per_assertion
+
+    def lowered(self, assertions: List[str]) -> List[str]:
+        """
+        Lowercase forms of assertions taken from this document, read from the
+        lowercase view; anything not found in the document is lowercased directly.
+        """
+        if self._lower_by_text is None:
+            self._lower_by_text = {
+                self.text[start:end]: self.lower[start:end]
+                for start, end in self.assertion_spans
+            }
+        return [self._lower_by_text.get(assertion) or assertion.lower()
+                for assertion in assertions]
@@ -0,0 +1,198 @@
+"""
+Extraction Cache
+Content-addressed cache of extracted documents, keyed by upload bytes.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "trustgraphed", "extract_cache")
+DEFAULT_MEMORY_BYTES = 64 * 1024 * 1024
+DEFAULT_DISK_BYTES = 1024 * 1024 * 1024
+
+
+class ExtractionCache:
+    def __init__(self, cache_dir: Optional[str] = None,
+                 memory_bytes: Optional[int] = None,
+                 disk_bytes: Optional[int] = None):
+        self.name = "Extraction Cache"
+        self.version = "1.0.0"
+        self.cache_dir = cache_dir or os.environ.get("TG_EXTRACT_CACHE_DIR",
+                                                     DEFAULT_CACHE_DIR)
+        self.memory_budget = memory_bytes if memory_bytes is not None else \
+            int(os.environ.get("TG_EXTRACT_CACHE_MEMORY_BYTES", DEFAULT_MEMORY_BYTES))
+        self.disk_budget = disk_bytes if disk_bytes is not None else \
+            int(os.environ.get("TG_EXTRACT_CACHE_DISK_BYTES", DEFAULT_DISK_BYTES))
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: Optional[int] = None
+        self.counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0
+        }
+
+    def make_key(self, content_sha256: str, file_type: str,
+                 extractor_version: str) -> str:
+        """Build the cache key from the upload's SHA-256 and the extractor identity."""
+        return f"{content_sha256}-{file_type.lstrip('.')}-{extractor_version}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached document for key, checking memory before disk."""
+        with self._lock:
+            document = self._memory.get(key)
+            if document is not None:
+                self._memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return document
+
+        document = self._read_disk(key)
+        with self._lock:
+            if document is None:
+                self.counters["misses"] += 1
+                return None
+            self.counters["disk_hits"] += 1
+            self._remember(key, document)
+        return document
+
+    def put(self, key: str, document: Dict[str, Any]) -> None:
+        """Store an extracted document (content plus scope) in both tiers."""
+        with self._lock:
+            self.counters["stores"] += 1
+            self._remember(key, document)
+        self._write_disk(key, document)
+
+    def stats(self) -> Dict[str, Any]:
+        """Report hit/miss counters and tier usage."""
+        with self._lock:
+            hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+            lookups = hits + self.counters["misses"]
+            return {
+                **self.counters,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "memory_budget": self.memory_budget,
+                "disk_bytes": self._disk_bytes or 0,
+                "disk_budget": self.disk_budget
+            }
+
+    def _entry_size(self, document: Dict[str, Any]) -> int:
+        """Approximate memory held by a cached document; the text dominates."""
+        return sys.getsizeof(document.get("content", ""))
+
+    def _remember(self, key: str, document: Dict[str, Any]) -> None:
+        """
+        Insert into the memory tier and evict least recently used entries.
+        Caller holds the lock.
+        """
+        size = self._entry_size(document)
+        if size > self.memory_budget:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= self._entry_size(previous)
+        self._memory[key] = document
+        self._memory_bytes += size
+        while self._memory_bytes > self.memory_budget:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= self._entry_size(evicted)
+            self.counters["memory_evictions"] += 1
+
+    def _path(self, key: str) -> str:
+        """Disk location for key, sharded by the first two hex digits."""
+        return os.path.join(self.cache_dir, key[:2], key + ".json.z")
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        """Load and decompress an entry from the disk tier."""
+        if self.disk_budget <= 0:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as cached:
+                document = json.loads(zlib.decompress(cached.read()).decode('utf-8'))
+            # Refresh mtime so eviction drops the least recently used files first
+            os.utime(path)
+            return document
+        except (OSError, zlib.error, ValueError):
+            return None
+
+    def _write_disk(self, key: str, document: Dict[str, Any]) -> None:
+        """Compress an entry onto the disk tier and enforce the size budget."""
+        if self.disk_budget <= 0:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            payload = zlib.compress(json.dumps(document).encode('utf-8'), 6)
+            if len(payload) > self.disk_budget:
+                return
+            # Write to a temp file and rename so readers never see a partial entry
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, 'wb') as cached:
+                cached.write(payload)
+            # An overwritten entry gives its bytes back to the budget
+            try:
+                replaced = os.stat(path).st_size
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Extraction cache write failed: {str(e)}")
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_usage()
+            else:
+                self._disk_bytes += len(payload) - replaced
+            if self._disk_bytes > self.disk_budget:
+                self._evict_disk()
+
+    def _scan_disk_usage(self) -> int:
+        """Total bytes currently used by the disk tier."""
+        return sum(entry[2] for entry in self._disk_entries())
+
+    def _disk_entries(self) -> List[Tuple[float, str, int]]:
+        """List (mtime, path, size) for every cached file."""
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".json.z"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return entries
+
+    def _evict_disk(self) -> None:
+        """
+        Remove oldest files until usage is back under 90% of the budget.
+        Caller holds the lock.
+        """
+        entries = sorted(self._disk_entries())
+        usage = sum(entry[2] for entry in entries)
+        target = int(self.disk_budget * 0.9)
+        for _, path, size in entries:
+            if usage <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            usage -= size
+            self.counters["disk_evictions"] += 1
+        self._disk_bytes = usage
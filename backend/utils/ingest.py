@@ -0,0 +1,163 @@
+"""
+Upload Ingestion
+Streams multipart uploads into a hashing spool that spills to disk above a threshold.
+"""
+
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+from typing import Any, List, Optional
+
+from flask import Request
+
+DEFAULT_SPILL_BYTES = 8 * 1024 * 1024
+READ_CHUNK_BYTES = 1024 * 1024
+
+
+class HashingSpool:
+    """
+    Writable, then readable, upload buffer.
+
+    Every write updates a running SHA-256, so the content hash is ready the
+    moment the upload has been received. Data stays in memory until it
+    crosses the spill threshold, then moves to a named temporary file that
+    extractors can open by path or map into memory.
+    """
+
+    def __init__(self, spill_bytes: Optional[int] = None):
+        self.spill_bytes = spill_bytes if spill_bytes is not None else \
+            int(os.environ.get("TG_INGEST_SPILL_BYTES", DEFAULT_SPILL_BYTES))
+        self.size = 0
+        self._hasher = hashlib.sha256()
+        self._buffer: Any = io.BytesIO()
+        self._spilled = False
+        self._views: List[Any] = []
+
+    @property
+    def sha256(self) -> str:
+        """Hex SHA-256 of everything written so far."""
+        return self._hasher.hexdigest()
+
+    @property
+    def path(self) -> Optional[str]:
+        """Path of the spill file, or None while the upload is held in memory."""
+        return self._buffer.name if self._spilled else None
+
+    def write(self, data: bytes) -> int:
+        self._hasher.update(data)
+        self.size += len(data)
+        if not self._spilled and self.size > self.spill_bytes:
+            self._spill()
+        return self._buffer.write(data)
+
+    def _spill(self) -> None:
+        """Move the in-memory buffer to a temporary file."""
+        # Kept open as the spool's buffer until close()
+        spill_file = tempfile.NamedTemporaryFile(  # noqa: SIM115
+            prefix="tg_upload_", suffix=".bin")
+        spill_file.write(self._buffer.getbuffer())
+        self._buffer.close()
+        self._buffer = spill_file
+        self._spilled = True
+
+    def view(self) -> Any:
+        """
+        Zero-copy, read-only view of the whole upload: a memoryview over the
+        in-memory buffer, or an mmap of the spill file.
+        """
+        if self._spilled:
+            self._buffer.flush()
+            if self.size == 0:
+                return memoryview(b"")
+            mapped = mmap.mmap(self._buffer.fileno(), 0, access=mmap.ACCESS_READ)
+            self._views.append(mapped)
+            return mapped
+        view = self._buffer.getbuffer().toreadonly()
+        self._views.append(view)
+        return view
+
+    def read(self, size: int = -1) -> bytes:
+        return self._buffer.read(size)
+
+    def readinto(self, buffer: Any) -> int:
+        return self._buffer.readinto(buffer)
+
+    def readline(self, size: int = -1) -> bytes:
+        return self._buffer.readline(size)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self._buffer.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._buffer.tell()
+
+    def flush(self) -> None:
+        self._buffer.flush()
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    @property
+    def closed(self) -> bool:
+        return self._buffer.closed
+
+    def close(self) -> None:
+        """Release any views, then the buffer (deleting a spill file)."""
+        for view in self._views:
+            if isinstance(view, memoryview):
+                view.release()
+            else:
+                view.close()
+        self._views = []
+        self._buffer.close()
+
+    def __iter__(self):
+        return iter(self._buffer)
+
+    def __enter__(self) -> "HashingSpool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class IngestRequest(Request):
+    """Request class that streams file parts straight into a HashingSpool."""
+
+    # Werkzeug passes these by keyword; the spool needs none of them
+    def _get_file_stream(self, total_content_length, content_type,  # noqa: ARG002
+                         filename=None, content_length=None):  # noqa: ARG002
+        return HashingSpool()
+
+
+def ingest_upload(file: Any) -> HashingSpool:
+    """
+    Return the HashingSpool behind an uploaded file.
+
+    Uploads parsed by IngestRequest already have one; any other stream is
+    copied across in chunks, hashing as it is read.
+    """
+    stream = getattr(file, 'stream', file)
+    if isinstance(stream, HashingSpool):
+        stream.seek(0)
+        return stream
+
+    spool = HashingSpool()
+    stream.seek(0)
+    while True:
+        chunk = stream.read(READ_CHUNK_BYTES)
+        if not chunk:
+            break
+        spool.write(chunk)
+    spool.seek(0)
+    if hasattr(file, 'stream'):
+        file.stream = spool
+    return spool
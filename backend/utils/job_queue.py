@@ -0,0 +1,391 @@
+"""
+Job Queue
+Durable SQLite queue of evaluation jobs, drained by a bounded worker pool.
+"""
+
+import contextlib
+import json
+import os
+import secrets
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DEFAULT_JOB_DIR = os.path.join(tempfile.gettempdir(), "trustgraphed", "jobs")
+DEFAULT_WORKERS = 2
+DEFAULT_RESULT_TTL_SECONDS = 3600.0
+DEFAULT_POLL_SECONDS = 1.0
+# A running job whose lease is not renewed for this long is assumed lost with its
+# worker
+DEFAULT_LEASE_SECONDS = 30.0
+# Jobs that keep taking their worker down are failed rather than retried forever
+DEFAULT_MAX_ATTEMPTS = 3
+PURGE_INTERVAL_SECONDS = 60.0
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    upload_path TEXT,
+    stage TEXT,
+    progress TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    lease_expires REAL,
+    result BLOB,
+    result_status INTEGER,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, created_at);
+"""
+
+
+class JobQueue:
+    """
+    Queue of jobs persisted in SQLite, so queued work survives a restart.
+
+    submit() records the job (and spools its upload into the job
+    directory) and returns at once. A dispatcher thread claims queued jobs
+    as worker slots free up and runs them through the handler, which gets
+    the job payload, the upload path and a progress callback taking the
+    name of the stage it is starting. The handler returns the response
+    body and HTTP status, stored compressed until the result TTL runs out.
+
+    Any number of processes can share one queue: claims are a single
+    UPDATE, and each claim holds a lease the dispatcher renews while the
+    job runs. A job whose lease lapses (its process died) goes back on the
+    queue, up to max_attempts. Threads are started lazily per process, so
+    a queue created before a fork works in every worker.
+    """
+
+    def __init__(self, handler: Callable[..., Tuple[Dict[str, Any], int]],
+                 stages: List[str], directory: Optional[str] = None,
+                 workers: Optional[int] = None, result_ttl: Optional[float] = None,
+                 poll_seconds: Optional[float] = None,
+                 lease_seconds: Optional[float] = None,
+                 max_attempts: Optional[int] = None):
+        self.name = "Job Queue"
+        self.version = "1.0.0"
+        self.handler = handler
+        self.stages = list(stages)
+        self.directory = directory or os.environ.get("TG_JOB_DIR", DEFAULT_JOB_DIR)
+        self.path = os.path.join(self.directory, "jobs.db")
+        self.upload_dir = os.path.join(self.directory, "uploads")
+        self.workers = workers or int(os.environ.get("TG_JOB_WORKERS", DEFAULT_WORKERS))
+        if result_ttl is None:
+            result_ttl = float(os.environ.get("TG_JOB_RESULT_TTL_SECONDS",
+                                              DEFAULT_RESULT_TTL_SECONDS))
+        self.result_ttl = result_ttl
+        self.poll_seconds = poll_seconds or float(os.environ.get("TG_JOB_POLL_SECONDS",
+                                                                 DEFAULT_POLL_SECONDS))
+        self.lease_seconds = lease_seconds or float(
+            os.environ.get("TG_JOB_LEASE_SECONDS", DEFAULT_LEASE_SECONDS))
+        self.max_attempts = max_attempts or int(os.environ.get("TG_JOB_MAX_ATTEMPTS",
+                                                               DEFAULT_MAX_ATTEMPTS))
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        self._running: Dict[str, float] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._worker_pid: Optional[int] = None
+        self._owner: Optional[str] = None
+        self.counters = {"submitted": 0, "succeeded": 0, "failed": 0, "requeued": 0,
+                         "superseded": 0, "purged": 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread and process; the schema is created on first use."""
+        pid = os.getpid()
+        cached = getattr(self._local, "connection", None)
+        if cached is None or cached[0] != pid:
+            os.makedirs(self.upload_dir, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            cached = (pid, connection)
+            self._local.connection = cached
+        return cached[1]
+
+    def start(self) -> None:
+        """Start this process's dispatcher and worker pool, if not running yet."""
+        pid = os.getpid()
+        if self._worker_pid == pid:
+            return
+        with self._lock:
+            if self._worker_pid == pid:
+                return
+            self._owner = f"{socket.gethostname()}:{pid}:{secrets.token_hex(4)}"
+            self._running = {}
+            self._wakeup = threading.Event()
+            self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                thread_name_prefix="job-worker")
+            threading.Thread(target=self._dispatch, name="job-dispatcher",
+                             daemon=True).start()
+            self._worker_pid = pid
+
+    def submit(self, payload: Dict[str, Any], upload: Optional[Any] = None) -> str:
+        """Queue a job, copying the upload stream (if any) into the job directory."""
+        job_id = secrets.token_hex(16)
+        connection = self._connection()
+        upload_path = None
+        if upload is not None:
+            upload_path = os.path.join(self.upload_dir, job_id)
+            with open(upload_path, "wb") as spooled:
+                while True:
+                    chunk = upload.read(1024 * 1024)
+                    if not chunk:
+                        break
+                    spooled.write(chunk)
+        progress = self._pending_progress()
+        with connection:
+            connection.execute(
+                "INSERT INTO jobs "
+                "(id, status, payload, upload_path, progress, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, "queued", json.dumps(payload), upload_path,
+                 json.dumps(progress), time.time())
+            )
+        self.counters["submitted"] += 1
+        self.start()
+        self._wakeup.set()
+        return job_id
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status and per-stage progress of a job, or None if unknown or expired."""
+        row = self._connection().execute(
+            "SELECT id, status, stage, progress, attempts, error, created_at, "
+            "started_at, finished_at, expires_at FROM jobs "
+            "WHERE id = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (job_id, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        queued_ahead = None
+        if row[1] == "queued":
+            queued_ahead = self._connection().execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at < ?",
+                (row[6],)
+            ).fetchone()[0]
+        progress = json.loads(row[3])
+        return {
+            "job_id": row[0],
+            "status": row[1],
+            "stage": row[2],
+            "stages": progress,
+            "stages_done": sum(stage["status"] in ("done", "skipped")
+                               for stage in progress),
+            "stages_total": len(progress),
+            "queued_ahead": queued_ahead,
+            "attempts": row[4],
+            "error": row[5],
+            "created_at": row[6],
+            "started_at": row[7],
+            "finished_at": row[8],
+            "expires_at": row[9]
+        }
+
+    def result(self, job_id: str
+               ) -> Optional[Tuple[Optional[Dict[str, Any]], Optional[int]]]:
+        """
+        (body, HTTP status) of a finished job, (None, None) while it is
+        pending, None if it is unknown or expired.
+        """
+        row = self._connection().execute(
+            "SELECT status, result, result_status, error FROM jobs "
+            "WHERE id = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (job_id, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        status, result, result_status, error = row
+        if status in ("queued", "running"):
+            return None, None
+        if result is None:
+            return {"status": "error", "error": f"Processing error: {error}"}, 500
+        return json.loads(zlib.decompress(result).decode("utf-8")), result_status
+
+    def _dispatch(self) -> None:
+        """Claim jobs for free slots; renew leases, requeue lost and purge old jobs."""
+        last_purge = 0.0
+        while True:
+            try:
+                now = time.time()
+                self._renew_leases(now)
+                self._requeue_lost(now)
+                if now - last_purge >= PURGE_INTERVAL_SECONDS:
+                    self.purge(now)
+                    last_purge = now
+                with self._lock:
+                    free = self.workers - len(self._running)
+                claimed = self._claim(free) if free > 0 else []
+                for job_id, payload, upload_path in claimed:
+                    self._executor.submit(self._run, job_id, payload, upload_path)
+            except sqlite3.Error as e:
+                print(f"Job queue unavailable: {str(e)}")
+            # Lease renewal sets the upper bound on how long the dispatcher may sleep
+            self._wakeup.wait(min(self.poll_seconds, self.lease_seconds / 3))
+            self._wakeup.clear()
+
+    def _claim(self, limit: int) -> List[Tuple[str, Dict[str, Any], Optional[str]]]:
+        now = time.time()
+        connection = self._connection()
+        with connection:
+            rows = connection.execute(
+                "UPDATE jobs SET status = 'running', owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, started_at = COALESCE(started_at, ?) "
+                "WHERE id IN (SELECT id FROM jobs WHERE status = 'queued' "
+                "ORDER BY created_at LIMIT ?) "
+                "RETURNING id, payload, upload_path",
+                (self._owner, now + self.lease_seconds, now, limit)
+            ).fetchall()
+        with self._lock:
+            for job_id, _, _ in rows:
+                self._running[job_id] = now
+        return [(job_id, json.loads(payload), upload_path)
+                for job_id, payload, upload_path in rows]
+
+    def _renew_leases(self, now: float) -> None:
+        with self._lock:
+            job_ids = list(self._running)
+        if not job_ids:
+            return
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND owner = ?",
+                [(now + self.lease_seconds, job_id, self._owner) for job_id in job_ids]
+            )
+
+    def _requeue_lost(self, now: float) -> None:
+        """Requeue jobs whose lease lapsed, failing those out of attempts."""
+        connection = self._connection()
+        with connection:
+            requeued = connection.execute(
+                "UPDATE jobs SET status = 'queued', owner = NULL, lease_expires = NULL "
+                "WHERE status = 'running' AND lease_expires < ? AND attempts < ?",
+                (now, self.max_attempts)
+            ).rowcount
+            connection.execute(
+                "UPDATE jobs SET status = 'failed', owner = NULL, finished_at = ?, "
+                "expires_at = ?, error = 'Worker stopped during the job' "
+                "WHERE status = 'running' AND lease_expires < ?",
+                (now, now + self.result_ttl, now)
+            )
+        if requeued:
+            self.counters["requeued"] += requeued
+
+    def _pending_progress(self) -> List[Dict[str, Any]]:
+        return [{"stage": stage, "status": "pending", "seconds": None}
+                for stage in self.stages]
+
+    def _run(self, job_id: str, payload: Dict[str, Any],
+             upload_path: Optional[str]) -> None:
+        connection = self._connection()
+        progress = self._pending_progress()
+        current = {"index": None, "started": 0.0}
+
+        def report(stage: str, status: str = "running") -> None:
+            """Close the current stage and start the next; 'skipped' just marks it."""
+            now = time.monotonic()
+            if current["index"] is not None:
+                progress[current["index"]].update(
+                    status="done", seconds=round(now - current["started"], 3))
+                current["index"] = None
+            index = self.stages.index(stage)
+            progress[index]["status"] = status
+            if status == "running":
+                current.update(index=index, started=now)
+            with connection:
+                connection.execute(
+                    "UPDATE jobs SET stage = ?, progress = ? "
+                    "WHERE id = ? AND owner = ?",
+                    (stage, json.dumps(progress), job_id, self._owner)
+                )
+
+        result, result_status, error = None, None, None
+        try:
+            body, result_status = self.handler(payload, upload_path, report)
+            if current["index"] is not None:
+                seconds = round(time.monotonic() - current["started"], 3)
+                progress[current["index"]].update(status="done", seconds=seconds)
+            result = zlib.compress(json.dumps(body).encode("utf-8"), 6)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            print(f"Job {job_id} failed: {error}")
+            if current["index"] is not None:
+                progress[current["index"]]["status"] = "failed"
+
+        status = "succeeded" if result is not None and result_status < 400 else "failed"
+        now = time.time()
+        try:
+            with connection:
+                saved = connection.execute(
+                    "UPDATE jobs SET status = ?, progress = ?, result = ?, "
+                    "result_status = ?, error = ?, owner = NULL, lease_expires = NULL, "
+                    "finished_at = ?, expires_at = ? WHERE id = ? AND owner = ?",
+                    (status, json.dumps(progress), result, result_status, error, now,
+                     now + self.result_ttl, job_id, self._owner)
+                ).rowcount
+            if not saved:
+                # The lease lapsed and the job was requeued; its new run owns the
+                # upload and the result
+                print(f"Job {job_id} result discarded: its lease was lost")
+                self.counters["superseded"] += 1
+                return
+            self.counters[status] += 1
+            if upload_path:
+                with contextlib.suppress(OSError):
+                    os.remove(upload_path)
+        except sqlite3.Error as e:
+            # The lease lapses and the job is retried
+            print(f"Job {job_id} result not saved: {str(e)}")
+        finally:
+            with self._lock:
+                self._running.pop(job_id, None)
+            self._wakeup.set()
+
+    def purge(self, now: Optional[float] = None) -> int:
+        """Delete jobs whose results have expired, with any uploads they left behind."""
+        now = now if now is not None else time.time()
+        connection = self._connection()
+        with connection:
+            rows = connection.execute(
+                "DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ? "
+                "RETURNING upload_path", (now,)
+            ).fetchall()
+        for (upload_path,) in rows:
+            if upload_path:
+                with contextlib.suppress(OSError):
+                    os.remove(upload_path)
+        self.counters["purged"] += len(rows)
+        return len(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            counts = dict(self._connection().execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ))
+        except sqlite3.Error:
+            counts = {}
+        with self._lock:
+            running_here = len(self._running)
+        return {
+            "workers": self.workers,
+            "running_here": running_here,
+            "result_ttl_seconds": self.result_ttl,
+            "jobs": {status: counts.get(status, 0) for status in JOB_STATUSES},
+            **self.counters
+        }
@@ -0,0 +1,135 @@
+"""
+Lexicon Matcher
+Token-level Aho-Corasick automaton over every phrase lexicon in the pipeline.
+"""
+
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+WORD = re.compile(r'\w+')
+
+# Phrase lexicons by category; every module reads its phrases from here
+LEXICONS: Dict[str, List[str]] = {
+    # Uncertainty markers that suggest low confidence
+    "uncertainty": [
+        'might', 'maybe', 'possibly', 'could be', 'seems like', 'appears to',
+        'suggests', 'indicates', 'likely', 'probably', 'perhaps', 'allegedly',
+        'reportedly', 'supposedly', 'presumably', 'potentially', 'may be',
+        'seems to', 'appears that', 'it is possible', 'it is likely',
+        'some say', 'some believe', 'it is claimed', 'rumored', 'speculated'
+    ],
+    # High confidence markers
+    "confidence": [
+        'definitely', 'certainly', 'clearly', 'obviously', 'undoubtedly',
+        'unquestionably', 'absolutely', 'precisely', 'exactly', 'specifically',
+        'confirmed', 'verified', 'proven', 'established', 'documented'
+    ],
+    # Hedging constructions, counted per occurrence
+    "hedging": [
+        'might be', 'could be', 'may be', 'seem to', 'seems to',
+        'appear to', 'appears to', 'tend to', 'tends to'
+    ],
+    # Direct AI generation indicators
+    "fabrication": [
+        "as an ai", "i cannot", "i don't have access",
+        "according to my training", "i'm not able to",
+        "generated by ai", "artificial intelligence"
+    ],
+    # Appeals that may indicate unsupported claims
+    "unsupported": [
+        'it is well known', 'everyone knows', 'obviously', 'clearly', 'of course'
+    ],
+}
+
+
+class LexiconMatch(NamedTuple):
+    """One phrase occurrence; start and end are character offsets."""
+    start: int
+    end: int
+    category: str
+    phrase: str
+
+
+class LexiconMatcher:
+    """
+    Aho-Corasick automaton whose alphabet is word tokens.
+
+    Text is tokenized into \\w+ runs and walked once, so every phrase of
+    every lexicon is found in a single linear pass, and matches always fall
+    on word boundaries ('might' never matches inside 'mighty'). A match is
+    confirmed by comparing the covered text, split on whitespace, with the
+    phrase, so punctuation between the words rules it out. Callers pass
+    lowercase text.
+    """
+
+    def __init__(self, lexicons: Optional[Dict[str, List[str]]] = None):
+        self.name = "Lexicon Matcher"
+        self.version = "1.0.0"
+        self.lexicons = lexicons if lexicons is not None else LEXICONS
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Per state: (token length, category, phrase, phrase words) of every
+        # phrase ending there
+        self._outputs: List[List[Tuple[int, str, str, List[str]]]] = [[]]
+        for category, phrases in self.lexicons.items():
+            for phrase in phrases:
+                self._add(category, phrase.lower())
+        self._link()
+
+    def _add(self, category: str, phrase: str) -> None:
+        """Insert a phrase into the token trie."""
+        tokens = WORD.findall(phrase)
+        if not tokens:
+            return
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = next_state
+        self._outputs[state].append((len(tokens), category, phrase, phrase.split()))
+
+    def _link(self) -> None:
+        """Breadth-first failure links; each state inherits its fallback's outputs."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(token, 0)
+                self._outputs[next_state] = (self._outputs[next_state]
+                                             + self._outputs[self._fail[next_state]])
+
+    def scan(self, text: str) -> List[LexiconMatch]:
+        """Return every phrase occurrence in text, ordered by start offset."""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        matches = []
+        starts: List[int] = []
+        state = 0
+        for index, token_match in enumerate(WORD.finditer(text)):
+            token = token_match.group()
+            starts.append(token_match.start())
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for length, category, phrase, words in outputs[state]:
+                start, end = starts[index - length + 1], token_match.end()
+                if length == 1 or text[start:end].split() == words:
+                    matches.append(LexiconMatch(start, end, category, phrase))
+        matches.sort()
+        return matches
+
+
+@lru_cache(maxsize=None)
+def default_matcher() -> LexiconMatcher:
+    """The shared automaton over LEXICONS, compiled once per process."""
+    return LexiconMatcher()
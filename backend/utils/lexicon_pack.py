@@ -0,0 +1,251 @@
+"""
+Lexicon Packs
+Offline-compiled, memory-mapped phrase automata for domain lexicons.
+
+Build a pack from a JSON file of {category: [phrases]} or a directory of
+<category>.txt files with one phrase per line:
+
+    python -m utils.lexicon_pack medical_lexicon.json medical.tglx
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+from .lexicon import WORD, LexiconMatch, LexiconMatcher
+
+MAGIC = b"TGLX"
+FORMAT_VERSION = 1
+
+# magic, version, state count, table slots, output count, phrase count,
+# text bytes, categories bytes
+HEADER = struct.Struct("<4sIIIIIII")
+# state, token hash, next state (u32 each)
+TRANSITION_WORDS = 3
+# category id, token length, text offset, text length (u32 each)
+PHRASE_WORDS = 4
+# The root is never a transition target, so next == 0 marks a free slot
+EMPTY = 0
+
+
+def token_hash(token: str) -> int:
+    return zlib.crc32(token.encode('utf-8'))
+
+
+def slot_for(state: int, hashed: int, mask: int) -> int:
+    """Starting slot for (state, token hash) in the open-addressing table."""
+    return ((state * 0x9E3779B1) ^ hashed) & mask
+
+
+def load_lexicon_source(path: str) -> Dict[str, List[str]]:
+    """Read {category: [phrases]} from a JSON file or a directory of .txt files."""
+    if os.path.isdir(path):
+        lexicons = {}
+        for filename in sorted(os.listdir(path)):
+            if filename.endswith(".txt"):
+                with open(os.path.join(path, filename), encoding='utf-8') as source:
+                    phrases = [line.strip() for line in source
+                               if line.strip() and not line.startswith("#")]
+                    lexicons[filename[:-4]] = phrases
+        return lexicons
+    with open(path, encoding='utf-8') as source:
+        lexicons = json.load(source)
+    if not isinstance(lexicons, dict) or not all(isinstance(phrases, list)
+                                                 for phrases in lexicons.values()):
+        raise ValueError("Lexicon source must map category names to lists of phrases")
+    return lexicons
+
+
+def build_pack(lexicons: Dict[str, List[str]], output_path: str) -> Dict[str, Any]:
+    """Compile lexicons into a pack file and return build statistics."""
+    matcher = LexiconMatcher(lexicons)
+    goto, fail, outputs = matcher._goto, matcher._fail, matcher._outputs
+    state_count = len(goto)
+
+    categories = list(lexicons)
+    category_ids = {category: index for index, category in enumerate(categories)}
+    phrase_ids: Dict[tuple, int] = {}
+    phrase_words: List[int] = []
+    text = bytearray()
+    output_starts = [0]
+    output_ids: List[int] = []
+    for state in range(state_count):
+        for length, category, phrase, _ in outputs[state]:
+            key = (category, phrase)
+            if key not in phrase_ids:
+                encoded = phrase.encode('utf-8')
+                phrase_ids[key] = len(phrase_ids)
+                phrase_words += [category_ids[category], length,
+                                 len(text), len(encoded)]
+                text += encoded
+            output_ids.append(phrase_ids[key])
+        output_starts.append(len(output_ids))
+
+    transitions = sum(len(edges) for edges in goto)
+    slots = 1
+    while slots < 2 * max(1, transitions):
+        slots *= 2
+    mask = slots - 1
+    table = [0] * (slots * TRANSITION_WORDS)
+    for state, edges in enumerate(goto):
+        for token, next_state in edges.items():
+            hashed = token_hash(token)
+            slot = slot_for(state, hashed, mask)
+            while table[slot * TRANSITION_WORDS + 2] != EMPTY:
+                base = slot * TRANSITION_WORDS
+                if table[base] == state and table[base + 1] == hashed:
+                    raise ValueError(
+                        f"Token hash collision on '{token}'; rename or drop the phrase"
+                    )
+                slot = (slot + 1) & mask
+            base = slot * TRANSITION_WORDS
+            table[base:base + TRANSITION_WORDS] = [state, hashed, next_state]
+
+    category_blob = json.dumps(categories).encode('utf-8')
+    with open(output_path, 'wb') as pack:
+        pack.write(HEADER.pack(MAGIC, FORMAT_VERSION, state_count, slots,
+                               len(output_ids), len(phrase_ids), len(text),
+                               len(category_blob)))
+        for words in (table, fail, output_starts, output_ids, phrase_words):
+            pack.write(struct.pack(f"<{len(words)}I", *words))
+        pack.write(bytes(text))
+        pack.write(category_blob)
+
+    return {
+        "phrases": len(phrase_ids),
+        "states": state_count,
+        "table_slots": slots,
+        "bytes": os.path.getsize(output_path)
+    }
+
+
+class LexiconPack:
+    """
+    A compiled lexicon pack, scanned straight from a read-only mmap.
+
+    Every section is read through memoryviews over the mapping, so loading
+    only parses the header and worker processes share the page cache
+    instead of each holding a copy. Matches behave like LexiconMatcher's;
+    tokens are compared by hash and every match is confirmed against the
+    phrase text.
+    """
+
+    def __init__(self, path: str):
+        self.name = "Lexicon Pack"
+        self.version = "1.0.0"
+        self.path = path
+        with open(path, 'rb') as pack_file:
+            self._map = mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, self.state_count, self.table_slots, output_count,
+         phrase_count, text_bytes, category_bytes) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} lexicon pack")
+        if sys.byteorder != "little":
+            # Sections are read in native order without conversion
+            self._map.close()
+            raise ValueError("Lexicon packs can only be mapped on little-endian hosts")
+
+        self._view = memoryview(self._map)
+        words = self._view[HEADER.size:]
+        offset = 0
+        sections = []
+        for count in (self.table_slots * TRANSITION_WORDS, self.state_count,
+                      self.state_count + 1, output_count, phrase_count * PHRASE_WORDS):
+            sections.append(words[offset:offset + 4 * count].cast('I'))
+            offset += 4 * count
+        (self._table, self._fail, self._output_starts,
+         self._outputs, self._phrases) = sections
+        self._text = words[offset:offset + text_bytes]
+        offset += text_bytes
+        self.categories: List[str] = json.loads(
+            bytes(words[offset:offset + category_bytes])
+        )
+        self._words = words
+        self.phrase_count = phrase_count
+        self._mask = self.table_slots - 1
+
+    def _next(self, state: int, hashed: int) -> Optional[int]:
+        """Follow the (state, token) transition, or None if there is none."""
+        table, mask = self._table, self._mask
+        slot = slot_for(state, hashed, mask)
+        while True:
+            base = slot * TRANSITION_WORDS
+            next_state = table[base + 2]
+            if next_state == EMPTY:
+                return None
+            if table[base] == state and table[base + 1] == hashed:
+                return next_state
+            slot = (slot + 1) & mask
+
+    def phrase(self, phrase_id: int) -> str:
+        base = phrase_id * PHRASE_WORDS
+        start = self._phrases[base + 2]
+        return bytes(self._text[start:start + self._phrases[base + 3]]).decode('utf-8')
+
+    def scan(self, text: str) -> List[LexiconMatch]:
+        """Return every phrase occurrence in lowercase text, ordered by start offset."""
+        fail, output_starts = self._fail, self._output_starts
+        outputs, phrases = self._outputs, self._phrases
+        matches = []
+        starts: List[int] = []
+        state = 0
+        for index, token_match in enumerate(WORD.finditer(text)):
+            hashed = token_hash(token_match.group())
+            starts.append(token_match.start())
+            next_state = self._next(state, hashed)
+            while next_state is None and state:
+                state = fail[state]
+                next_state = self._next(state, hashed)
+            state = next_state or 0
+            for position in range(output_starts[state], output_starts[state + 1]):
+                phrase_id = outputs[position]
+                length = phrases[phrase_id * PHRASE_WORDS + 1]
+                start, end = starts[index - length + 1], token_match.end()
+                phrase = self.phrase(phrase_id)
+                if text[start:end].split() == phrase.split():
+                    category = self.categories[phrases[phrase_id * PHRASE_WORDS]]
+                    matches.append(LexiconMatch(start, end, category, phrase))
+        matches.sort()
+        return matches
+
+    def close(self) -> None:
+        for view in (self._table, self._fail, self._output_starts, self._outputs,
+                     self._phrases, self._text, self._words, self._view):
+            view.release()
+        self._map.close()
+
+
+def load_packs(paths: Optional[str] = None) -> List[LexiconPack]:
+    """Load the comma-separated pack paths given, or those in TG_LEXICON_PACKS."""
+    paths = paths if paths is not None else os.environ.get("TG_LEXICON_PACKS", "")
+    return [LexiconPack(path.strip()) for path in paths.split(",") if path.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compile a TrustGraphed lexicon pack")
+    parser.add_argument("source", help="JSON file of {category: [phrases]} or a "
+                                       "directory of <category>.txt files")
+    parser.add_argument("output", help="Pack file to write, e.g. medical.tglx")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    stats = build_pack(load_lexicon_source(args.source), args.output)
+    print(f"Built {args.output}: {stats['phrases']} phrases, {stats['states']} states, "
+          f"{stats['bytes']} bytes in {time.perf_counter() - started:.2f}s")
+
+    started = time.perf_counter()
+    LexiconPack(args.output).close()
+    print(f"Load check: {1000 * (time.perf_counter() - started):.2f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+Merkle Hashing
+Streaming SHA-256 content hashes and Merkle trees over pages or chunks.
+
+Trees follow RFC 6962: leaves are hashed as SHA-256(0x00 || data) and
+interior nodes as SHA-256(0x01 || left || right), so a leaf can never be
+passed off as a node. An odd node at the end of a level is carried up
+unchanged. Hashes cross the API as lowercase hex strings.
+"""
+
+import hashlib
+from typing import Any, Dict, List, Optional
+
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+# Text without natural pages is split into leaves of this many characters
+DEFAULT_CHUNK_CHARS = 64 * 1024
+
+LEAF_UNITS = ("page", "chunk")
+
+
+def leaf_hash(data: bytes) -> bytes:
+    hasher = hashlib.sha256(LEAF_PREFIX)
+    hasher.update(data)
+    return hasher.digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def _next_level(level: List[bytes]) -> List[bytes]:
+    parents = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+    if len(level) % 2:
+        parents.append(level[-1])
+    return parents
+
+
+def merkle_levels(leaves: List[str]) -> List[List[bytes]]:
+    """Every level of the tree over hex leaf hashes, leaves first and root last."""
+    levels = [[bytes.fromhex(leaf) for leaf in leaves]]
+    while len(levels[-1]) > 1:
+        levels.append(_next_level(levels[-1]))
+    return levels
+
+
+def merkle_root(leaves: List[str]) -> str:
+    """Root of the tree over hex leaf hashes; the hash of nothing for an empty tree."""
+    if not leaves:
+        return hashlib.sha256(b"").hexdigest()
+    return merkle_levels(leaves)[-1][0].hex()
+
+
+def _audit_path(levels: List[List[bytes]], index: int) -> List[Dict[str, str]]:
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append({"side": "left" if sibling < index else "right",
+                          "hash": level[sibling].hex()})
+        index //= 2
+    return proof
+
+
+def inclusion_proof(leaves: List[str], index: int) -> List[Dict[str, str]]:
+    """
+    Audit path for leaves[index]: the sibling at each level, bottom up, and
+    the side it sits on. Levels where the node has no sibling are skipped.
+    """
+    if not 0 <= index < len(leaves):
+        raise ValueError(
+            f"Leaf index {index} is outside a tree of {len(leaves)} leaves"
+        )
+    return _audit_path(merkle_levels(leaves), index)
+
+
+def inclusion_proofs(leaves: List[str]) -> List[List[Dict[str, str]]]:
+    """Audit paths for every leaf, building the tree once."""
+    levels = merkle_levels(leaves)
+    return [_audit_path(levels, index) for index in range(len(leaves))]
+
+
+def root_from_proof(leaf: str, proof: List[Dict[str, str]]) -> str:
+    """Recompute the root from a hex leaf hash and its audit path."""
+    node = bytes.fromhex(leaf)
+    for step in proof:
+        sibling = bytes.fromhex(step["hash"])
+        if step["side"] == "left":
+            node = node_hash(sibling, node)
+        elif step["side"] == "right":
+            node = node_hash(node, sibling)
+        else:
+            raise ValueError(f"Proof step has unknown side '{step['side']}'")
+    return node.hex()
+
+
+def verify_inclusion(leaf: str, proof: List[Dict[str, str]], root: str) -> bool:
+    """True if the audit path links the leaf hash to the root."""
+    try:
+        return root_from_proof(leaf, proof) == root.lower()
+    except (KeyError, TypeError, ValueError):
+        return False
+
+
+class ContentHasher:
+    """
+    Incremental SHA-256 and Merkle leaves for text as it is extracted.
+
+    In page mode every update is one leaf. In chunk mode updates are cut
+    into leaves of exactly chunk_chars characters (the last may be shorter),
+    so the tree depends only on the text and anyone holding it can rebuild
+    it. Each leaf is encoded to UTF-8 once and feeds both the leaf hash and
+    the whole-content hash, so hashing never needs a second pass.
+    """
+
+    def __init__(self, leaf_unit: str = "chunk", chunk_chars: Optional[int] = None):
+        if leaf_unit not in LEAF_UNITS:
+            raise ValueError(f"Leaf unit must be one of {', '.join(LEAF_UNITS)}")
+        self.leaf_unit = leaf_unit
+        self.chunk_chars = ((chunk_chars or DEFAULT_CHUNK_CHARS)
+                            if leaf_unit == "chunk" else None)
+        self.characters = 0
+        self.leaves: List[Dict[str, Any]] = []
+        self._content = hashlib.sha256()
+        self._pending: List[str] = []
+        self._pending_chars = 0
+
+    def update(self, text: str) -> None:
+        if self.chunk_chars is None:
+            self._add_leaf(text)
+            return
+        # Cut at offsets rather than re-slicing the remainder, which would copy
+        # it per chunk
+        start = 0
+        while self._pending_chars + len(text) - start >= self.chunk_chars:
+            end = start + self.chunk_chars - self._pending_chars
+            self._pending.append(text[start:end])
+            self._flush()
+            start = end
+        if start < len(text):
+            self._pending.append(text[start:])
+            self._pending_chars += len(text) - start
+
+    def _flush(self) -> None:
+        if self._pending:
+            self._add_leaf("".join(self._pending))
+            self._pending = []
+            self._pending_chars = 0
+
+    def _add_leaf(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self._content.update(data)
+        self.leaves.append({"offset": self.characters, "length": len(text),
+                            "hash": leaf_hash(data).hex()})
+        self.characters += len(text)
+
+    def digest(self) -> Dict[str, Any]:
+        """Content hash and Merkle tree of everything hashed so far."""
+        self._flush()
+        return {
+            "sha256": self._content.hexdigest(),
+            "characters": self.characters,
+            "merkle": {
+                "algorithm": "sha256",
+                "leaf_unit": self.leaf_unit,
+                "chunk_chars": self.chunk_chars,
+                "root": merkle_root([leaf["hash"] for leaf in self.leaves]),
+                "leaves": self.leaves
+            }
+        }
+
+
+def hash_text(content: str, chunk_chars: Optional[int] = None) -> Dict[str, Any]:
+    """Digest of text held in memory, cut into chunk leaves."""
+    hasher = ContentHasher("chunk", chunk_chars)
+    hasher.update(content)
+    return hasher.digest()
+
+
+def prove_leaf(digest: Dict[str, Any], index: int) -> Dict[str, Any]:
+    """Inclusion proof for one page or chunk of a content digest."""
+    merkle = digest["merkle"]
+    proof = inclusion_proof([leaf["hash"] for leaf in merkle["leaves"]], index)
+    return {"leaf": merkle["leaves"][index], "index": index, "proof": proof,
+            "root": merkle["root"]}
@@ -0,0 +1,217 @@
+"""
+PDF Extraction Engine
+Page-parallel, streaming text extraction for PDF uploads.
+"""
+
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+
+class PageText(NamedTuple):
+    """Text and timing for a single extracted page."""
+    page_number: int
+    text: str
+    seconds: float
+    char_count: int
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def parse_page_range(value: Any) -> Optional[Tuple[int, Optional[int]]]:
+    """
+    Parse a 1-based inclusive page range such as "1-20", "7" or "5-" into a
+    0-based half-open (start, stop) pair; stop is None for open-ended ranges.
+    """
+    if value is None or str(value).strip() == "":
+        return None
+    text = str(value).strip()
+    first, separator, last = text.partition("-")
+    try:
+        start = int(first)
+        stop = int(last) if last.strip() else None
+    except ValueError:
+        raise ValueError(
+            f"Invalid page range '{text}' - use a form like 1-20"
+        ) from None
+    if not separator:
+        stop = start
+    if start < 1 or (stop is not None and stop < start):
+        raise ValueError(f"Invalid page range '{text}' - pages are numbered from 1")
+    return start - 1, stop
+
+
+def _get_executor(max_workers: int) -> ProcessPoolExecutor:
+    """Return the shared extraction pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # MuPDF keeps global state that is not fork-safe once documents
+            # have been opened in the parent, so workers are spawned fresh.
+            _executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+
+def open_pdf(source: Any):
+    """Open a PDF from a file path or from an in-memory bytes-like buffer."""
+    if isinstance(source, str):
+        return fitz.open(source, filetype="pdf")
+    return fitz.open(stream=source, filetype="pdf")
+
+
+def _extract_page_range(source: Any, start: int,
+                        stop: int) -> List[Tuple[int, str, float]]:
+    """Worker entry point: open the document once and extract pages [start, stop)."""
+    pdf_doc = open_pdf(source)
+    try:
+        return [_extract_page(pdf_doc, page_number)
+                for page_number in range(start, stop)]
+    finally:
+        pdf_doc.close()
+
+
+def _extract_page(pdf_doc, page_number: int) -> Tuple[int, str, float]:
+    """Extract one page, returning (page_number, text, seconds)."""
+    started = time.perf_counter()
+    text = pdf_doc[page_number].get_text()
+    return page_number, text, time.perf_counter() - started
+
+
+class PDFExtractionEngine:
+    def __init__(self, max_workers: Optional[int] = None, parallel_threshold: int = 32):
+        self.name = "PDF Extraction Engine"
+        self.version = "1.0.0"
+        self.max_workers = (max_workers or int(os.environ.get("TG_PDF_WORKERS", 0))
+                            or os.cpu_count() or 1)
+        # Below this many pages the process hop costs more than it saves
+        self.parallel_threshold = parallel_threshold
+        self.page_stats: List[Dict[str, Any]] = []
+        self.page_count = 0
+        self.page_range: Optional[Tuple[int, int]] = None
+
+    def split_ranges(self, page_count: int, workers: int) -> List[Tuple[int, int]]:
+        """Split [0, page_count) into one contiguous range per worker."""
+        workers = max(1, min(workers, page_count))
+        size, remainder = divmod(page_count, workers)
+        ranges = []
+        start = 0
+        for index in range(workers):
+            stop = start + size + (1 if index < remainder else 0)
+            ranges.append((start, stop))
+            start = stop
+        return ranges
+
+    def task_ranges(self, start: int, stop: int,
+                    task_pages: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Split [start, stop) into pool tasks: one per worker, or task_pages each."""
+        if task_pages:
+            return [(first, min(first + task_pages, stop))
+                    for first in range(start, stop, task_pages)]
+        return [(start + first, start + last)
+                for first, last in self.split_ranges(stop - start, self.max_workers)]
+
+    def iter_pages(self, source: Any,
+                   page_range: Optional[Tuple[int, Optional[int]]] = None,
+                   task_pages: Optional[int] = None) -> Iterator[PageText]:
+        """
+        Yield page texts in page order from a file path or bytes-like buffer.
+
+        Only pages inside page_range (0-based, half-open) are ever decoded.
+        Large ranges are split into tasks and extracted on the shared process
+        pool, with at most one task per worker in flight, so a consumer that
+        stops early leaves the remaining pages untouched. Small ranges are
+        extracted inline on the caller. Workers always open a path: spilled
+        uploads directly, in-memory ones after being written out once, so
+        no task is sent a copy of the document.
+        """
+        self.page_stats = []
+
+        pdf_doc = open_pdf(source)
+        self.page_count = pdf_doc.page_count
+        if self.page_count == 0:
+            pdf_doc.close()
+            raise ValueError("PDF has no pages")
+
+        start, stop = page_range if page_range else (0, None)
+        stop = self.page_count if stop is None else min(stop, self.page_count)
+        if start >= self.page_count:
+            pdf_doc.close()
+            raise ValueError(
+                f"Page range starts after the last page ({self.page_count} pages)"
+            )
+        self.page_range = (start, stop)
+
+        if stop - start < self.parallel_threshold or self.max_workers < 2:
+            try:
+                for page_number in range(start, stop):
+                    yield self._record(*_extract_page(pdf_doc, page_number))
+            finally:
+                pdf_doc.close()
+            return
+
+        pdf_doc.close()
+        if isinstance(source, str):
+            yield from self._iter_pooled(source, start, stop, task_pages)
+            return
+        # Deleted when the generator finishes or is closed
+        with tempfile.NamedTemporaryFile(prefix="tg_pdf_", suffix=".pdf") as spill:
+            spill.write(source)
+            spill.flush()
+            yield from self._iter_pooled(spill.name, start, stop, task_pages)
+
+    def _iter_pooled(self, path: str, start: int, stop: int,
+                     task_pages: Optional[int]) -> Iterator[PageText]:
+        """Extract [start, stop) from the file at path on the shared pool."""
+        executor = _get_executor(self.max_workers)
+        tasks = iter(self.task_ranges(start, stop, task_pages))
+        pending = deque(
+            executor.submit(_extract_page_range, path, *task)
+            for task in islice(tasks, self.max_workers)
+        )
+        try:
+            while pending:
+                pages = pending.popleft().result()
+                task = next(tasks, None)
+                if task is not None:
+                    pending.append(executor.submit(_extract_page_range, path, *task))
+                for page_number, text, seconds in pages:
+                    yield self._record(page_number, text, seconds)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _record(self, page_number: int, text: str, seconds: float) -> PageText:
+        """Build a PageText and keep its timing for the extraction report."""
+        page = PageText(page_number, text, seconds, len(text))
+        self.page_stats.append({
+            "page": page_number + 1,
+            "seconds": round(seconds, 6),
+            "characters": page.char_count
+        })
+        return page
+
+    def report(self) -> Dict[str, Any]:
+        """Summarise per-page timing and character counts for the last run."""
+        return {
+            "engine": self.name,
+            "total_pages": self.page_count,
+            "page_range": ([self.page_range[0] + 1, self.page_range[1]]
+                           if self.page_range else None),
+            "pages": len(self.page_stats),
+            "characters": sum(stat["characters"] for stat in self.page_stats),
+            "page_seconds": round(sum(stat["seconds"] for stat in self.page_stats), 6),
+            "page_stats": self.page_stats
+        }
@@ -0,0 +1,119 @@
+"""
+Evaluation Pipeline
+Runs one document through SDG, AIE, CCE, ZFP and the TrustScore Engine.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+from .aie import AssertionIntegrityEngine
+from .cce import ConfidenceComputationEngine
+from .certificate import CertificateGenerator
+from .document_context import DocumentContext
+from .score_engine import TrustScoreEngine
+from .scoring_policy import default_store
+from .sdg import SourceDataGrappler
+from .zfp import ZeroFabricationProtocol
+
+# Run through every module by warm(), so a request never pays for first use
+WARMUP_CONTENT = (
+    "According to the World Health Organization (2023), vaccines have prevented "
+    "millions of deaths. Studies show that approximately 87% of experts agree, and "
+    "it is widely known that results from 2019 and 2021 were never false. See "
+    "https://example.org/report for $100 of detail."
+)
+
+
+class Pipeline:
+    """
+    Every evaluation module, built once and shared by all requests.
+
+    Modules keep no per-document state (that lives on the DocumentContext
+    each document gets), so one pipeline serves any number of threads at
+    once. Attributes cannot be reassigned after construction. warm() runs a
+    sample document through so the lexicon automaton, pattern tables and
+    scoring policy are all built before the first request, and before a
+    preloading server forks its workers.
+    """
+
+    __slots__ = ("lexicon_packs", "policies", "sdg", "aie", "cce", "zfp",
+                 "score_engine", "certificates")
+
+    def __init__(self, lexicon_packs: Optional[List[Any]] = None,
+                 policies: Optional[Any] = None, signer: Optional[Any] = None,
+                 is_issued: Optional[Callable[[str], bool]] = None):
+        lexicon_packs = tuple(lexicon_packs or ())
+        policies = policies or default_store()
+        for name, value in (
+            ("lexicon_packs", lexicon_packs),
+            ("policies", policies),
+            ("sdg", SourceDataGrappler()),
+            ("aie", AssertionIntegrityEngine(lexicon_packs)),
+            ("cce", ConfidenceComputationEngine(lexicon_packs)),
+            ("zfp", ZeroFabricationProtocol(lexicon_packs)),
+            ("score_engine", TrustScoreEngine(policies)),
+            ("certificates", CertificateGenerator(signer, is_issued))
+        ):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Pipeline is immutable; build a new one instead")
+
+    def warm(self) -> "Pipeline":
+        """Run a sample document through every module once; returns the pipeline."""
+        analysis = self.analyze(WARMUP_CONTENT)
+        # A generator of its own, so warming never reaches the signer or certificate
+        # store
+        score_result = analysis["module_results"]["score_result"]
+        CertificateGenerator().create_certificate(WARMUP_CONTENT, score_result)
+        return self
+
+    def analyze(self, content: str, content_assertion: str = "unsure",
+                progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Score a document. Returns the module results keyed as the TrustScore
+        Engine reads them, plus the document's assertions and their AIE feature
+        masks for the cross-document assertion store. Everything returned is
+        plain data, so it can come back from a worker process. progress, if
+        given, is called with each module's stage name ("sdg", "aie", "cce",
+        "zfp", "score") as that module starts.
+        """
+        report = progress or (lambda _stage: None)
+        results = {}
+
+        # Text is lowercased and split into sentences and tokens once, then shared
+        context = DocumentContext(content, self.lexicon_packs)
+
+        report("sdg")
+        # Step 1: Extract assertions and citations
+        sdg_result = self.sdg.process(content, context)
+        results['sdg_result'] = sdg_result
+
+        report("aie")
+        # Step 2: Check assertion integrity across every assertion in the document
+        assertions = context.assertions()
+        aie_result = self.aie.process(content, assertions, context)
+        results['aie_result'] = aie_result
+
+        report("cce")
+        # Step 3: Compute confidence scores for every assertion
+        citations = sdg_result.get('citations', [])
+        cce_result = self.cce.process(content, assertions, citations, context)
+        results['cce_result'] = cce_result
+
+        report("zfp")
+        # Step 4: Check for fabrication
+        zfp_result = self.zfp.process(content, context)
+        results['zfp_result'] = zfp_result
+
+        report("score")
+        # Step 5: Generate final trust score with assertion type
+        score_result = self.score_engine.process(results, content_assertion)
+        results['score_result'] = score_result
+
+        masks_by_text = context.features.get("assertion_masks", {})
+        return {
+            "module_results": results,
+            "assertions": assertions,
+            "assertion_masks": [masks_by_text.get(assertion, 0)
+                                for assertion in assertions]
+        }
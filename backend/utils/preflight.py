@@ -0,0 +1,128 @@
+"""
+Document Preflight
+Sizes an upload from headers and cheap metadata, without extracting text.
+"""
+
+import os
+import zipfile
+from typing import Any, Dict, Optional
+
+from .docx_extractor import DOCUMENT_PART
+from .ingest import HashingSpool, ingest_upload
+from .pdf_extractor import open_pdf
+
+# Rough figures used to turn document size into an evaluation cost estimate
+CHARS_PER_PDF_PAGE = 3000
+DOCX_TEXT_PER_XML_BYTE = 0.2
+DOC_TEXT_PER_BYTE = 0.3
+PDF_SECONDS_PER_PAGE = 0.01
+XML_SECONDS_PER_BYTE = 1 / (40 * 1024 * 1024)
+SALVAGE_SECONDS_PER_BYTE = 1 / (40 * 1024 * 1024)
+PIPELINE_SECONDS_PER_CHAR = 1 / 200000
+
+# (upper bound in estimated seconds, cost class)
+COST_CLASSES = [
+    (1.0, "light"),
+    (5.0, "standard"),
+    (30.0, "heavy"),
+]
+OVERSIZED = "oversized"
+
+SUPPORTED_FILE_TYPES = ('.txt', '.md', '.pdf', '.docx', '.doc')
+
+
+class DocumentPreflight:
+    def __init__(self, max_file_size_mb: Optional[float] = None):
+        self.name = "Document Preflight"
+        self.version = "1.0.0"
+        self.max_file_size_mb = max_file_size_mb if max_file_size_mb is not None else \
+            float(os.environ.get("MAX_FILE_SIZE_MB", 10))
+
+    def byte_length(self, file: Any) -> int:
+        """Measure an upload by seeking, leaving the read position at the start."""
+        file.seek(0, os.SEEK_END)
+        size = file.tell()
+        file.seek(0)
+        return size
+
+    def probe_pdf(self, upload: HashingSpool) -> Dict[str, Any]:
+        """Read page count and xref size; pages themselves are never decoded."""
+        pdf_doc = open_pdf(upload.path or upload.view())
+        try:
+            return {
+                "page_count": pdf_doc.page_count,
+                "xref_length": pdf_doc.xref_length(),
+                "encrypted": bool(pdf_doc.needs_pass)
+            }
+        finally:
+            pdf_doc.close()
+
+    def probe_docx(self, upload: HashingSpool) -> Dict[str, Any]:
+        """Read document.xml sizes from the zip central directory."""
+        with zipfile.ZipFile(upload, 'r') as archive:
+            info = archive.getinfo(DOCUMENT_PART)
+            return {
+                "document_xml_bytes": info.file_size,
+                "document_xml_compressed_bytes": info.compress_size
+            }
+
+    def estimate(self, file_type: str, byte_length: int,
+                 metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Estimate extracted characters and evaluation time for a probed document."""
+        if file_type == '.pdf':
+            page_count = metadata.get("page_count", 0)
+            characters = page_count * CHARS_PER_PDF_PAGE
+            extraction_seconds = (page_count * PDF_SECONDS_PER_PAGE
+                                  / (os.cpu_count() or 1))
+        elif file_type == '.docx' and "document_xml_bytes" in metadata:
+            characters = int(metadata["document_xml_bytes"] * DOCX_TEXT_PER_XML_BYTE)
+            extraction_seconds = metadata["document_xml_bytes"] * XML_SECONDS_PER_BYTE
+        elif file_type in ('.doc', '.docx'):
+            characters = int(byte_length * DOC_TEXT_PER_BYTE)
+            extraction_seconds = byte_length * SALVAGE_SECONDS_PER_BYTE
+        else:
+            characters = byte_length
+            extraction_seconds = 0.0
+
+        estimated_seconds = extraction_seconds + characters * PIPELINE_SECONDS_PER_CHAR
+        cost_class = next((label for limit, label in COST_CLASSES
+                           if estimated_seconds < limit), OVERSIZED)
+
+        return {
+            "estimated_characters": characters,
+            "estimated_seconds": round(estimated_seconds, 3),
+            "cost_class": cost_class
+        }
+
+    def probe(self, file: Any) -> Dict[str, Any]:
+        """Inspect an upload and return its size, metadata and cost estimate."""
+        filename = file.filename.lower() if file.filename else ""
+        file_type = os.path.splitext(filename)[1]
+        upload = ingest_upload(file)
+        byte_length = upload.size
+
+        metadata: Dict[str, Any] = {}
+        probe_error = None
+        try:
+            if file_type == '.pdf':
+                metadata = self.probe_pdf(upload)
+            elif file_type == '.docx':
+                metadata = self.probe_docx(upload)
+        except Exception as e:
+            probe_error = str(e) if str(e) else type(e).__name__
+        finally:
+            upload.seek(0)
+
+        estimate = self.estimate(file_type, byte_length, metadata)
+        within_size_limit = byte_length <= self.max_file_size_mb * 1024 * 1024
+
+        return {
+            "filename": file.filename,
+            "file_type": file_type,
+            "byte_length": byte_length,
+            "metadata": metadata,
+            "probe_error": probe_error,
+            **estimate,
+            "accepted": (file_type in SUPPORTED_FILE_TYPES and within_size_limit
+                         and estimate["cost_class"] != OVERSIZED)
+        }
@@ -3,11 +3,14 @@ TrustGraphed Score Engine
 Aggregates all module results into a final trust score
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from .cce import compute_trust_score
+from .scoring_policy import PolicyStore, default_store
 
 class TrustScoreEngine:
-    def __init__(self):
+    def __init__(self, policies: Optional[PolicyStore] = None):
+        # Scoring rules come from the active policy file and are hot-reloaded
+        self.policies = policies or default_store()
         self.weights = {
             'data_extraction': 0.20,      # SDG quality
             'assertion_integrity': 0.25,  # AIE results
@@ -22,36 +25,31 @@ class TrustScoreEngine:
         # Extract signals from module results
         signals = self._extract_signals(module_results)
 
-        # Use consolidated scoring logic from CCE
-        from .cce import compute_trust_score
-        score_data = compute_trust_score(signals, assertion_type)
+        # Score with the active policy, read once so the whole request uses one version
+        policy = self.policies.current()
+        score_data = policy.score(signals, assertion_type)
 
         # Build component scores for transparency
         component_scores = self._build_component_scores(module_results)
 
         # Generate insights
-        insights = self._generate_insights(module_results, score_data, assertion_type)
-
-        # Map band to trust level
-        trust_level_mapping = {
-            "High Trust": "HIGH",
-            "Verified": "MEDIUM",
-            "Low Trust": "LOW", 
-            "Unverified": "VERY LOW"
-        }
+        insights = self._generate_insights(module_results, score_data,
+                                           assertion_type, policy)
 
         # Generate disclaimer
-        disclaimer = self._generate_disclaimer(module_results, score_data, assertion_type)
+        disclaimer = self._generate_disclaimer(module_results, score_data,
+                                               assertion_type, policy)
 
         return {
             'trust_score': score_data["final_score"] / 100.0,  # Normalize to 0-1
-            'trust_level': trust_level_mapping.get(score_data["band"], "VERY LOW"),
+            'trust_level': score_data["trust_level"],
             'trust_band': score_data["band"],
             'component_scores': component_scores,
             'insights': insights,
             'disclaimer': disclaimer,
             'signal_breakdown': score_data["breakdown"],
             'assertion_type': assertion_type,
+            'scoring_policy': policy.stamp,
             'detailed_explanation': {
                 'scoring_method': 'Protocol-aligned with assertion type weighting',
                 'base_signals': signals,
@@ -116,19 +114,14 @@ class TrustScoreEngine:
 
         return component_scores
 
-    def _generate_insights(self, module_results: Dict[str, Any], score_data: Dict[str, Any], assertion_type: str) -> list:
+    def _generate_insights(self, module_results: Dict[str, Any],
+                           score_data: Dict[str, Any], assertion_type: str,
+                           policy) -> list:
         """Generate human-readable insights."""
         insights = []
 
         # Assertion type insight
-        assertion_insights = {
-            "original": "Content declared as fully original - evaluating claim consistency",
-            "ai": "✅ TRANSPARENCY: AI usage openly declared - builds reader trust through honesty",
-            "copied": "✅ TRANSPARENCY: Copied content openly declared - builds reader trust through honesty",
-            "mixed": "✅ TRANSPARENCY: Mixed sources openly declared - builds reader trust through honesty",
-            "unsure": "⚠️ Content source undeclared - readers cannot assess information origin"
-        }
-        insights.append(assertion_insights.get(assertion_type, "Unknown content declaration"))
+        insights.append(policy.declaration_insight(assertion_type))
 
         # Citation insights
         citations = module_results.get('sdg_result', {}).get('citations_count', 0)
@@ -163,17 +156,19 @@ class TrustScoreEngine:
             insights.append(f"Detected {flags} potential content reliability indicators to review")
 
         # Overall score insight
-        final_score = score_data["final_score"]
-        if final_score < 25:
+        band = policy.bands.index(policy.band_for(score_data["final_score"]))
+        if band == len(policy.bands) - 1:
             insights.append("Overall trust score is very low - recommend additional verification")
-        elif final_score < 50:
+        elif band == len(policy.bands) - 2:
             insights.append("Overall trust score is low - recommend additional verification")
-        elif final_score >= 75:
+        elif band == 0:
             insights.append("High trust score - content appears credible")
 
         return insights
 
-    def _generate_disclaimer(self, module_results: Dict[str, Any], score_data: Dict[str, Any], assertion_type: str) -> str:
+    def _generate_disclaimer(self, module_results: Dict[str, Any],
+                             score_data: Dict[str, Any], assertion_type: str,
+                             policy) -> str:
         """Generate disclaimer statement explaining the score calculation."""
         final_score = score_data["final_score"]
         citations = module_results.get('sdg_result', {}).get('citations_count', 0)
@@ -205,14 +200,7 @@ class TrustScoreEngine:
             factors.append("honest AI/mixed content declaration")
         
         # Generate score band explanation
-        if final_score >= 75:
-            score_explanation = "indicates high trustworthiness"
-        elif final_score >= 50:
-            score_explanation = "indicates moderate trustworthiness"
-        elif final_score >= 25:
-            score_explanation = "indicates low trustworthiness"
-        else:
-            score_explanation = "indicates very low trustworthiness"
+        score_explanation = policy.band_for(final_score).explanation
         
         # Combine factors
         factor_text = ", ".join(factors)
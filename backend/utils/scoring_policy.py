@@ -0,0 +1,407 @@
+"""
+Scoring Policy
+Versioned, declarative trust-scoring rules compiled into a reusable evaluator.
+
+Policies are JSON files (see policies/default.json). The active file is
+named by TG_SCORING_POLICY and re-read when it changes, so weights can be
+tuned without a restart. Compile and benchmark a policy with:
+
+    python -m utils.scoring_policy policies/default.json
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_POLICY_PATH = os.path.join(BACKEND_DIR, "policies", "default.json")
+# Seconds between checks of the policy file for changes
+DEFAULT_RELOAD_SECONDS = 2.0
+
+NO_CITATIONS_INSIGHT = "⚠️ No citations found - claims lack supporting evidence"
+SINGLE_CITATION_INSIGHT = ("📄 Single citation found - additional sources would "
+                           "strengthen credibility")
+WELL_CITED_INSIGHT = "✅ Well-cited content with multiple supporting sources"
+TRANSPARENT_INSIGHT = ("✅ TRANSPARENCY: Content sources openly declared - "
+                       "builds reader trust")
+UNDECLARED_INSIGHT = ("⚠️ Content source undeclared - readers cannot assess "
+                      "information origin")
+MISMATCH_INSIGHT = ("🚨 TRANSPARENCY MISMATCH: High AI characteristics detected "
+                    "but claimed as original")
+TRAPDOOR_INSIGHT = ("⛔ TRAPDOOR ACTIVATED: Critical trust factors missing - "
+                    "score capped")
+HIGH_SCORE_INSIGHT = ("🎯 High trust score - content demonstrates strong "
+                      "credibility indicators")
+LOW_SCORE_INSIGHT = ("📉 Very low trust score - recommend additional "
+                     "verification before use")
+
+
+class Declaration(NamedTuple):
+    """How one declared assertion type is scored."""
+    multiplier: float
+    uncited_cap: Optional[float]
+    claims_original: bool
+    transparent: bool
+    undeclared: bool
+    insight: str
+
+
+class Band(NamedTuple):
+    min_score: float
+    band: str
+    trust_level: str
+    explanation: str
+
+
+def _number(section: Dict[str, Any], key: str, where: str) -> float:
+    value = section.get(key)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"Scoring policy needs a number for '{where}{key}'")
+    return value
+
+
+def _section(spec: Dict[str, Any], key: str) -> Dict[str, Any]:
+    value = spec.get(key)
+    if not isinstance(value, dict):
+        raise ValueError(f"Scoring policy needs a '{key}' object")
+    return value
+
+
+def _declaration(rule: Dict[str, Any], where: str) -> Declaration:
+    return Declaration(
+        multiplier=_number(rule, "multiplier", where),
+        uncited_cap=(_number(rule, "uncited_cap", where)
+                     if "uncited_cap" in rule else None),
+        claims_original=bool(rule.get("claims_original", False)),
+        transparent=bool(rule.get("transparent", False)),
+        undeclared=bool(rule.get("undeclared", False)),
+        insight=str(rule.get("insight", ""))
+    )
+
+
+class ScoringPolicy:
+    """
+    A scoring policy compiled for repeated evaluation.
+
+    Every rule is validated and resolved once, so scoring a document is a
+    few comparisons and one dict lookup for the declared assertion type.
+    The default policy scores exactly like cce.compute_trust_score.
+    """
+
+    def __init__(self, spec: Dict[str, Any], source: Optional[str] = None):
+        self.name = str(spec.get("name", "unnamed"))
+        self.version = str(spec.get("version", "0"))
+        self.description = str(spec.get("description", ""))
+        self.source = source
+
+        self.base_score = _number(spec, "base_score", "")
+        assertions = _section(spec, "assertions")
+        self.assertion_points = _number(assertions, "points_each", "assertions.")
+        self.assertion_max_points = _number(assertions, "max_points", "assertions.")
+        citation_points = _section(spec, "citations").get("points_by_count")
+        if not isinstance(citation_points, list) or len(citation_points) < 2:
+            raise ValueError("Scoring policy needs 'citations.points_by_count' "
+                             "with at least two entries")
+        self.citation_points = tuple(_number({"points": points}, "points", "citations.")
+                                     for points in citation_points)
+        self.author_bonus = _number(spec, "author_bonus", "")
+        contradictions = _section(spec, "contradictions")
+        self.contradiction_penalty = _number(contradictions, "penalty_each",
+                                             "contradictions.")
+        self.contradiction_max_penalty = _number(contradictions, "max_penalty",
+                                                 "contradictions.")
+        mismatch = _section(spec, "transparency_mismatch")
+        self.mismatch_threshold = _number(mismatch, "ai_likelihood_above",
+                                          "transparency_mismatch.")
+        self.mismatch_scale = _number(mismatch, "penalty_scale",
+                                      "transparency_mismatch.")
+        trapdoors = _section(spec, "trapdoors")
+        self.uncited_cap = _number(trapdoors, "uncited_cap", "trapdoors.")
+        overclaimed = _section(trapdoors, "overclaimed")
+        self.overclaim_threshold = _number(overclaimed, "ai_likelihood_above",
+                                           "trapdoors.overclaimed.")
+        self.overclaim_cap = _number(overclaimed, "cap", "trapdoors.overclaimed.")
+
+        self.declarations = {
+            declared.lower(): _declaration(rule, f"declarations.{declared}.")
+            for declared, rule in _section(spec, "declarations").items()
+        }
+        self.unknown_declaration = _declaration(_section(spec, "unknown_declaration"),
+                                                "unknown_declaration.")
+
+        bands = spec.get("bands")
+        if not isinstance(bands, list) or not bands:
+            raise ValueError("Scoring policy needs a non-empty 'bands' list")
+        self.bands = tuple(sorted(
+            (Band(_number(band, "min_score", "bands."), str(band["band"]),
+                  str(band["trust_level"]), str(band.get("explanation", "")))
+             for band in bands),
+            reverse=True
+        ))
+
+        # Whole-number rules keep batch rescoring on integer base scores
+        self.integral = all(float(value).is_integer() for value in (
+            self.base_score, self.assertion_points, self.assertion_max_points,
+            *self.citation_points, self.author_bonus, self.contradiction_penalty,
+            self.contradiction_max_penalty, self.uncited_cap, self.overclaim_cap,
+            *(rule.uncited_cap for rule in self.declarations.values()
+              if rule.uncited_cap is not None)
+        ))
+
+        canonical = json.dumps(spec, sort_keys=True, separators=(",", ":"),
+                               ensure_ascii=False)
+        self.stamp = {
+            "name": self.name,
+            "version": self.version,
+            "sha256": hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        }
+
+    @classmethod
+    def from_file(cls, path: str) -> "ScoringPolicy":
+        with open(path, encoding="utf-8") as policy_file:
+            try:
+                spec = json.load(policy_file)
+            except json.JSONDecodeError as e:
+                raise ValueError(
+                    f"Scoring policy {path} is not valid JSON: {str(e)}"
+                ) from e
+        if not isinstance(spec, dict):
+            raise ValueError(f"Scoring policy {path} must be a JSON object")
+        return cls(spec, path)
+
+    def band_for(self, score: float) -> Band:
+        """The highest band whose minimum the score reaches; else the lowest band."""
+        for band in self.bands:
+            if score >= band.min_score:
+                return band
+        return self.bands[-1]
+
+    def declaration_insight(self, assertion_type: str) -> str:
+        """Insight for a declaration, looked up exactly as it was given."""
+        rule = (self.declarations.get(assertion_type)
+                if assertion_type == assertion_type.lower() else None)
+        return (rule or self.unknown_declaration).insight
+
+    def score(self, signals: Dict[str, Any],
+              assertion_type: str = "unsure") -> Dict[str, Any]:
+        """Score extracted signals; returns the structure compute_trust_score does."""
+        rule = self.declarations.get(assertion_type.lower(), self.unknown_declaration)
+        breakdown = {}
+        base_score = self.base_score
+
+        assertions = signals.get("assertions", 0)
+        if assertions > 0:
+            points = min(assertions * self.assertion_points, self.assertion_max_points)
+            base_score += points
+            breakdown["assertion_contribution"] = points
+
+        citations = signals.get("citations", 0)
+        if citations > 0:
+            last = len(self.citation_points) - 1
+            points = self.citation_points[min(int(citations), last)]
+            base_score += points
+            breakdown["citation_contribution"] = points
+
+        author_detected = signals.get("author_detected", False)
+        if author_detected:
+            base_score += self.author_bonus
+            breakdown["author_bonus"] = self.author_bonus
+
+        contradictions = signals.get("contradictions", 0)
+        if contradictions > 0:
+            penalty = min(contradictions * self.contradiction_penalty,
+                          self.contradiction_max_penalty)
+            base_score -= penalty
+            breakdown["contradiction_penalty"] = penalty
+
+        ai_likelihood = signals.get("ai_likelihood", 0)
+        mismatched = rule.claims_original and ai_likelihood > self.mismatch_threshold
+        if mismatched:
+            penalty = int(ai_likelihood * self.mismatch_scale)
+            breakdown["transparency_alignment_penalty"] = penalty
+            base_score -= penalty
+
+        if citations == 0 and not author_detected:
+            cap = self.uncited_cap if rule.uncited_cap is None else rule.uncited_cap
+            base_score = min(base_score, cap)
+            breakdown["trapdoor_applied"] = True
+        if rule.claims_original and ai_likelihood > self.overclaim_threshold:
+            base_score = min(base_score, self.overclaim_cap)
+            breakdown["trapdoor_applied"] = True
+
+        breakdown["transparency_multiplier"] = rule.multiplier
+        final_score = max(0, min(100, round(base_score * rule.multiplier, 1)))
+        breakdown["final_score"] = final_score
+        band = self.band_for(final_score)
+
+        insights = []
+        if citations == 0:
+            insights.append(NO_CITATIONS_INSIGHT)
+        elif citations == 1:
+            insights.append(SINGLE_CITATION_INSIGHT)
+        elif citations >= 3:
+            insights.append(WELL_CITED_INSIGHT)
+        if rule.transparent:
+            insights.append(TRANSPARENT_INSIGHT)
+        elif rule.undeclared:
+            insights.append(UNDECLARED_INSIGHT)
+        if mismatched:
+            insights.append(MISMATCH_INSIGHT)
+        if breakdown.get("trapdoor_applied"):
+            insights.append(TRAPDOOR_INSIGHT)
+        if band is self.bands[0]:
+            insights.append(HIGH_SCORE_INSIGHT)
+        elif band is self.bands[-1]:
+            insights.append(LOW_SCORE_INSIGHT)
+
+        return {
+            "final_score": final_score,
+            "band": band.band,
+            "trust_level": band.trust_level,
+            "breakdown": breakdown,
+            "insights": insights,
+            "assertion_type": assertion_type,
+            "scoring_method": self.description
+        }
+
+
+class PolicyStore:
+    """
+    The active scoring policy, reloaded when its file changes.
+
+    Each worker process keeps its own store and checks the file's mtime and
+    size at most every reload_seconds. A changed file is compiled before it
+    replaces the current policy in a single assignment, so a request sees
+    either the old policy or the new one, never a mix; a file that fails to
+    compile is logged and the old policy stays active. Replace policy files
+    with a rename (write elsewhere, then mv) so a half-written file is never read.
+    """
+
+    def __init__(self, path: Optional[str] = None,
+                 reload_seconds: Optional[float] = None):
+        self.name = "Policy Store"
+        self.version = "1.0.0"
+        self.path = path or os.environ.get("TG_SCORING_POLICY", DEFAULT_POLICY_PATH)
+        if reload_seconds is None:
+            reload_seconds = float(os.environ.get("TG_SCORING_POLICY_RELOAD_SECONDS",
+                                                  DEFAULT_RELOAD_SECONDS))
+        self.reload_seconds = reload_seconds
+        self._lock = threading.Lock()
+        self._signature = self._file_signature()
+        self._policy = ScoringPolicy.from_file(self.path)
+        self._checked_at = time.monotonic()
+        self.reloads = 0
+
+    def _file_signature(self):
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def current(self) -> ScoringPolicy:
+        """The active policy, after checking for a newer file if one is due."""
+        if time.monotonic() - self._checked_at >= self.reload_seconds:
+            self.check()
+        return self._policy
+
+    def check(self) -> bool:
+        """Reload the policy if its file changed; True if a new policy is active."""
+        if not self._lock.acquire(blocking=False):
+            # Another thread is already checking; keep serving the current policy
+            return False
+        try:
+            self._checked_at = time.monotonic()
+            try:
+                signature = self._file_signature()
+                if signature == self._signature:
+                    return False
+                policy = ScoringPolicy.from_file(self.path)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Scoring policy reload failed, keeping "
+                      f"{self._policy.stamp['version']}: {str(e)}")
+                return False
+            self._signature = signature
+            self._policy = policy
+            self.reloads += 1
+            print(f"Scoring policy {policy.name} {policy.version} "
+                  f"loaded from {self.path}")
+            return True
+        finally:
+            self._lock.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "reloads": self.reloads, **self._policy.stamp}
+
+
+@lru_cache(maxsize=None)
+def default_policy() -> ScoringPolicy:
+    """The packaged default policy, compiled once per process."""
+    return ScoringPolicy.from_file(DEFAULT_POLICY_PATH)
+
+
+@lru_cache(maxsize=None)
+def default_store() -> PolicyStore:
+    """The process-wide store of the active policy (TG_SCORING_POLICY)."""
+    return PolicyStore()
+
+
+def benchmark_signals() -> List[Dict[str, Any]]:
+    """A grid of signals covering every rule, cap and trapdoor."""
+    keys = ("assertions", "citations", "contradictions", "author_detected",
+            "ai_likelihood")
+    return [
+        dict(zip(keys, values, strict=True))
+        for values in itertools.product(
+            range(7), range(5), range(5), (False, True),
+            (0.0, 0.3, 0.61, 0.65, 0.71, 0.95)
+        )
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .cce import compute_trust_score
+
+    parser = argparse.ArgumentParser(
+        description="Compile a TrustGraphed scoring policy and benchmark it"
+    )
+    parser.add_argument("policy", nargs="?", default=DEFAULT_POLICY_PATH,
+                        help="Policy JSON file")
+    parser.add_argument("--rounds", type=int, default=5,
+                        help="Passes over the benchmark signal grid")
+    args = parser.parse_args(argv)
+
+    policy = ScoringPolicy.from_file(args.policy)
+    print(f"Compiled {policy.name} {policy.version} ({policy.stamp['sha256'][:12]})")
+
+    declarations = ["original", "ai", "copied", "mixed", "unsure", "Other"]
+    cases = [(signals, declared) for signals in benchmark_signals()
+             for declared in declarations]
+    differences = sum(policy.score(signals, declared)
+                      != compute_trust_score(signals, declared)
+                      for signals, declared in cases)
+    print(f"Differences from compute_trust_score: {differences} of {len(cases)}")
+
+    timings = {}
+    for label, scorer in (("compute_trust_score", compute_trust_score),
+                          ("policy", policy.score)):
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            for signals, declared in cases:
+                scorer(signals, declared)
+        timings[label] = time.perf_counter() - started
+        per_score = timings[label] / (args.rounds * len(cases))
+        print(f"{label}: {1e6 * per_score:.2f}us per score")
+
+    if timings["policy"] > timings["compute_trust_score"]:
+        print("Compiled policy is slower than compute_trust_score")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,34 +5,60 @@ Extracts assertions and citations from input text.
 """
 
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from .document_context import DocumentContext
+
+URL_PATTERN = re.compile(r'https?://[^\s]+')
+# Four consecutive digits make a parenthetical a year-based citation
+CITATION_YEAR = re.compile(r'\d{4}')
 
 class SourceDataGrappler:
     def __init__(self):
         self.name = "Source Data Grappler"
         self.version = "1.0.0"
     
-    def extract_assertions(self, content: str) -> List[str]:
+    def extract_assertions(self, content: str,
+                           context: Optional[DocumentContext] = None) -> List[str]:
         """Extract potential assertions from text."""
-        # Simple sentence splitting for now
-        sentences = re.split(r'[.!?]+', content)
-        assertions = [s.strip() for s in sentences if len(s.strip()) > 10]
-        return assertions
+        # Sentence spans are computed once by the shared document context
+        context = context or DocumentContext(content)
+        return context.assertions()
     
     def extract_citations(self, content: str) -> List[str]:
         """Extract citations or references from text."""
         # Look for URL patterns, parenthetical citations, etc.
-        url_pattern = r'https?://[^\s]+'
-        citation_pattern = r'\([^)]*\d{4}[^)]*\)'  # Year-based citations
-        
-        urls = re.findall(url_pattern, content)
-        citations = re.findall(citation_pattern, content)
+        urls = URL_PATTERN.findall(content)
+        citations = self.extract_year_citations(content)
         
         return urls + citations
+
+    def extract_year_citations(self, content: str) -> List[str]:
+        """
+        Find parentheticals containing a year (four consecutive digits).
+
+        Each '(' is paired with the next ')' and the text between is searched
+        once, so unbalanced input takes linear time. The previous regex
+        backtracked over every unclosed '(' and every digit run inside it.
+        """
+        citations = []
+        position = 0
+        while True:
+            start = content.find("(", position)
+            if start < 0:
+                break
+            end = content.find(")", start + 1)
+            if end < 0:
+                break
+            if CITATION_YEAR.search(content, start + 1, end):
+                citations.append(content[start:end + 1])
+            position = end + 1
+        return citations
     
-    def process(self, content: str) -> Dict[str, Any]:
+    def process(self, content: str,
+                context: Optional[DocumentContext] = None) -> Dict[str, Any]:
         """Main processing function."""
-        assertions = self.extract_assertions(content)
+        assertions = self.extract_assertions(content, context)
         citations = self.extract_citations(content)
         
         return {
@@ -0,0 +1,137 @@
+"""
+Similarity Index
+MinHash/LSH candidate search for near-duplicate assertion pairs.
+"""
+
+import difflib
+import hashlib
+from array import array
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+SHINGLE_SIZE = 4
+BANDS = 32
+ROWS = 3
+
+# Up to this many texts every pair is compared directly, which is exact
+EXACT_PAIR_LIMIT = 50
+# Each member of an LSH bucket is paired with at most this many later members,
+# so boilerplate that fills one bucket costs linear rather than quadratic time
+BUCKET_NEIGHBOURS = 4
+
+
+class SimilarityIndex:
+    """
+    Find text pairs whose SequenceMatcher ratio exceeds a threshold.
+
+    Texts that are identical once whitespace is collapsed are grouped first:
+    each copy is paired only with the first occurrence, and only one text
+    per group takes part in the search. Small inputs compare every pair.
+    Larger inputs are shingled into character 4-grams and MinHashed, and
+    only pairs sharing an LSH band bucket are compared; with 32 bands of 3
+    rows, pairs above the 0.6 ratio threshold are kept with high probability
+    while unrelated pairs are never scored. Within a bucket each text is
+    paired with at most bucket_neighbours later texts.
+    """
+
+    def __init__(self, threshold: float = 0.6, bands: int = BANDS, rows: int = ROWS,
+                 exact_limit: int = EXACT_PAIR_LIMIT,
+                 bucket_neighbours: int = BUCKET_NEIGHBOURS):
+        self.name = "Similarity Index"
+        self.version = "1.0.0"
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self.exact_limit = exact_limit
+        self.bucket_neighbours = bucket_neighbours
+        self.permutations = bands * rows
+
+    def shingles(self, text: str) -> Set[str]:
+        """Character 4-grams of text; short texts are a single shingle."""
+        if len(text) <= SHINGLE_SIZE:
+            return {text}
+        return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+    def signatures(self, texts: List[str]) -> List[Tuple[int, ...]]:
+        """
+        MinHash signature per text.
+
+        Each shingle is hashed once into one 16-bit value per permutation, so
+        a signature is the column-wise minimum over the shingles' digests.
+        """
+        digest_size = 2 * self.permutations
+        digests: Dict[str, bytes] = {}
+        signatures = []
+        for text in texts:
+            parts = []
+            for shingle in self.shingles(text):
+                digest = digests.get(shingle)
+                if digest is None:
+                    digest = hashlib.shake_128(shingle.encode('utf-8'))
+                    digest = digest.digest(digest_size)
+                    digests[shingle] = digest
+                parts.append(digest)
+            values = array('H', b"".join(parts))
+            signatures.append(tuple(
+                min(values[p::self.permutations]) for p in range(self.permutations)
+            ))
+        return signatures
+
+    def candidate_pairs(self, texts: List[str]) -> List[Tuple[int, int]]:
+        """Index pairs (i < j) worth scoring, in (i, j) order."""
+        count = len(texts)
+        if count <= self.exact_limit:
+            return [(i, j) for i in range(count) for j in range(i + 1, count)]
+
+        buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+        for index, signature in enumerate(self.signatures(texts)):
+            for band in range(self.bands):
+                key = signature[band * self.rows:(band + 1) * self.rows]
+                buckets[(band, key)].append(index)
+
+        pairs = set()
+        for members in buckets.values():
+            for position, i in enumerate(members):
+                for j in members[position + 1:position + 1 + self.bucket_neighbours]:
+                    pairs.add((i, j))
+        return sorted(pairs)
+
+    def similar_pairs(self, texts: List[str]) -> List[Tuple[int, int, float]]:
+        """
+        Return (i, j, ratio) for every candidate pair whose SequenceMatcher
+        ratio is above the threshold, in (i, j) order. Repeated texts yield
+        one pair per copy, with the first occurrence.
+        """
+        groups: Dict[str, List[int]] = {}
+        for index, text in enumerate(texts):
+            groups.setdefault(" ".join(text.split()), []).append(index)
+        firsts = [members[0] for members in groups.values()]
+
+        similar = []
+        matcher = difflib.SequenceMatcher(None)
+        for members in groups.values():
+            for copy in members[1:]:
+                first = texts[members[0]]
+                ratio = 1.0 if texts[copy] == first else \
+                    difflib.SequenceMatcher(None, first, texts[copy]).ratio()
+                if ratio > self.threshold:
+                    similar.append((members[0], copy, ratio))
+
+        by_second: Dict[int, List[int]] = defaultdict(list)
+        for i, j in self.candidate_pairs([texts[index] for index in firsts]):
+            by_second[firsts[j]].append(firsts[i])
+
+        for j, earlier in by_second.items():
+            # SequenceMatcher caches its analysis of the second sequence
+            matcher.set_seq2(texts[j])
+            for i in earlier:
+                matcher.set_seq1(texts[i])
+                # Cheap upper bounds rule most pairs out before the full ratio
+                if matcher.real_quick_ratio() <= self.threshold or \
+                        matcher.quick_ratio() <= self.threshold:
+                    continue
+                ratio = matcher.ratio()
+                if ratio > self.threshold:
+                    similar.append((i, j, ratio))
+        similar.sort()
+        return similar
@@ -0,0 +1,183 @@
+"""
+Certificate Verification
+Checks issued certificates against the store, their signature and the content
+they cover.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_CACHE_ENTRIES = 50000
+# Unknown IDs are remembered briefly so repeated probes skip the index
+DEFAULT_NEGATIVE_TTL_SECONDS = 60.0
+
+SHA256_PREFIX = "SHA256_"
+
+# (certificate ID, content SHA-256 or None)
+CacheKey = Tuple[str, Optional[str]]
+
+
+class CertificateVerifier:
+    """
+    Verifies certificates by ID, optionally with the content they cover.
+
+    A certificate is valid when it is in the certificate store, the copy
+    presented (if any) matches the stored one, its batch signature checks
+    out and, when content or a content hash is given, the SHA-256 matches
+    the certified one. Results are kept in a bounded LRU keyed by
+    certificate ID and content SHA-256, so repeat checks never re-check a
+    signature or read the store; raw content is hashed on every call, since
+    a cheaper key could collide and return another document's verdict.
+    Unknown IDs are cached as negative results for negative_ttl seconds.
+    """
+
+    def __init__(self, store: Any, signer: Any, policies: Any,
+                 max_entries: Optional[int] = None,
+                 negative_ttl: Optional[float] = None):
+        self.name = "Certificate Verifier"
+        self.version = "1.0.0"
+        self.store = store
+        self.signer = signer
+        self.policies = policies
+        self.max_entries = max_entries or int(os.environ.get("TG_VERIFY_CACHE_ENTRIES",
+                                                             DEFAULT_CACHE_ENTRIES))
+        if negative_ttl is None:
+            negative_ttl = float(os.environ.get("TG_VERIFY_NEGATIVE_TTL_SECONDS",
+                                                DEFAULT_NEGATIVE_TTL_SECONDS))
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        # Each entry holds the result and when it was cached
+        self._cache: "OrderedDict[CacheKey, Tuple[Dict[str, Any], float]]" = \
+            OrderedDict()
+        self.counters = {"verifications": 0, "hits": 0, "negative_hits": 0, "misses": 0,
+                         "evictions": 0}
+
+    def _content_digest(self, content: Optional[str],
+                        content_hash: Optional[str]) -> Optional[str]:
+        """Hex SHA-256 of the content, or the given content hash without its prefix."""
+        if content is not None:
+            return hashlib.sha256(content.encode("utf-8")).hexdigest()
+        if content_hash is not None:
+            return content_hash.lower().replace(SHA256_PREFIX.lower(), "", 1)
+        return None
+
+    def verify(self, certificate_id: Optional[str] = None,
+               certificate: Optional[Dict[str, Any]] = None,
+               content: Optional[str] = None,
+               content_hash: Optional[str] = None) -> Dict[str, Any]:
+        """Verify one certificate, given by ID or as the certificate itself."""
+        if certificate is not None:
+            info = (certificate.get("certificate_info")
+                    if isinstance(certificate, dict) else None)
+            if not isinstance(info, dict):
+                raise ValueError("certificate must be an issued certificate object")
+            certificate_id = info.get("id")
+        if not isinstance(certificate_id, str):
+            raise ValueError("A certificate or certificate_id is required")
+        if content is not None and not isinstance(content, str):
+            raise ValueError("content must be a string")
+        if content_hash is not None and not isinstance(content_hash, str):
+            raise ValueError("content_hash must be a hex string")
+
+        key = (certificate_id, self._content_digest(content, content_hash))
+        self.counters["verifications"] += 1
+        cached = self._cached(key)
+        if cached is None:
+            cached = self._check(certificate_id, key[1])
+            self._remember(key, cached)
+            result = dict(cached)
+        else:
+            result = dict(cached, cached=True)
+
+        # The presented copy is compared on every call; equality needs no hashing
+        if (certificate is not None and result["known"]
+                and result.pop("_stored") != certificate):
+            result.update(valid=False,
+                          reason="Certificate differs from the issued certificate")
+        result.pop("_stored", None)
+
+        # The active policy can change at any time, so currency is not cached
+        stamp = result["policy"]
+        current = self.policies.current().stamp["sha256"]
+        result["policy_current"] = bool(stamp) and stamp.get("sha256") == current
+        return result
+
+    def verify_many(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Verify each item, keeping errors per item."""
+        results = []
+        for item in items:
+            try:
+                if isinstance(item, str):
+                    item = {"certificate_id": item}
+                if not isinstance(item, dict):
+                    raise ValueError("Each item must be a certificate ID or an object")
+                results.append(self.verify(item.get("certificate_id"),
+                                           item.get("certificate"), item.get("content"),
+                                           item.get("content_hash")))
+            except ValueError as e:
+                results.append({"valid": False, "error": str(e)})
+        return results
+
+    def _cached(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            result, expires_at = entry
+            if expires_at and time.monotonic() > expires_at:
+                del self._cache[key]
+                self.counters["misses"] += 1
+                return None
+            self._cache.move_to_end(key)
+            self.counters["negative_hits" if expires_at else "hits"] += 1
+            return result
+
+    def _remember(self, key: CacheKey, result: Dict[str, Any]) -> None:
+        expires_at = 0.0 if result["known"] else time.monotonic() + self.negative_ttl
+        with self._lock:
+            self._cache[key] = (result, expires_at)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def _check(self, certificate_id: str, digest: Optional[str]) -> Dict[str, Any]:
+        """The uncached path: one store lookup and one signature check."""
+        result = {
+            "certificate_id": certificate_id,
+            "valid": False,
+            "known": False,
+            "signature_valid": False,
+            "content_match": None,
+            "policy": None,
+            "reason": None,
+            "cached": False
+        }
+        stored = self.store.get(certificate_id)
+        if stored is None:
+            result["reason"] = "Unknown certificate"
+            return result
+
+        info = stored.get("certificate_info", {})
+        result.update(known=True, _stored=stored, policy=info.get("scoring_policy"),
+                      signature_valid=self.signer.verify(stored))
+        if digest is not None:
+            result["content_match"] = info.get("content_hash") == SHA256_PREFIX + digest
+
+        if not result["signature_valid"]:
+            result["reason"] = "Signature does not verify"
+        elif result["content_match"] is False:
+            result["reason"] = "Content does not match the certified content hash"
+        else:
+            result["valid"] = True
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counters, "entries": len(self._cache),
+                    "max_entries": self.max_entries}
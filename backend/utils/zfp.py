@@ -4,73 +4,139 @@ Flags hallucinations or AI-generated anomalies.
 """
 
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from .document_context import DocumentContext, Span
+from .lexicon import LEXICONS
+
+# Reported for lines holding two or more years, which are found line by line
+YEAR_PAIR_PATTERN = r'\b\d{4}\b.*\b\d{4}\b'
+YEAR_TOKEN = re.compile(r'\b\d{4}\b')
+# The last year token in a line, matched from just after its first
+LAST_YEAR = re.compile(r'.*\b\d{4}\b')
+
+# Factual claims other than years, which are counted from the shared year scan
+FACT_PATTERNS = [
+    re.compile(r'\b\d+%\b'),                    # Percentages
+    re.compile(r'\b[A-Z][a-z]+ [A-Z][a-z]+\b'),   # Proper names
+    re.compile(r'\$\d+'),                        # Money amounts
+]
 
 class ZeroFabricationProtocol:
-    def __init__(self):
+    def __init__(self, lexicon_packs: Optional[List[Any]] = None):
         self.name = "Zero-Fabrication Protocol"
         self.version = "1.0.0"
-        self.fabrication_indicators = [
-            "as an ai", "i cannot", "i don't have access",
-            "according to my training", "i'm not able to",
-            "generated by ai", "artificial intelligence"
-        ]
+        # Domain lexicon packs add fabrication phrases on top of the built-in list
+        self.lexicon_packs = lexicon_packs
+        self.fabrication_indicators = LEXICONS["fabrication"]
         self.suspicious_patterns = [
-            r'\b\d{4}\b.*\b\d{4}\b',  # Multiple years (potential date confusion)
+            YEAR_PAIR_PATTERN,         # Multiple years (potential date confusion)
             r'approximately \d+%',     # Vague statistics
             r'studies show that',      # Unsupported claims
             r'it is widely known',     # Appeal to common knowledge
         ]
-
-    def detect_ai_artifacts(self, content: str) -> List[Dict[str, Any]]:
+        # Every other pattern starts with a literal, which re searches for directly
+        self.compiled_patterns = {
+            pattern: re.compile(pattern) for pattern in self.suspicious_patterns
+            if pattern != YEAR_PAIR_PATTERN
+        }
+
+    def scan(self, context: DocumentContext) -> Dict[str, Any]:
+        """
+        Suspicious-pattern spans and fact counts for a document, cached on its context.
+
+        Every pattern is compiled once and run once, in time linear in the
+        content length. Year pairs are found line by line: a line with two
+        or more year tokens is reported from its first year to its last, as
+        the greedy year-pair regex did, without retrying along the line.
+        """
+        if "zfp_scan" in context.features:
+            return context.features["zfp_scan"]
+        lower = context.lower
+
+        spans: Dict[str, List[Span]] = {pattern: []
+                                        for pattern in self.suspicious_patterns}
+
+        # Skip straight to the next line with a year; each such line is read at
+        # most twice
+        position = 0
+        while True:
+            first = YEAR_TOKEN.search(lower, position)
+            if first is None:
+                break
+            line_end = lower.find("\n", first.end())
+            if line_end < 0:
+                line_end = len(lower)
+            last = LAST_YEAR.match(lower, first.end(), line_end)
+            if last is not None:
+                spans[YEAR_PAIR_PATTERN].append((first.start(), last.end()))
+            position = line_end
+
+        for pattern, compiled in self.compiled_patterns.items():
+            spans[pattern] = [match.span() for match in compiled.finditer(lower)]
+
+        facts = len(YEAR_TOKEN.findall(context.text))
+        for compiled in FACT_PATTERNS:
+            facts += len(compiled.findall(context.text))
+
+        context.features["zfp_scan"] = {"spans": spans, "fact_count": facts}
+        return context.features["zfp_scan"]
+
+    def detect_ai_artifacts(self, content: str,
+                            context: Optional[DocumentContext] = None
+                            ) -> List[Dict[str, Any]]:
         """Detect potential AI-generated content artifacts."""
         artifacts = []
-        content_lower = content.lower()
-
-        for indicator in self.fabrication_indicators:
-            if indicator in content_lower:
-                artifacts.append({
-                    "type": "ai_artifact",
-                    "indicator": indicator,
-                    "severity": "high",
-                    "description": "Direct AI generation indicator found"
-                })
+        context = context or DocumentContext(content, self.lexicon_packs)
+        found = [match.phrase for match in context.lexicon_matches
+                 if match.category == "fabrication"]
+
+        # Built-in indicators keep their listed order; pack phrases follow in
+        # document order
+        indicators = [indicator for indicator in self.fabrication_indicators
+                      if indicator in found]
+        indicators += [phrase for phrase in dict.fromkeys(found)
+                       if phrase not in self.fabrication_indicators]
+
+        for indicator in indicators:
+            artifacts.append({
+                "type": "ai_artifact",
+                "indicator": indicator,
+                "severity": "high",
+                "description": "Direct AI generation indicator found"
+            })
 
         return artifacts
 
-    def detect_suspicious_patterns(self, content: str) -> List[Dict[str, Any]]:
+    def detect_suspicious_patterns(self, content: str,
+                                   context: Optional[DocumentContext] = None
+                                   ) -> List[Dict[str, Any]]:
         """Detect patterns that might indicate fabricated information."""
         suspicious_items = []
+        context = context or DocumentContext(content)
+        spans = self.scan(context)["spans"]
 
+        # Patterns are matched in the lowercase view and reported in the original text
         for pattern in self.suspicious_patterns:
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            for match in matches:
+            for span in spans[pattern]:
                 suspicious_items.append({
                     "type": "suspicious_pattern",
                     "pattern": pattern,
-                    "match": match.group(),
+                    "match": context.slice(span),
                     "severity": "medium",
                     "description": "Pattern associated with potential fabrication"
                 })
 
         return suspicious_items
 
-    def analyze_fact_density(self, content: str) -> float:
+    def analyze_fact_density(self, content: str,
+                             context: Optional[DocumentContext] = None) -> float:
         """Analyze the density of factual claims vs supporting evidence."""
-        words = content.split()
-        total_words = len(words)
-
-        # Count potential factual claims (sentences with numbers, dates, names)
-        fact_patterns = [
-            r'\b\d+%\b',           # Percentages
-            r'\b\d{4}\b',          # Years
-            r'\b[A-Z][a-z]+ [A-Z][a-z]+\b',  # Proper names
-            r'\$\d+',              # Money amounts
-        ]
+        context = context or DocumentContext(content)
+        total_words = context.token_count
 
-        fact_count = 0
-        for pattern in fact_patterns:
-            fact_count += len(re.findall(pattern, content))
+        # Potential factual claims: percentages, years, proper names and money amounts
+        fact_count = self.scan(context)["fact_count"]
 
         fact_density = fact_count / max(1, total_words / 20)  # Facts per ~20 words
         return min(1.0, fact_density)
@@ -102,11 +168,13 @@ class ZeroFabricationProtocol:
 
         return max(0.0, base_score)
 
-    def process(self, content: str) -> Dict[str, Any]:
+    def process(self, content: str,
+                context: Optional[DocumentContext] = None) -> Dict[str, Any]:
         """Main processing function."""
-        ai_artifacts = self.detect_ai_artifacts(content)
-        suspicious_patterns = self.detect_suspicious_patterns(content)
-        fact_density = self.analyze_fact_density(content)
+        context = context or DocumentContext(content, self.lexicon_packs)
+        ai_artifacts = self.detect_ai_artifacts(content, context)
+        suspicious_patterns = self.detect_suspicious_patterns(content, context)
+        fact_density = self.analyze_fact_density(content, context)
         authenticity_score = self.calculate_authenticity_score(ai_artifacts + suspicious_patterns, fact_density)
 
         total_flags = len(ai_artifacts) + len(suspicious_patterns)
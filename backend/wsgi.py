@@ -0,0 +1,13 @@
+"""
+TrustGraphed WSGI Entry Point
+
+Importing the app builds and warms the shared evaluation pipeline, so with
+preload_app (see gunicorn.conf.py) it happens once in the master and
+workers inherit it copy-on-write:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+from app import app
+
+__all__ = ["app"]
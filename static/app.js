@@ -347,7 +347,7 @@ class TrustGraphedApp {
                     content_assertion: assertionType
                 });
 
-                response = await fetch('/evaluate', {
+                response = await this.runJob({
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json',
@@ -376,7 +376,7 @@ class TrustGraphedApp {
 
                 body = formData;
 
-                response = await fetch('/evaluate', {
+                response = await this.runJob({
                     method: 'POST',
                     body: formData
                 });
@@ -449,6 +449,31 @@ class TrustGraphedApp {
         }
     }
 
+    async runJob(options) {
+        // Queue the evaluation, then poll it, so large documents never hold one request open
+        const submitted = await fetch('/jobs', options);
+        if (submitted.status !== 202) {
+            return submitted;
+        }
+        const { job_id, result_url } = await submitted.json();
+        console.log('Evaluation queued as job', job_id);
+
+        let lastStage = null;
+        while (true) {
+            const response = await fetch(result_url);
+            if (response.status !== 202) {
+                return response;
+            }
+            const { job } = await response.json();
+            if (job && job.stage !== lastStage) {
+                lastStage = job.stage;
+                console.log(`Job ${job_id}: ${job.status}, stage ${job.stage || 'queued'} ` +
+                            `(${job.stages_done}/${job.stages_total})`);
+            }
+            await new Promise(resolve => setTimeout(resolve, 1000));
+        }
+    }
+
     displayResults(data) {
         if (data.status !== 'success') {
             this.showError('Evaluation completed with errors. Please try again.');